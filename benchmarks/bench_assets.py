@@ -0,0 +1,64 @@
+'''
+The cost of a cache miss with `lazy_assets`: loading the whole bundle and
+keeping one asset, against reading the asset from the offset index into
+the bundle.  Each miss is measured on a fresh provider, so the index is
+built on the first miss like it would be in an app
+
+    python benchmarks/bench_assets.py
+'''
+
+import argparse
+import tracemalloc
+
+from common import best_of, make_app
+
+from swagger_gen.lib.dependency import (
+    DependencyProvider,
+    index_resources,
+    load_resources,
+    read_resource
+)
+
+ASSETS = ('index.html', 'swagger-ui.css', 'swagger-ui-bundle.js')
+
+
+def get_peak(fn) -> int:
+    '''The peak traced allocation of a single call'''
+
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app(0)
+    index = index_resources()
+
+    for asset in ASSETS:
+        def unpickle():
+            return load_resources().get(asset)
+
+        def indexed():
+            return read_resource(*index[asset])
+
+        def first_miss():
+            provider = DependencyProvider(app=app, url='/swagger', lazy_assets=True)
+            return provider._get_resource_content(asset)
+
+        for name, fn in (('unpickle', unpickle), ('indexed', indexed), ('first miss', first_miss)):
+            print(f'{asset + " " + name + ":":<40}'
+                  f'{best_of(args.repeat, fn) * 1000:.2f} ms, '
+                  f'peak {get_peak(fn) / 1024:.0f} KiB')
+
+    print(f'{"index:":<40}{best_of(args.repeat, index_resources) * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
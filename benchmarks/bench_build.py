@@ -0,0 +1,59 @@
+'''
+Spec build time and the memory retained by the built document, against
+the definition dictionary emitted from it
+
+    python benchmarks/bench_build.py --routes 8000
+'''
+
+import argparse
+import gc
+import tracemalloc
+
+from common import best_of, make_app
+
+from swagger_gen.lib.emitter import DictEmitter
+from swagger_gen.lib.endpoint import get_swagger_endpoints
+from swagger_gen.lib.schema import SwaggerDefinition
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--routes', type=int, default=8000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = make_app(args.routes)
+
+    def build() -> SwaggerDefinition:
+        definition = SwaggerDefinition(app=app, title='bench')
+        definition.add_endpoints(get_swagger_endpoints(app=app))
+        return definition
+
+    build_time = best_of(args.repeat, build)
+
+    definition = build()
+    emit_time = best_of(
+        args.repeat, lambda: DictEmitter().emit(definition.get_document()))
+
+    # Memory retained by each representation once the build is done
+    gc.collect()
+    tracemalloc.start()
+    document = build().get_document()
+    gc.collect()
+    document_bytes = tracemalloc.get_traced_memory()[0]
+
+    emitted = DictEmitter().emit(document)
+    del document
+    gc.collect()
+    emitted_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f'routes:             {args.routes}')
+    print(f'build:              {build_time * 1000:.1f} ms')
+    print(f'emit:               {emit_time * 1000:.1f} ms')
+    print(f'retained document:  {document_bytes / 1e6:.1f} MB')
+    print(f'retained dict:      {emitted_bytes / 1e6:.1f} MB ({len(emitted["paths"])} paths)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+'''
+The cost of `@swagger_metadata`: once per view when the module defining
+it is imported, and on every call to the view (there shouldn't be any,
+the decorator returns the view as-is)
+
+    python benchmarks/bench_decorator.py --views 3000
+'''
+
+import argparse
+import timeit
+
+from common import best_of
+
+from swagger_gen.lib.wrappers import swagger_metadata
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--views', type=int, default=3000)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = iter(range(args.repeat))
+
+    def decorate_views():
+        run = next(runs)
+        for index in range(args.views):
+            def view():
+                return None
+
+            # The metadata collection rejects duplicate names
+            view.__name__ = f'decorated_{run}_{index}'
+            swagger_metadata(
+                summary='summary',
+                query_params=['page'],
+                response_model=[(200, 'OK')])(view)
+
+    decorate_time = best_of(args.repeat, decorate_views)
+
+    def plain_view():
+        return None
+
+    def decorated_view():
+        return None
+
+    decorated = swagger_metadata(summary='summary')(decorated_view)
+
+    plain_call = min(timeit.repeat(
+        plain_view, number=args.calls, repeat=args.repeat)) / args.calls
+    decorated_call = min(timeit.repeat(
+        decorated, number=args.calls, repeat=args.repeat)) / args.calls
+
+    print(f'decorate:           {decorate_time / args.views * 1e6:.2f} us per view '
+          f'({decorate_time * 1000:.1f} ms for {args.views})')
+    print(f'plain view call:    {plain_call * 1e9:.0f} ns')
+    print(f'decorated call:     {decorated_call * 1e9:.0f} ns')
+    print(f'same function:      {decorated is decorated_view}')
+
+
+if __name__ == '__main__':
+    main()
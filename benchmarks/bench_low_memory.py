@@ -0,0 +1,102 @@
+'''
+Memory held by a configured app with and without `low_memory`.  Each mode
+is measured in its own process, since freed memory isn't always returned
+to the OS.  RSS is read from `/proc`, so the RSS numbers are Linux only.
+With `--manifest`, the routes without `@swagger_metadata` get their
+metadata from a metadata manifest instead
+
+    python benchmarks/bench_low_memory.py --routes 4000 --manifest
+'''
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tracemalloc
+
+
+def get_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    return float('nan')
+
+
+def measure(routes: int, low_memory: bool, manifest: bool) -> dict:
+    from common import make_app
+
+    from swagger_gen.swagger import Swagger
+
+    app = make_app(routes)
+    gc.collect()
+
+    rss = get_rss_mb()
+    tracemalloc.start()
+
+    metadata_manifest = None
+    if manifest:
+        metadata_manifest = {
+            f'bench_view_{index}': {
+                'summary': 'summary',
+                'description': 'description',
+                'query_params': ['page', 'size'],
+                'request_model': {'name': 'string'}
+            }
+            for index in range(0, routes, 2)
+        }
+
+    swagger = Swagger(
+        app=app,
+        title='bench',
+        low_memory=low_memory,
+        metadata_manifest=metadata_manifest)
+
+    # Only what swagger-gen holds on to is measured
+    del metadata_manifest
+    swagger.configure()
+
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        'rss_mb': get_rss_mb() - rss,
+        'traced_mb': traced / 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--routes', type=int, default=4000)
+    parser.add_argument('--manifest', action='store_true')
+    parser.add_argument('--measure', choices=['default', 'low_memory'])
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        print(json.dumps(measure(args.routes, args.measure == 'low_memory', args.manifest)))
+        return
+
+    for mode in ('default', 'low_memory'):
+        command = [sys.executable, __file__, '--routes', str(args.routes), '--measure', mode]
+        if args.manifest:
+            command.append('--manifest')
+
+        output = subprocess.run(
+            command,
+            check=True,
+            capture_output=True,
+            text=True).stdout
+
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{mode + ":":<14}RSS delta {result["rss_mb"]:.1f} MB, '
+              f'traced heap {result["traced_mb"]:.2f} MB ({args.routes} routes)')
+
+
+if __name__ == '__main__':
+    main()
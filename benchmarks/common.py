@@ -0,0 +1,58 @@
+'''
+Shared helpers for the benchmark scripts.  The scripts are run from the
+repository root, i.e. `python benchmarks/bench_build.py --routes 8000`
+'''
+
+import os
+import sys
+import time
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from swagger_gen.lib.wrappers import swagger_metadata  # noqa: E402
+
+
+def make_app(routes: int, methods=('GET',), name: str = 'bench') -> Flask:
+    '''
+    Create an app with `routes` routes spread over 50 resources, each with a
+    path parameter.  Every other route has `@swagger_metadata` with query
+    params, a request model and responses.  The view function names are
+    prefixed with `name`, so several apps can be created in one process
+    '''
+
+    app = Flask(name)
+
+    for index in range(routes):
+        def view(item_id):
+            return {}
+
+        view.__name__ = f'{name}_view_{index}'
+
+        if index % 2:
+            view = swagger_metadata(
+                summary='summary',
+                description='description',
+                query_params=['page', 'size'],
+                request_model={'name': 'string'},
+                response_model=[(200, 'OK'), (404, 'Not found')])(view)
+
+        app.add_url_rule(
+            f'/api/resource{index % 50}/item{index}/<item_id>',
+            view_func=view,
+            methods=list(methods))
+
+    return app
+
+
+def best_of(repeat: int, function) -> float:
+    '''Run `function` `repeat` times and return the fastest run, in seconds'''
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+
+    return best
@@ -15,6 +15,9 @@ setup(
     package_data={'swagger_gen': ['./resources/swagger.pkl']},
     packages=find_packages(),
     install_requires=['flask'],
+    entry_points={
+        'console_scripts': ['swagger-gen=swagger_gen.cli:main']
+    },
     keywords=['python', 'swagger-gen'],
     classifiers=[
         'Development Status :: 3 - Alpha',
@@ -0,0 +1,3 @@
+from swagger_gen.cli import main
+
+raise SystemExit(main())
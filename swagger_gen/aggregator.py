@@ -0,0 +1,124 @@
+from swagger_gen.lib.endpoint import get_swagger_endpoints
+from swagger_gen.lib.schema import SwaggerDefinition
+from swagger_gen.lib.spec import SwaggerDocument
+from swagger_gen.lib.utils import is_type, not_null
+from swagger_gen.lib.wrappers import release_endpoint_metadata
+from swagger_gen.swagger import Swagger
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+
+class SwaggerAggregator(Swagger):
+    '''
+    A single Swagger UI and spec for multiple Flask apps mounted under a
+    dispatcher, i.e. `werkzeug`'s `DispatcherMiddleware`.  Rather than each
+    mounted app running its own `Swagger` (with its own spec route and copy
+    of the Swagger UI dependencies), the aggregator runs on the app that
+    serves the docs and builds the definitions of all of the mounted apps
+    concurrently.  The paths of each mounted app are prefixed with the path
+    it's mounted at, and components are merged, so any component defined by
+    more than one app is only included once.
+
+    ```python
+    mounts = {'/users': users_app, '/orders': orders_app}
+    app.wsgi_app = DispatcherMiddleware(app.wsgi_app, mounts)
+
+    swagger = SwaggerAggregator(app=app, mounts=mounts, title='gateway')
+    swagger.configure()
+    ```
+
+    Everything else (build modes, assets, hot reload, etc) is configured the
+    same way as `Swagger`, and applies to the combined spec
+
+    params:
+    `app`: the Flask app that serves the docs.  Its own routes are included
+    in the spec as well
+    `mounts`: the mounted apps, keyed by the path they're mounted at
+    `max_workers`: the maximum number of mounted apps to build at once
+    '''
+
+    def __init__(
+            self,
+            app: 'Flask',
+            mounts: Dict[str, 'Flask'],
+            **kwargs):
+
+        super().__init__(app=app, **kwargs)
+
+        not_null(mounts, 'mounts')
+        is_type(mounts, 'mounts', dict)
+
+        self._mounts = mounts
+
+        self._max_workers = kwargs.get('max_workers')
+        is_type(self._max_workers, 'max_workers', int)
+
+    def _build_swagger_definitions(self) -> dict:
+        '''
+        Build the combined Swagger JSON definitions
+        '''
+
+        # The mounted apps don't depend on each other, so they're built at
+        # the same time
+        with ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix='swagger-gen-aggregate') as executor:
+
+            futures = [
+                (path_prefix, executor.submit(self._build_mount_document, mount))
+                for path_prefix, mount in self._mounts.items()
+            ]
+
+            documents = [
+                (path_prefix, future.result())
+                for path_prefix, future in futures
+            ]
+
+        # The routes on the app serving the docs
+        endpoints = self._get_swagger_endpoints()
+
+        definition = SwaggerDefinition(
+            app=self._app,
+            **self._definition_kwargs)
+        definition.add_endpoints(endpoints)
+
+        # Merge the mounted apps in the order they're mounted, so the spec is
+        # the same no matter which build finished first
+        for path_prefix, document in documents:
+            definition.add_document(
+                document=document,
+                path_prefix=path_prefix,
+                name=self._mounts[path_prefix].name)
+
+        # Replace the previous definition once the new one is complete
+        self._set_definition(definition, endpoints)
+
+        return definition.get_definition()
+
+    def _get_mounted_apps(self) -> List['Flask']:
+        '''
+        Get the mounted apps, so hot reload picks up their routes as well
+        '''
+
+        return list(self._mounts.values())
+
+    def _build_mount_document(self, mount: 'Flask') -> SwaggerDocument:
+        '''Build the document for one of the mounted apps'''
+
+        endpoints = get_swagger_endpoints(app=mount)
+
+        definition = SwaggerDefinition(
+            app=mount,
+            **self._definition_kwargs)
+        definition.add_endpoints(endpoints)
+
+        # The document has everything the merge needs, so the metadata of the
+        # mounted app can be released
+        if self._low_memory:
+            release_endpoint_metadata(
+                endpoint.view_function_name for endpoint in endpoints)
+
+        return definition.get_document()
@@ -0,0 +1,189 @@
+from swagger_gen.lib.analyzer import SpecAnalyzer
+from swagger_gen.lib.dependency import export_assets
+from swagger_gen.lib.mock import MockServer
+import argparse
+import json
+import sys
+
+
+def load_spec(path: str) -> dict:
+    '''Load a spec file, or the spec from stdin if the path is `-`'''
+
+    if path == '-':
+        return json.load(sys.stdin)
+
+    with open(path, 'rb') as spec_file:
+        return json.load(spec_file)
+
+
+def analyze(args) -> int:
+    '''Analyze the size of a spec file'''
+
+    definition = load_spec(args.spec)
+
+    report = SpecAnalyzer(
+        min_duplicate_size=args.min_size).analyze(definition)
+
+    print(report.to_text(top=args.top))
+    return 0
+
+
+def export(args) -> int:
+    '''Export the Swagger UI dependencies for a CDN'''
+
+    manifest = export_assets(args.directory)
+
+    for resource_name, fingerprinted_name in manifest.items():
+        print(f'{resource_name} -> {fingerprinted_name}')
+    return 0
+
+
+def mock(args) -> int:
+    '''Serve example responses for the operations in a spec file'''
+
+    from werkzeug.serving import run_simple
+
+    mock_server = MockServer(
+        definition=load_spec(args.spec),
+        path_prefix=args.path_prefix)
+
+    run_simple(
+        hostname=args.host,
+        port=args.port,
+        application=mock_server,
+        threaded=True)
+    return 0
+
+
+def load(args) -> int:
+    '''Drive requests synthesized from the spec against a running server'''
+
+    from swagger_gen.lib.constants import DocsUrl
+    from swagger_gen.lib.loadtest import (
+        HttpTransport,
+        LoadGenerator,
+        get_docs_paths,
+        synthesize_requests
+    )
+
+    transport = HttpTransport(args.url)
+
+    # Use the spec the server is serving unless another one is provided
+    if args.spec is not None:
+        definition = load_spec(args.spec)
+    else:
+        definition = json.loads(transport.fetch(DocsUrl.SPEC))
+
+    # The docs requests are the ones the served index makes, so they follow
+    # wherever the index loads its assets from
+    docs_paths = None
+    if not args.no_docs:
+        docs_paths = get_docs_paths(
+            index=transport.fetch(args.docs_url),
+            index_url=args.docs_url)
+
+    requests = synthesize_requests(
+        definition=definition,
+        docs_paths=docs_paths)
+
+    report = LoadGenerator(
+        transport=transport,
+        requests=requests,
+        concurrency=args.concurrency).run(
+            duration=args.duration)
+
+    print(report.to_text())
+    return 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='swagger-gen',
+        description='swagger-gen utilities')
+
+    commands = parser.add_subparsers(
+        dest='command',
+        required=True)
+
+    analyze_parser = commands.add_parser(
+        'analyze',
+        help='attribute the size of a spec to its tags, paths, operations and components')
+    analyze_parser.add_argument(
+        'spec',
+        help="path to the spec JSON, i.e. a saved swagger.json, or '-' for stdin")
+    analyze_parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='number of entries to show for each section')
+    analyze_parser.add_argument(
+        '--min-size',
+        type=int,
+        default=64,
+        help='smallest subtree (in bytes) to check for duplicates')
+    analyze_parser.set_defaults(handler=analyze)
+
+    export_parser = commands.add_parser(
+        'export-assets',
+        help='write the Swagger UI dependencies under fingerprinted names, for use with assets_url')
+    export_parser.add_argument(
+        'directory',
+        help='the directory to write the assets and manifest.json to')
+    export_parser.set_defaults(handler=export)
+
+    mock_parser = commands.add_parser(
+        'mock',
+        help='serve an example response for every operation in a spec')
+    mock_parser.add_argument(
+        'spec',
+        help="path to the spec JSON, or '-' for stdin")
+    mock_parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='the interface to listen on')
+    mock_parser.add_argument(
+        '--port',
+        type=int,
+        default=8000,
+        help='the port to listen on')
+    mock_parser.add_argument(
+        '--path-prefix',
+        default='',
+        help='a prefix to serve the paths under')
+    mock_parser.set_defaults(handler=mock)
+
+    load_parser = commands.add_parser(
+        'load',
+        help='drive requests for every operation in the spec against a server and report the latencies')
+    load_parser.add_argument(
+        'url',
+        help='the base URL of the server, i.e. http://127.0.0.1:5000 or unix:///path/to/socket')
+    load_parser.add_argument(
+        '--spec',
+        help="path to the spec JSON, or '-' for stdin.  Fetched from the server if not set")
+    load_parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='the number of concurrent workers')
+    load_parser.add_argument(
+        '--duration',
+        type=float,
+        default=10.0,
+        help='how long to run for, in seconds')
+    load_parser.add_argument(
+        '--docs-url',
+        default='/swagger',
+        help='the Swagger UI index url.  It\'s requested along with the spec and the assets it loads from the server')
+    load_parser.add_argument(
+        '--no-docs',
+        action='store_true',
+        help="don't include requests for the spec, the index and the assets")
+    load_parser.set_defaults(handler=load)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = get_parser().parse_args(argv)
+    return args.handler(args)
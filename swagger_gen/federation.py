@@ -0,0 +1,97 @@
+from swagger_gen.lib.federation import SpecFederation, Upstream
+from swagger_gen.lib.utils import is_type, not_null
+from swagger_gen.swagger import Swagger
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+
+class SwaggerFederation(Swagger):
+    '''
+    A single Swagger UI and spec for a gateway in front of services that
+    already expose their own specs, i.e. other apps running swagger-gen.
+    The upstream specs are fetched concurrently over a bounded connection
+    pool and merged with the spec of the gateway app itself.  Each fetched
+    spec is cached for its TTL, then checked for changes with its `ETag`
+    in the background.  The merged spec is only rebuilt when one of the
+    upstream specs changes, and requests keep getting the previous spec
+    while it's rebuilt.
+
+    ```python
+    swagger = SwaggerFederation(
+        app=app,
+        title='gateway',
+        upstreams=[
+            Upstream(
+                name='users',
+                url='http://users:5000/swagger/v1/swagger.json',
+                path_prefix='/users'),
+        ])
+
+    swagger.configure()
+    ```
+
+    Everything else (build modes, assets, etc) is configured the same way
+    as `Swagger`, and applies to the merged spec
+
+    params:
+    `app`: the gateway Flask app.  Its own routes are included in the spec
+    `upstreams`: the upstream services
+    `max_connections`: the maximum number of concurrent fetches
+    `fetch_timeout`: the fetch timeout, in seconds
+    '''
+
+    def __init__(
+            self,
+            app: 'Flask',
+            upstreams: List[Upstream],
+            **kwargs):
+
+        super().__init__(app=app, **kwargs)
+
+        # The merged spec is rebuilt whenever an upstream spec changes
+        if self._low_memory:
+            raise Exception(
+                "'low_memory' isn't supported when federating upstream specs")
+
+        not_null(upstreams, 'upstreams')
+        is_type(upstreams, 'upstreams', list)
+
+        for upstream in upstreams:
+            is_type(upstream, 'upstream', Upstream)
+
+        max_connections = kwargs.get('max_connections') or 10
+        is_type(max_connections, 'max_connections', int)
+
+        fetch_timeout = kwargs.get('fetch_timeout') or 5.0
+        is_type(fetch_timeout, 'fetch_timeout', (int, float))
+
+        self._federation = SpecFederation(
+            upstreams=upstreams,
+            max_connections=max_connections,
+            timeout=fetch_timeout)
+
+    def configure(self):
+        '''
+        Configure swagger-gen for the gateway, and start refreshing the
+        upstream specs in the background
+        '''
+
+        super().configure()
+
+        self._federation.start(
+            on_change=self._spec_provider.rebuild)
+
+    def _build_swagger_definitions(self) -> dict:
+        '''
+        Build the Swagger JSON definitions for the gateway and merge the
+        upstream specs
+        '''
+
+        # Fetch anything that hasn't been fetched yet, i.e. on the first build
+        self._federation.refresh()
+
+        definition = super()._build_swagger_definitions()
+
+        return self._federation.merge(definition)
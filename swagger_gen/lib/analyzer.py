@@ -0,0 +1,306 @@
+from swagger_gen.lib.constants import Schema
+from swagger_gen.lib.utils import is_type, not_null
+from typing import Dict, List, Tuple
+import hashlib
+import json
+
+
+class DuplicateSubtree:
+    '''
+    A subtree that occurs more than once in the spec.  Occurrences inside a
+    repeat of a larger duplicated subtree aren't counted, so the wasted
+    bytes of all of the duplicates add up to at most the size of the spec
+    '''
+
+    __slots__ = (
+        'size',
+        'count',
+        'location'
+    )
+
+    def __init__(self, size: int, location: str):
+        self.size = size
+        self.count = 1
+
+        # JSON pointer to the first occurrence
+        self.location = location
+
+    @property
+    def wasted_bytes(self) -> int:
+        '''Bytes that would be saved if the subtree was only included once'''
+        return self.size * (self.count - 1)
+
+
+class SpecReport:
+    '''
+    The serialized size of the spec, attributed to each tag, path, operation
+    and component.  Sizes are the bytes of compact JSON, which is how the
+    spec is served
+    '''
+
+    def __init__(self):
+        self.total_bytes = 0
+        self.tags: Dict[str, int] = dict()
+        self.paths: Dict[str, int] = dict()
+        self.operations: Dict[Tuple[str, str], int] = dict()
+        self.components: Dict[Tuple[str, str], int] = dict()
+        self.duplicates: List[DuplicateSubtree] = list()
+
+    def to_text(self, top: int = 10) -> str:
+        '''
+        Format the report for display
+
+        params:
+        `top`: the number of entries to show for each section
+        '''
+
+        def percentage(size):
+            return f'{(size / self.total_bytes) * 100 if self.total_bytes else 0:5.1f}%'
+
+        def section(title, entries):
+            ranked = sorted(
+                entries.items(),
+                key=lambda x: x[1],
+                reverse=True)[:top]
+
+            lines = [f'{title} ({len(entries)})']
+            for name, size in ranked:
+                lines.append(f'  {size:>12,}  {percentage(size)}  {name}')
+            return lines
+
+        lines = [f'Total: {self.total_bytes:,} bytes', '']
+        lines += section('Tags', self.tags) + ['']
+        lines += section('Paths', self.paths) + ['']
+        lines += section('Operations', {
+            f'{method.upper()} {path}': size
+            for (path, method), size in self.operations.items()
+        }) + ['']
+        lines += section('Components', {
+            f'{component_type}/{key}': size
+            for (component_type, key), size in self.components.items()
+        }) + ['']
+
+        lines.append(f'Duplicated subtrees ({len(self.duplicates)})')
+        for duplicate in self.duplicates[:top]:
+            lines.append(
+                f'  {duplicate.wasted_bytes:>12,}  {percentage(duplicate.wasted_bytes)}  '
+                f'{duplicate.count} x {duplicate.size:,} bytes, first at {duplicate.location}')
+
+        return '\n'.join(lines)
+
+
+class SpecAnalyzer:
+    '''
+    Attributes the serialized bytes of a spec to its tags, paths, operations
+    and components, and finds duplicated subtrees that could be moved into
+    shared components.  The spec is walked once: each node's size and a
+    digest of its canonical form (keys sorted) are computed from its
+    children, so nothing is serialized more than once and the cost grows
+    linearly with the size of the spec.  Only the largest duplicates are
+    reported, a duplicate nested in another is only counted where it occurs
+    outside of the other's repeats.  Path items can't be moved into
+    components, so they aren't reported
+
+    params:
+    `min_duplicate_size`: the smallest subtree (in bytes) that's tracked for
+    duplicates.  Smaller subtrees are cheaper to repeat than to reference
+    '''
+
+    def __init__(self, min_duplicate_size: int = 64):
+        is_type(min_duplicate_size, 'min_duplicate_size', int)
+
+        self._min_duplicate_size = min_duplicate_size
+
+    def analyze(self, definition: dict) -> SpecReport:
+        '''
+        Analyze the spec, i.e. the definition from `SwaggerDefinition.get_definition()`
+
+        params:
+        `definition`: the spec to analyze
+        '''
+
+        not_null(definition, 'definition')
+        is_type(definition, 'definition', dict)
+
+        report = SpecReport()
+
+        # The duplicate candidates in the order they're walked, as their
+        # pointer, digest, size and the index past their last descendant
+        nodes: List[list] = list()
+
+        report.total_bytes, _ = self._measure(
+            node=definition,
+            pointer='',
+            depth=0,
+            nodes=nodes,
+            report=report)
+
+        report.duplicates = sorted(
+            self._get_duplicates(nodes),
+            key=lambda x: x.wasted_bytes,
+            reverse=True)
+
+        return report
+
+    def _measure(
+            self,
+            node,
+            pointer: str,
+            depth: int,
+            nodes: List[list],
+            report: SpecReport) -> Tuple[int, bytes]:
+        '''
+        Get the serialized size and content digest of a node, recording the
+        attribution for the node along the way
+        '''
+
+        # Reserved before the children are walked, so the candidates stay in
+        # walk order and each one's descendants follow it
+        entry = None
+        if isinstance(node, (dict, list)):
+            entry = [pointer, None, 0, 0]
+            nodes.append(entry)
+
+        if isinstance(node, dict):
+            size = 2 + max(len(node) - 1, 0)
+            members = list()
+
+            for key, value in node.items():
+                child_size, child_digest = self._measure(
+                    node=value,
+                    pointer=f'{pointer}/{_escape_pointer(key)}',
+                    depth=depth + 1,
+                    nodes=nodes,
+                    report=report)
+
+                # The key, the colon and the value
+                encoded_key = json.dumps(key).encode('utf-8')
+                size += len(encoded_key) + 1 + child_size
+                members.append(encoded_key + b':' + child_digest)
+
+            # The keys are quoted and the digests are a fixed length, so the
+            # members can't run into each other
+            members.sort()
+            node_digest = _get_digest(b'{' + b''.join(members))
+
+        elif isinstance(node, list):
+            size = 2 + max(len(node) - 1, 0)
+            items = list()
+
+            for index, value in enumerate(node):
+                child_size, child_digest = self._measure(
+                    node=value,
+                    pointer=f'{pointer}/{index}',
+                    depth=depth + 1,
+                    nodes=nodes,
+                    report=report)
+
+                size += child_size
+                items.append(child_digest)
+
+            node_digest = _get_digest(b'[' + b''.join(items))
+
+        else:
+            encoded = json.dumps(node).encode('utf-8')
+            size = len(encoded)
+            node_digest = _get_digest(b'=' + encoded)
+
+        # Paths, operations and components are all two or three levels deep
+        if depth == 2 or depth == 3:
+            self._attribute(pointer, node, size, report)
+
+        candidate = (size >= self._min_duplicate_size
+                     and not _is_path_item(pointer, depth))
+
+        if entry is not None:
+            entry[1] = node_digest if candidate else None
+            entry[2] = size
+            entry[3] = len(nodes)
+
+        elif candidate:
+            nodes.append([pointer, node_digest, size, len(nodes) + 1])
+
+        return size, node_digest
+
+    def _get_duplicates(self, nodes: List[list]) -> List[DuplicateSubtree]:
+        '''
+        Count the occurrences of the largest duplicated subtrees.  The first
+        occurrence of a duplicate is kept and its contents are still counted,
+        since they'd be in the shared component.  Everything inside a repeat
+        is accounted for by the repeat
+        '''
+
+        counts: Dict[bytes, int] = dict()
+        for _, digest, _, _ in nodes:
+            if digest is not None:
+                counts[digest] = counts.get(digest, 0) + 1
+
+        duplicates: Dict[bytes, DuplicateSubtree] = dict()
+
+        index = 0
+        while index < len(nodes):
+            pointer, digest, size, end = nodes[index]
+            index += 1
+
+            if digest is None or counts[digest] < 2:
+                continue
+
+            duplicate = duplicates.get(digest)
+            if duplicate is None:
+                duplicates[digest] = DuplicateSubtree(
+                    size=size,
+                    location=pointer or '/')
+                continue
+
+            duplicate.count += 1
+            index = end
+
+        return [
+            duplicate for duplicate in duplicates.values()
+            if duplicate.count > 1
+        ]
+
+    def _attribute(self, pointer: str, node, size: int, report: SpecReport) -> None:
+        '''Attribute the size of the node if it's a path, operation or component'''
+
+        segments = pointer.split('/')
+
+        # /paths/{path}
+        if len(segments) == 3 and segments[1] == Schema.PATHS:
+            report.paths[_unescape_pointer(segments[2])] = size
+
+        # /paths/{path}/{method}
+        elif (len(segments) == 4
+              and segments[1] == Schema.PATHS
+              and isinstance(node, dict)):
+            path = _unescape_pointer(segments[2])
+            report.operations[(path, segments[3])] = size
+
+            for tag in node.get(Schema.ENDPOINT_TAGS) or []:
+                report.tags[tag] = report.tags.get(tag, 0) + size
+
+        # /components/{type}/{key}
+        elif len(segments) == 4 and segments[1] == Schema.COMPONENTS:
+            report.components[(
+                _unescape_pointer(segments[2]),
+                _unescape_pointer(segments[3]))] = size
+
+
+def _get_digest(content: bytes) -> bytes:
+    '''A digest of a node's kind followed by its encoded contents'''
+
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _is_path_item(pointer: str, depth: int) -> bool:
+    '''Whether the pointer is to a path item, i.e. /paths/{path}'''
+
+    return depth == 2 and pointer.startswith(f'/{Schema.PATHS}/')
+
+
+def _escape_pointer(key: str) -> str:
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape_pointer(segment: str) -> str:
+    return segment.replace('~1', '/').replace('~0', '~')
@@ -0,0 +1,235 @@
+from swagger_gen.lib.constants import ComponentType, Method, Schema
+from swagger_gen.lib.utils import is_type, not_null
+from abc import ABC, abstractmethod
+from typing import Dict, FrozenSet, List, Tuple, Union
+
+# Prefix of a reference to a component
+_component_reference_prefix = f'#/{Schema.COMPONENTS}/'
+
+# Keys of a path item that are operations
+_operation_methods = frozenset(
+    method.lower() for method in (
+        Method.GET,
+        Method.PUT,
+        Method.DELETE,
+        Method.POST,
+        Method.HEAD,
+        Method.OPTIONS,
+        Method.PATCH
+    )
+)
+
+
+class AudienceResolver(ABC):
+    '''
+    Picks the audience each request for the spec is served to.  Subclass
+    it and implement `resolve`, i.e. from the client network or a header
+    set by the gateway after authenticating the caller.  The audience is
+    resolved per request, the specs themselves are built ahead of time
+
+    `vary`: the request headers the audience depends on, added to the `Vary`
+    header of the spec
+    '''
+
+    vary: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def resolve(self, environ: dict) -> Union[str, None]:
+        '''
+        Get the audience for a request.  Requests resolved to `None` or to an
+        unknown audience are served the first (most restricted) audience
+
+        params:
+        `environ`: the WSGI environ of the request
+        '''
+
+
+class HeaderAudienceResolver(AudienceResolver):
+    '''
+    Reads the audience from a request header.  The header has to be set (or
+    stripped) by a gateway in front of the app, otherwise any caller can ask
+    for any audience
+
+    params:
+    `header`: the name of the header
+    '''
+
+    def __init__(self, header: str = 'X-Spec-Audience'):
+        not_null(header, 'header')
+        is_type(header, 'header', str)
+
+        self.vary = (header,)
+        self._environ_key = f'HTTP_{header.upper().replace("-", "_")}'
+
+    def resolve(self, environ: dict) -> Union[str, None]:
+        return environ.get(self._environ_key)
+
+
+def split_audiences(
+        definition: dict,
+        audiences: List[str]) -> Dict[str, dict]:
+    '''
+    Split the definition into a definition per audience.  The audiences are
+    ordered from the most to the least restricted, and each one sees the
+    operations visible to it and to every audience before it.  Operations
+    without a visibility are visible to every audience, operations with an
+    unknown one only to the last audience.  The components of
+    each definition are pruned to the ones its operations reference
+    (directly or through other components).
+
+    The definition is walked once: the references of each operation and
+    component are found a single time and shared between the audiences.
+    The definitions share their unchanged nodes with the original, so they
+    shouldn't be modified
+
+    params:
+    `definition`: the built definition
+    `audiences`: the audience names, i.e. `['public', 'internal', 'admin']`
+    '''
+
+    not_null(definition, 'definition')
+    not_null(audiences, 'audiences')
+    is_type(audiences, 'audiences', list)
+
+    levels = {
+        audience: level
+        for level, audience in enumerate(audiences)
+    }
+
+    components = definition.get(Schema.COMPONENTS) or {}
+    component_references: Dict[Tuple[str, str], FrozenSet[Tuple[str, str]]] = dict()
+
+    paths = [dict() for _ in audiences]
+    references = [set() for _ in audiences]
+
+    for endpoint_literal, path_item in (definition.get(Schema.PATHS) or {}).items():
+        # The path-level fields (i.e. parameters) are shared by the operations
+        shared = {
+            key: value for key, value in path_item.items()
+            if key not in _operation_methods
+        }
+        shared_references = _get_references(shared) if shared else frozenset()
+
+        for method, operation in path_item.items():
+            if method not in _operation_methods:
+                continue
+
+            # An unknown visibility (i.e. from a federated spec) is only
+            # visible to the last audience, rather than leaking to the others
+            visibility = operation.get(Schema.VISIBILITY)
+            level = 0
+            if visibility is not None:
+                level = levels.get(visibility, len(audiences) - 1)
+
+            # The visibility is only used to split the spec, it isn't served
+            if visibility is not None:
+                operation = {
+                    key: value for key, value in operation.items()
+                    if key != Schema.VISIBILITY
+                }
+
+            operation_references = _get_references(operation) | shared_references
+
+            for audience_level in range(level, len(audiences)):
+                audience_path = paths[audience_level].get(endpoint_literal)
+                if audience_path is None:
+                    audience_path = paths[audience_level][endpoint_literal] = dict(shared)
+
+                audience_path[method] = operation
+                references[audience_level].update(operation_references)
+
+    split = dict()
+
+    for level, audience in enumerate(audiences):
+        audience_definition = dict(definition)
+        audience_definition[Schema.PATHS] = paths[level]
+        audience_definition[Schema.COMPONENTS] = _prune_components(
+            components=components,
+            references=references[level],
+            component_references=component_references)
+
+        split[audience] = audience_definition
+
+    return split
+
+
+def _prune_components(
+        components: dict,
+        references: set,
+        component_references: Dict[Tuple[str, str], FrozenSet[Tuple[str, str]]]) -> dict:
+    '''Keep the components that are referenced, following the references between them'''
+
+    kept = set()
+    pending = list(references)
+
+    while pending:
+        reference = pending.pop()
+        if reference in kept:
+            continue
+
+        component_type, key = reference
+        component = (components.get(component_type) or {}).get(key)
+        if component is None:
+            continue
+
+        kept.add(reference)
+
+        # Each component is only walked once, whichever audience gets to it
+        # first
+        nested = component_references.get(reference)
+        if nested is None:
+            nested = component_references[reference] = _get_references(component)
+
+        pending.extend(nested - kept)
+
+    pruned = dict()
+    for component_type, section in components.items():
+        pruned_section = {
+            key: component for key, component in section.items()
+            if (component_type, key) in kept
+        }
+
+        # The schemas section is always present
+        if any(pruned_section) or component_type == ComponentType.SCHEMAS:
+            pruned[component_type] = pruned_section
+
+    return pruned
+
+
+def _get_references(node) -> FrozenSet[Tuple[str, str]]:
+    '''
+    Get the components a node references, by component type and key.
+    Security requirements reference their schemes by name
+    '''
+
+    references = set()
+    pending = [node]
+
+    while pending:
+        current = pending.pop()
+
+        if isinstance(current, dict):
+            for key, value in current.items():
+                if (key == Schema.REF
+                        and isinstance(value, str)
+                        and value.startswith(_component_reference_prefix)):
+                    segments = value[len(_component_reference_prefix):].split('/', 1)
+                    if len(segments) == 2:
+                        references.add((segments[0], segments[1]))
+
+                elif key == Schema.SECURITY and isinstance(value, list):
+                    for requirement in value:
+                        if isinstance(requirement, dict):
+                            references.update(
+                                (ComponentType.SECURITY_SCHEMES, name)
+                                for name in requirement)
+
+                elif isinstance(value, (dict, list)):
+                    pending.append(value)
+
+        elif isinstance(current, list):
+            pending.extend(
+                value for value in current
+                if isinstance(value, (dict, list)))
+
+    return frozenset(references)
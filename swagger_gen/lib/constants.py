@@ -48,6 +48,8 @@ class Schema:
     PROPERTIES = 'properties'
     IN = 'in'
     REQUIRED = 'required'
+    ITEMS = 'items'
+    VISIBILITY = 'x-visibility'
 
 
 class AuthType:
@@ -63,6 +65,8 @@ class ComponentType:
 
     SCHEMAS = 'schemas'
     SECURITY_SCHEMES = 'securitySchemes'
+    PARAMETERS = 'parameters'
+    RESPONSES = 'responses'
 
 
 class ParameterType:
@@ -92,4 +96,30 @@ class ContentType:
     '''Content type constants'''
     APPLICATION_JSON = 'application/json'
     TEXT_CSS = 'text/css'
+    TEXT_HTML = 'text/html'
     JAVASCRIPT = 'text/javascript'
+    IMAGE_PNG = 'image/png'
+    METRICS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class BuildMode:
+    '''Spec build mode constants'''
+
+    EAGER = 'eager'
+    LAZY = 'lazy'
+    BACKGROUND = 'background'
+
+
+class DocsRoute:
+    '''Names of the routes bound by swagger-gen'''
+
+    SPEC = 'spec'
+    INDEX = 'index'
+    RESOURCE = 'resource'
+
+
+class DocsUrl:
+    '''Paths of the routes bound by swagger-gen'''
+
+    SPEC = '/swagger/v1/swagger.json'
+    RESOURCE_PREFIX = '/swagger/'
@@ -0,0 +1,166 @@
+from swagger_gen.lib.utils import not_null
+from typing import TYPE_CHECKING, List, Tuple, Union
+import gzip
+import hashlib
+
+if TYPE_CHECKING:
+    from flask import Request, Response
+
+
+class CachedContent:
+    '''
+    Content that's served as-is on every request, i.e. the serialized spec.
+    The content is compressed once when it's created, so requests that
+    accept gzip are served the compressed bytes without compressing them
+    per request.  The `ETag` is a hash of the content, so the same content
+    gets the same `ETag` from every process serving it, and requests with a
+    matching `If-None-Match` get a 304
+
+    params:
+    `content`: the uncompressed content
+    `mimetype`: the content type
+    `compressed_only`: only keep the compressed bytes in memory.  Requests
+    that don't accept gzip are served the content decompressed per request
+    `vary`: request headers other than `Accept-Encoding` that the content
+    depends on, for the `Vary` header
+    `lazy`: compress the content the first time it's served compressed,
+    instead of when it's created.  Can't be used with `compressed_only`
+    '''
+
+    __slots__ = (
+        'content',
+        '_compressed',
+        'mimetype',
+        'etag',
+        'size',
+        'vary'
+    )
+
+    def __init__(
+            self,
+            content: bytes,
+            mimetype: str,
+            compressed_only: bool = False,
+            vary: Tuple[str, ...] = (),
+            lazy: bool = False):
+
+        not_null(content, 'content')
+        not_null(mimetype, 'mimetype')
+
+        if compressed_only and lazy:
+            raise Exception(
+                "'compressed_only' and 'lazy' can't be enabled together")
+
+        self.content = content if not compressed_only else None
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(content).hexdigest()
+        self.size = len(content)
+        self.vary = ', '.join(('Accept-Encoding',) + tuple(vary))
+
+        self._compressed = None
+        if not lazy:
+            self._compressed = _compress(content)
+
+    @property
+    def compressed(self) -> bytes:
+        '''Get the compressed content, compressing it if it's lazy'''
+
+        # Requests racing on the first compression each compress it, the
+        # result is the same
+        if self._compressed is None:
+            self._compressed = _compress(self.content)
+
+        return self._compressed
+
+    def get_content(self) -> bytes:
+        '''Get the uncompressed content'''
+
+        if self.content is not None:
+            return self.content
+
+        return gzip.decompress(self.compressed)
+
+    def get_response(self, request: 'Request') -> 'Response':
+        '''
+        Get the response for the content
+
+        params:
+        `request`: the request for the content
+        '''
+
+        from flask import Response
+
+        accept_encoding = request.headers.get('Accept-Encoding')
+
+        if accept_encoding and 'gzip' in accept_encoding:
+            response = Response(
+                self.compressed,
+                mimetype=self.mimetype)
+            response.headers['Content-Encoding'] = 'gzip'
+
+            # Each encoding is a different representation, so it gets its
+            # own tag
+            response.set_etag(f'{self.etag}-gzip')
+        else:
+            response = Response(
+                self.get_content(),
+                mimetype=self.mimetype)
+            response.set_etag(self.etag)
+
+        response.headers['Vary'] = self.vary
+        return response.make_conditional(request)
+
+    def get_raw_response(
+            self,
+            accept_encoding: Union[str, None],
+            if_none_match: Union[str, None]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        '''
+        Get the status code, headers and body for the content without
+        creating a response object, for serving it from WSGI directly
+
+        params:
+        `accept_encoding`: the `Accept-Encoding` header of the request
+        `if_none_match`: the `If-None-Match` header of the request
+        '''
+
+        if accept_encoding and 'gzip' in accept_encoding:
+            etag = f'"{self.etag}-gzip"'
+            body = self.compressed
+            headers = [('Content-Encoding', 'gzip')]
+        else:
+            etag = f'"{self.etag}"'
+            body = self.get_content()
+            headers = []
+
+        headers += [
+            ('ETag', etag),
+            ('Vary', self.vary)
+        ]
+
+        if if_none_match and _matches_etag(if_none_match, etag):
+            return 304, headers, b''
+
+        from werkzeug.utils import get_content_type
+
+        headers += [
+            ('Content-Type', get_content_type(self.mimetype, 'utf-8')),
+            ('Content-Length', str(len(body)))
+        ]
+
+        return 200, headers, body
+
+
+def _compress(content: bytes) -> bytes:
+    '''Compress the content with gzip'''
+
+    # No timestamp in the gzip header, so the compressed bytes are the
+    # same wherever they're compressed
+    return gzip.compress(content, mtime=0)
+
+
+def _matches_etag(if_none_match: str, etag: str) -> bool:
+    '''Weak comparison of the tag against the `If-None-Match` header'''
+
+    from werkzeug.http import parse_etags
+
+    return parse_etags(if_none_match).contains_weak(etag.strip('"'))
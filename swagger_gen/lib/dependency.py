@@ -2,18 +2,81 @@ from swagger_gen.lib.utils import element_at, not_null
 from swagger_gen.lib.constants import (
     ContentType,
     DependencyInfo,
+    DocsRoute,
     Method
 )
-from werkzeug.exceptions import abort
-from flask import Flask, Response
-import importlib.resources
-import pickle
+from swagger_gen.lib.content import CachedContent
+from typing import TYPE_CHECKING, Dict, Tuple, Union
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+
+if TYPE_CHECKING:
+    from flask import Flask
+    from swagger_gen.lib.metrics import SwaggerMetrics
+    from swagger_gen.lib.provider import SpecBuild, SpecProvider
+    from swagger_gen.lib.throttle import Throttle
 
 mimetype_mapping = {
     'css': ContentType.TEXT_CSS,
-    'js': ContentType.JAVASCRIPT
+    'js': ContentType.JAVASCRIPT,
+    'html': ContentType.TEXT_HTML,
+    'png': ContentType.IMAGE_PNG
 }
 
+# The references to the dependencies in index.html that are inlined in the
+# single document page
+stylesheet_pattern = re.compile(
+    rb'<link rel="stylesheet" type="text/css" href="/swagger/([^"]+)" */>')
+script_pattern = re.compile(
+    rb'<script src="/swagger/([^"]+)"[^>]*> *</script>')
+icon_pattern = re.compile(
+    rb'href="/swagger/(favicon-[^"]+\.png)"')
+spec_url_pattern = re.compile(
+    rb'url: "/swagger/v1/swagger.json"')
+
+# The references to the dependencies in index.html that are pointed at the
+# asset URL when the dependencies are offloaded
+asset_reference_pattern = re.compile(
+    rb'(href|src)="/swagger/([^"/]+)"')
+
+# Pickle opcodes the bundle index understands.  The bundle is a dictionary
+# of names to bytes: the opcodes with an argument that's skipped map to
+# the size of the argument, and the string and bytes opcodes map to the
+# size of their length prefix
+_skipped_opcodes = {
+    b'\x80': 1,  # PROTO
+    b'\x95': 8,  # FRAME
+    b'q': 1,  # BINPUT
+    b'r': 4  # LONG_BINPUT
+}
+_string_opcodes = {
+    b'\x8c': 1,  # SHORT_BINUNICODE
+    b'X': 4,  # BINUNICODE
+    b'\x8d': 8  # BINUNICODE8
+}
+_bytes_opcodes = {
+    b'C': 1,  # SHORT_BINBYTES
+    b'B': 4,  # BINBYTES
+    b'\x8e': 8  # BINBYTES8
+}
+_structure_opcodes = frozenset([
+    b'}',  # EMPTY_DICT
+    b'\x94',  # MEMOIZE
+    b'(',  # MARK
+    b's',  # SETITEM
+    b'u'  # SETITEMS
+])
+
+# Markup that would end (or confuse the parser about the end of) an inline
+# script element.  These only occur in string and regex literals in the
+# bundled scripts, where the escaped form is equivalent
+script_markup_pattern = re.compile(
+    rb'<(!--|/?script)', re.IGNORECASE)
+
 
 class DependencyProvider:
     '''
@@ -22,29 +85,128 @@ class DependencyProvider:
     in a pickle file in the package resources.  This is in an effort to keep the package
     small and easy to install and use, as opposed to having to download the files, stage
     them in a static directory, etc
+
+    The dependencies aren't loaded until the first request for the Swagger UI,
+    so an app that never serves the page never pays to load them
+
+    params:
+    `app`: the Flask app
+    `url`: the route to serve the Swagger UI index at
+    `lazy_assets`: only hold on to each dependency once it's been requested,
+    rather than holding the whole bundle from the first request
+    `spec_provider`: if provided, the index is served as a single document
+    with the spec and the dependencies inlined (see `_get_inline_index`)
+    `metrics`: if provided, requests to the index and dependency routes and
+    the in-memory cache lookups behind them are recorded
+    `throttle`: if provided, requests to the index and dependency routes
+    over its limits are rejected
+    `assets_url`: if provided, the dependencies are loaded by the index from
+    this base URL (i.e. a CDN) under their fingerprinted names, and the
+    dependency route isn't bound.  See `export_assets`
     '''
 
-    def __init__(self, app: Flask, url: str):
+    def __init__(
+            self,
+            app: 'Flask',
+            url: str,
+            lazy_assets: bool = False,
+            spec_provider: Union['SpecProvider', None] = None,
+            metrics: Union['SwaggerMetrics', None] = None,
+            throttle: Union['Throttle', None] = None,
+            assets_url: Union[str, None] = None):
+
         not_null(app, 'app')
         not_null(url, 'url')
 
         self._app = app
         self._url = url
-        self._resources = self._load_resources()
+        self._lazy_assets = lazy_assets
+        self._spec_provider = spec_provider
+        self._metrics = metrics
+        self._throttle = throttle
+        self._assets_url = (
+            assets_url.rstrip('/') if assets_url is not None
+            else None)
 
-    def _load_resources(self) -> dict:
-        '''Load Swagger dependencies to memory'''
+        # The index pointing at the offloaded dependencies
+        self._offloaded_index = None
 
-        try:
-            # Loading the pickled Swagger UI JS, CSS and HTML files from
-            # the module source directory
-            data = importlib.resources.open_binary(
-                DependencyInfo.PKG_RESOURCE_MODULE,
-                DependencyInfo.PKG_SWAGGER)
+        # The single document index and the build it was rendered from
+        self._inline_index = None
+        self._inline_index_lock = threading.Lock()
 
-            return pickle.load(data)
-        except Exception as ex:
-            raise Exception(f'Failed to load Swagger dependencies: {str(ex)}')
+        # The loaded dependencies, keyed by resource name.  With lazy assets
+        # this only holds the dependencies that have been requested
+        self._resources = dict()
+        self._resource_names = None
+        self._resources_lock = threading.Lock()
+
+        # With lazy assets, the offset and length of each dependency in the
+        # bundle, so a dependency is read without loading the others
+        self._resource_index = None
+
+    def _get_resource_content(self, resource_name: str) -> bytes:
+        '''
+        Get the content of a Swagger dependency, loading it on first use.
+        Returns `None` if there's no dependency with the name
+        '''
+
+        # The names are known once the bundle has been loaded once, so
+        # requests for dependencies that don't exist don't trigger a load
+        if (self._resource_names is not None
+                and resource_name not in self._resource_names):
+            return None
+
+        content = self._resources.get(resource_name)
+        if content is not None:
+            return content
+
+        with self._resources_lock:
+            # Another request may have loaded the resource while we were
+            # waiting on the lock
+            content = self._resources.get(resource_name)
+            if content is not None:
+                return content
+
+            if self._lazy_assets:
+                return self._load_indexed_resource(resource_name)
+
+            resources = load_resources()
+            self._resource_names = frozenset(resources.keys())
+
+            self._resources = resources
+            return resources.get(resource_name)
+
+    def _load_indexed_resource(self, resource_name: str) -> Union[bytes, None]:
+        '''
+        Read a single dependency from the bundle, indexing the bundle on the
+        first call.  Called with the resources lock held
+        '''
+
+        if self._resource_index is None:
+            resource_index = index_resources()
+
+            # The bundle isn't laid out the way the index expects, so load
+            # the whole bundle and keep only the requested dependency
+            if resource_index is None:
+                resources = load_resources()
+                self._resource_names = frozenset(resources.keys())
+
+                content = resources.get(resource_name)
+                if content is not None:
+                    self._resources[resource_name] = content
+                return content
+
+            self._resource_index = resource_index
+            self._resource_names = frozenset(resource_index.keys())
+
+        location = self._resource_index.get(resource_name)
+        if location is None:
+            return None
+
+        content = read_resource(*location)
+        self._resources[resource_name] = content
+        return content
 
     def _get_resource_type(self, resource_name: str) -> str:
         ''' 
@@ -76,23 +238,226 @@ class DependencyProvider:
         # not appropriate for a scenario?
         '''
 
-        resource = self._resources.get(resource_name)
-        if not resource:
+        from flask import Response, request
+        from werkzeug.exceptions import abort
+
+        # Only requests for a dependency that exists take a token, and the
+        # throttle runs before the dependency is loaded
+        if not self.has_resource(resource_name):
             abort(404)
 
-        # Get the correct file mimetype to serve it to the browser.  The two
-        # types that we're concerned with here are text/css and text/javascript
-        mimetype = mimetype_mapping.get(
-            self._get_resource_type(resource_name))
+        if self._throttle is not None:
+            rejected = self._throttle.reject(request)
+            if rejected is not None:
+                return rejected
+
+        resource = self.get_resource(resource_name)
+        if resource is None:
+            abort(404)
+
+        content, mimetype = resource
 
         # If there is a matching mimetype, return the resource with that, otherwise
         # return the resouce as-is
         if mimetype:
             return Response(
-                resource,
+                content,
                 mimetype=mimetype)
 
-        return resource
+        return content
+
+    def has_resource(self, resource_name: str) -> bool:
+        '''
+        Whether there's a dependency with the name.  The names are read from
+        the offset index into the bundle, so none of the dependencies are
+        loaded to answer
+        '''
+
+        if self._resource_names is None:
+            with self._resources_lock:
+                if self._resource_names is None:
+                    resource_index = index_resources()
+
+                    # The bundle isn't laid out the way the index expects,
+                    # leave it to the lookup
+                    if resource_index is None:
+                        return True
+
+                    self._resource_index = resource_index
+                    self._resource_names = frozenset(resource_index.keys())
+
+        return resource_name in self._resource_names
+
+    def get_resource(self, resource_name: str) -> Union[Tuple[bytes, Union[str, None]], None]:
+        '''
+        Get a Swagger dependency and its mimetype, if it's one of the types
+        the browser needs to know (`None` otherwise).  Returns `None` if
+        there's no dependency with the name
+        '''
+
+        if self._metrics is not None:
+            self._metrics.record_cache_lookup(
+                route=DocsRoute.RESOURCE,
+                hit=resource_name in self._resources)
+
+        content = self._get_resource_content(resource_name)
+        if not content:
+            return None
+
+        # Get the correct file mimetype to serve it to the browser.  The two
+        # types that we're concerned with here are text/css and text/javascript
+        mimetype = mimetype_mapping.get(
+            self._get_resource_type(resource_name))
+
+        return content, mimetype
+
+    def get_index(self) -> bytes:
+        '''Get the Swagger UI index'''
+
+        if self._assets_url is not None:
+            return self._get_offloaded_index()
+
+        if self._metrics is not None:
+            self._metrics.record_cache_lookup(
+                route=DocsRoute.INDEX,
+                hit='index.html' in self._resources)
+
+        return self._get_resource_content('index.html')
+
+    def get_inline_index(self, spec_build: 'SpecBuild') -> CachedContent:
+        '''
+        Get the single document index for the build, rendering it if it
+        hasn't been rendered for the build yet
+        '''
+
+        not_null(spec_build, 'spec_build')
+
+        inline_index = self._inline_index
+
+        if self._metrics is not None:
+            self._metrics.record_cache_lookup(
+                route=DocsRoute.INDEX,
+                hit=inline_index is not None and inline_index[0] is spec_build)
+
+        # Render the page if there's a new build since it was last rendered
+        if inline_index is None or inline_index[0] is not spec_build:
+            with self._inline_index_lock:
+                inline_index = self._inline_index
+
+                if inline_index is None or inline_index[0] is not spec_build:
+                    inline_index = (
+                        spec_build,
+                        CachedContent(
+                            content=self._render_inline_index(spec_build),
+                            mimetype=ContentType.TEXT_HTML))
+
+                    self._inline_index = inline_index
+
+        return inline_index[1]
+
+    @property
+    def is_inline(self) -> bool:
+        '''Whether the index is served as a single document'''
+        return self._spec_provider is not None
+
+    @property
+    def serves_resources(self) -> bool:
+        '''Whether the dependencies are served by the app'''
+        return self._assets_url is None
+
+    def _get_offloaded_index(self) -> bytes:
+        '''
+        Get the index with the dependencies pointed at the asset URL.  It's
+        rendered once, and none of the dependencies are kept in memory
+        '''
+
+        if self._metrics is not None:
+            self._metrics.record_cache_lookup(
+                route=DocsRoute.INDEX,
+                hit=self._offloaded_index is not None)
+
+        if self._offloaded_index is not None:
+            return self._offloaded_index
+
+        with self._resources_lock:
+            if self._offloaded_index is None:
+                resources = load_resources()
+                manifest = get_asset_manifest(resources)
+
+                def point_at_assets(match):
+                    resource_name = match.group(2).decode('utf-8')
+
+                    # Leave anything that isn't an exported asset as-is
+                    if resource_name not in manifest:
+                        return match.group(0)
+
+                    return (match.group(1) + b'="'
+                            + f'{self._assets_url}/{manifest[resource_name]}'.encode('utf-8')
+                            + b'"')
+
+                self._offloaded_index = asset_reference_pattern.sub(
+                    point_at_assets, resources['index.html'])
+
+            return self._offloaded_index
+
+    def _get_inline_index(self):
+        '''
+        The view function for the single document index.  Rather than the page
+        requesting the dependencies and the spec after the index is loaded, the
+        spec and the critical scripts and styles are inlined in the index, so
+        the page loads in a single request.  The page is rendered once per spec
+        build, and served precompressed
+        '''
+
+        from flask import Response, request
+
+        spec_build = self._spec_provider.get_build()
+
+        # The definition is still being built in the background
+        if spec_build is None:
+            return Response(
+                status=503,
+                headers={'Retry-After': '1'})
+
+        return self.get_inline_index(spec_build).get_response(
+            request=request)
+
+    def _render_inline_index(self, spec_build: 'SpecBuild') -> bytes:
+        '''Render the index with the spec and the dependencies inlined'''
+
+        index = self._get_resource_content('index.html')
+
+        def inline_stylesheet(match):
+            content = self._get_resource_content(
+                match.group(1).decode('utf-8'))
+            return b'<style>' + content + b'</style>'
+
+        def inline_script(match):
+            content = self._get_resource_content(
+                match.group(1).decode('utf-8'))
+            return (b'<script>'
+                    + script_markup_pattern.sub(rb'\\x3c\1', content)
+                    + b'</script>')
+
+        def inline_icon(match):
+            content = self._get_resource_content(
+                match.group(1).decode('utf-8'))
+            encoded = base64.b64encode(content)
+            return (f'href="data:{ContentType.IMAGE_PNG};base64,'.encode('utf-8')
+                    + encoded + b'"')
+
+        # The spec is embedded as a literal in place of the spec URL.  Any '<'
+        # can only be in a string, so it's escaped to keep the spec from
+        # closing the script element
+        spec = (b'spec: '
+                + spec_build.spec.get_content().replace(b'<', b'\\u003c'))
+
+        index = stylesheet_pattern.sub(inline_stylesheet, index)
+        index = script_pattern.sub(inline_script, index)
+        index = icon_pattern.sub(inline_icon, index)
+        index = spec_url_pattern.sub(lambda _: spec, index)
+
+        return index
 
     def bind_dependency_routes(self) -> None:
         '''
@@ -102,22 +467,191 @@ class DependencyProvider:
         '''
 
         # Register the resourceroute to serve the page dependencies requested
-        # by Swagger UI
-        self._app.add_url_rule(
-            rule='/swagger/<resource_name>',
-            view_func=self._get_resource,
-            methods=[Method.GET])
+        # by Swagger UI, unless they're offloaded
+        if self.serves_resources:
+            self._app.add_url_rule(
+                rule='/swagger/<resource_name>',
+                view_func=self._wrap_view(
+                    DocsRoute.RESOURCE, self._get_resource),
+                methods=[Method.GET])
 
         def get_index():
+            from flask import Response
+
             return Response(
-                self._resources.get('index.html'))
+                self.get_index())
 
         # Bind the Swagger UI index at the default route '/swagger' or
         # the optional route specified in the main class constructor
         index_path = self._url or '/swagger/index.html'
 
-        # Bind the view function that will serve index.html
+        # Bind the view function that will serve index.html, or the single
+        # document index with everything inlined
         self._app.add_url_rule(
             rule=index_path,
-            view_func=get_index,
+            view_func=self._wrap_view(
+                DocsRoute.INDEX,
+                self._get_inline_index
+                if self.is_inline
+                else get_index),
             methods=[Method.GET])
+
+    def _wrap_view(self, route: str, view_function):
+        '''
+        Apply the throttle and the metrics to a view function.  The metrics
+        are on the outside so throttled requests are recorded as well.  The
+        dependency route applies the throttle itself, once it's found the
+        dependency
+        '''
+
+        if self._throttle is not None and route != DocsRoute.RESOURCE:
+            view_function = self._throttle.limit(view_function)
+
+        if self._metrics is not None:
+            view_function = self._metrics.instrument(route, view_function)
+
+        return view_function
+
+
+def load_resources() -> dict:
+    '''Load Swagger dependencies to memory'''
+
+    import importlib.resources
+    import pickle
+
+    try:
+        # Loading the pickled Swagger UI JS, CSS and HTML files from
+        # the module source directory
+        with importlib.resources.open_binary(
+                DependencyInfo.PKG_RESOURCE_MODULE,
+                DependencyInfo.PKG_SWAGGER) as data:
+
+            return pickle.load(data)
+    except Exception as ex:
+        raise Exception(f'Failed to load Swagger dependencies: {str(ex)}')
+
+
+def index_resources() -> Union[Dict[str, Tuple[int, int]], None]:
+    '''
+    Index the offset and length of each dependency in the pickled bundle,
+    without loading the dependencies themselves: the bundle is scanned
+    opcode by opcode, skipping over the content.  Returns `None` if the
+    bundle isn't a plain pickled dictionary of names to bytes
+    '''
+
+    import importlib.resources
+
+    index = dict()
+    key = None
+
+    try:
+        with importlib.resources.open_binary(
+                DependencyInfo.PKG_RESOURCE_MODULE,
+                DependencyInfo.PKG_SWAGGER) as data:
+
+            while True:
+                opcode = data.read(1)
+
+                if opcode in _skipped_opcodes:
+                    data.seek(_skipped_opcodes[opcode], os.SEEK_CUR)
+
+                elif opcode in _string_opcodes:
+                    size = int.from_bytes(
+                        data.read(_string_opcodes[opcode]), 'little')
+                    key = data.read(size).decode('utf-8')
+
+                elif opcode in _bytes_opcodes:
+                    size = int.from_bytes(
+                        data.read(_bytes_opcodes[opcode]), 'little')
+                    if key is None:
+                        return None
+
+                    index[key] = (data.tell(), size)
+                    key = None
+                    data.seek(size, os.SEEK_CUR)
+
+                elif opcode == b'.':
+                    return index
+
+                # Anything else means the bundle isn't a flat dictionary
+                elif opcode not in _structure_opcodes:
+                    return None
+    except Exception as ex:
+        raise Exception(f'Failed to load Swagger dependencies: {str(ex)}')
+
+
+def read_resource(offset: int, length: int) -> bytes:
+    '''Read a single dependency from the bundle, at an offset from `index_resources`'''
+
+    import importlib.resources
+
+    try:
+        with importlib.resources.open_binary(
+                DependencyInfo.PKG_RESOURCE_MODULE,
+                DependencyInfo.PKG_SWAGGER) as data:
+
+            data.seek(offset)
+            return data.read(length)
+    except Exception as ex:
+        raise Exception(f'Failed to load Swagger dependencies: {str(ex)}')
+
+
+def get_fingerprinted_name(resource_name: str, content: bytes) -> str:
+    '''
+    Get the name of a dependency with a hash of its content before the
+    extension, i.e. `swagger-ui.3f2a1b9c0d4e.css`
+    '''
+
+    not_null(resource_name, 'resource_name')
+    not_null(content, 'content')
+
+    fingerprint = hashlib.sha256(content).hexdigest()[:12]
+
+    name, extension = os.path.splitext(resource_name)
+    return f'{name}.{fingerprint}{extension}'
+
+
+def get_asset_manifest(resources: dict) -> Dict[str, str]:
+    '''
+    Map the name of each dependency loaded by the index (everything but the
+    index itself) to its fingerprinted name
+    '''
+
+    return {
+        resource_name: get_fingerprinted_name(resource_name, content)
+        for resource_name, content in sorted(resources.items())
+        if resource_name != 'index.html'
+    }
+
+
+def export_assets(directory: str) -> Dict[str, str]:
+    '''
+    Write the Swagger UI dependencies to a directory under their
+    fingerprinted names, along with a `manifest.json` mapping the names to
+    the fingerprinted names, i.e. for upload to a CDN.  The index served
+    with `assets_url` references exactly these files, and a new version of
+    a dependency gets a new name, so the two can't get out of sync
+
+    params:
+    `directory`: the directory to write the assets to, created if it
+    doesn't exist
+
+    returns:
+    `dict`: the manifest
+    '''
+
+    not_null(directory, 'directory')
+
+    resources = load_resources()
+    manifest = get_asset_manifest(resources)
+
+    os.makedirs(directory, exist_ok=True)
+
+    for resource_name, fingerprinted_name in manifest.items():
+        with open(os.path.join(directory, fingerprinted_name), 'wb') as asset:
+            asset.write(resources[resource_name])
+
+    with open(os.path.join(directory, 'manifest.json'), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    return manifest
@@ -0,0 +1,367 @@
+from swagger_gen.lib.constants import ComponentType, ContentType, Schema
+from swagger_gen.lib.spec import (
+    SwaggerComponent,
+    SwaggerDocument,
+    SwaggerOperation,
+    SwaggerParameter,
+    SwaggerResponse
+)
+from swagger_gen.lib.utils import not_null
+from collections import Counter
+from typing import Dict, Tuple
+import json
+import re
+
+# Characters allowed in a component key by the OpenAPI spec
+_component_key_pattern = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class DictEmitter:
+    '''
+    Walk the `SwaggerDocument` and generate the spec as a dictionary in a
+    single pass
+
+    params:
+    `shared_components`: intern parameters and responses that are used by
+    more than one operation into `components/parameters` and
+    `components/responses` and reference them with `$ref`, instead of
+    repeating the same definition on every operation.  A value is only
+    interned when the references and its one definition are smaller than
+    the copies they replace
+    `canonical`: emit paths, methods, components, parameters and responses
+    in sorted order, and the keys of component models sorted, so the same
+    routes always produce the same output regardless of the order they
+    were registered in
+    '''
+
+    def __init__(
+            self,
+            shared_components: bool = False,
+            canonical: bool = False):
+
+        self._shared_components = shared_components
+        self._canonical = canonical
+
+        # Parameter and response values mapped to their component keys
+        self._shared_parameters: Dict[tuple, str] = dict()
+        self._shared_responses: Dict[tuple, str] = dict()
+
+    def emit(self, document: SwaggerDocument) -> dict:
+        '''
+        Generate the spec from the document
+
+        params:
+        `document`: the spec intermediate representation
+        '''
+
+        not_null(document, 'document')
+
+        if self._shared_components:
+            self._intern_components(document)
+
+        definition = dict(document.header)
+
+        definition[Schema.PATHS] = {
+            endpoint_literal: {
+                method: self._emit_operation(operation)
+                for method, operation in self._get_items(operations)
+            }
+            for endpoint_literal, operations in self._get_items(document.paths)
+        }
+
+        # The schemas section is always present, even if no request models
+        # are defined
+        components = {Schema.SCHEMAS: {}}
+        for component_type, section in self._get_items(document.components):
+            components[component_type] = {
+                key: self._emit_component(component)
+                for key, component in self._get_items(section)
+            }
+
+        if any(self._shared_parameters):
+            components[ComponentType.PARAMETERS] = {
+                key: self._emit_parameter(SwaggerParameter(*value))
+                for key, value in self._get_items({
+                    key: value for value, key in self._shared_parameters.items()
+                })
+            }
+
+        if any(self._shared_responses):
+            components[ComponentType.RESPONSES] = {
+                key: self._emit_response(SwaggerResponse(*value))
+                for key, value in self._get_items({
+                    key: value for value, key in self._shared_responses.items()
+                })
+            }
+
+        if self._canonical:
+            components = dict(sorted(components.items()))
+
+        definition[Schema.COMPONENTS] = components
+        return definition
+
+    def _emit_operation(self, operation: SwaggerOperation) -> dict:
+        '''Generate the method definition for an operation'''
+
+        method_definition = {
+            Schema.ENDPOINT_TAGS: [operation.tag]
+        }
+
+        parameters = operation.parameters
+        if self._canonical:
+            parameters = sorted(
+                parameters,
+                key=lambda x: (x.location, x.name))
+
+        if parameters:
+            method_definition[Schema.PARAMETERS] = [
+                self._emit_parameter_or_reference(parameter)
+                for parameter in parameters
+            ]
+
+        if operation.request_model_key is not None:
+            method_definition[Schema.REQUEST_BODY] = (
+                self._emit_model_reference(operation.request_model_key))
+
+        responses = operation.responses
+        if self._canonical:
+            responses = sorted(
+                responses,
+                key=lambda x: str(x.status_code))
+
+        method_definition[Schema.ENDPOINT_RESPONSES] = {
+            response.status_code: self._emit_response_or_reference(response)
+            for response in responses
+        }
+
+        if operation.description is not None:
+            method_definition[Schema.DESCRIPTION] = operation.description
+
+        if operation.summary is not None:
+            method_definition[Schema.SUMMARY] = operation.summary
+
+        if operation.security is not None:
+            scheme_name, scopes = operation.security
+            method_definition[Schema.SECURITY] = [{
+                scheme_name: scopes
+            }]
+
+        if operation.visibility is not None:
+            method_definition[Schema.VISIBILITY] = operation.visibility
+
+        return method_definition
+
+    def _emit_parameter_or_reference(self, parameter: SwaggerParameter) -> dict:
+        '''Generate a reference to the shared parameter if there is one'''
+
+        key = self._shared_parameters.get(self._get_parameter_value(parameter))
+        if key is not None:
+            return {
+                Schema.REF: f'#/components/{ComponentType.PARAMETERS}/{key}'
+            }
+
+        return self._emit_parameter(parameter)
+
+    def _emit_response_or_reference(self, response: SwaggerResponse) -> dict:
+        '''Generate a reference to the shared response if there is one'''
+
+        key = self._shared_responses.get(self._get_response_value(response))
+        if key is not None:
+            return {
+                Schema.REF: f'#/components/{ComponentType.RESPONSES}/{key}'
+            }
+
+        return self._emit_response(response)
+
+    def _emit_parameter(self, parameter: SwaggerParameter) -> dict:
+        '''Generate a path or query parameter definition'''
+
+        return {
+            Schema.NAME: parameter.name,
+            Schema.IN: parameter.location,
+            Schema.REQUIRED: parameter.required,
+            Schema.SCHEMA: {
+                Schema.PROPERTY_TYPE: 'string',
+                Schema.NULLABLE: False
+            }
+        }
+
+    def _emit_response(self, response: SwaggerResponse) -> dict:
+        '''Generate a response definition'''
+
+        return {
+            Schema.DESCRIPTION: response.description
+        }
+
+    def _emit_model_reference(self, component_key: str) -> dict:
+        '''Generate the request body reference to a model component'''
+
+        return {
+            Schema.CONTENT: {
+                ContentType.APPLICATION_JSON: {
+                    Schema.SCHEMA: {
+                        Schema.REF: f'#/components/schemas/{component_key}'
+                    }
+                }
+            }
+        }
+
+    def _emit_component(self, component: SwaggerComponent) -> dict:
+        '''Generate a component model'''
+
+        if self._canonical:
+            return _sort_keys(component.model)
+
+        return component.model
+
+    def _get_items(self, section: dict):
+        '''Iterate over a section of the document, sorted by key if canonical'''
+
+        if self._canonical:
+            return sorted(section.items())
+
+        return section.items()
+
+    def _intern_components(self, document: SwaggerDocument) -> None:
+        '''
+        Count the identical parameters and responses across all operations
+        and assign a component key to each one that makes the spec smaller
+        when it's referenced.  Anything else is left inline
+        '''
+
+        parameter_counts = Counter()
+        response_counts = Counter()
+
+        for operations in document.paths.values():
+            for operation in operations.values():
+                parameter_counts.update(
+                    self._get_parameter_value(parameter)
+                    for parameter in operation.parameters)
+                response_counts.update(
+                    self._get_response_value(response)
+                    for response in operation.responses)
+
+        self._shared_parameters = self._get_component_keys(
+            counts=parameter_counts,
+            component_type=ComponentType.PARAMETERS,
+            format_key=lambda value: (
+                f'{value[1]}.{value[0]}' if value[2]
+                else f'{value[1]}.{value[0]}.optional'),
+            emit_value=lambda value: self._emit_parameter(
+                SwaggerParameter(*value)))
+
+        self._shared_responses = self._get_component_keys(
+            counts=response_counts,
+            component_type=ComponentType.RESPONSES,
+            format_key=lambda value: f'{value[0]}.{value[1]}',
+            emit_value=lambda value: self._emit_response(
+                SwaggerResponse(*value)))
+
+    def _get_component_keys(
+            self,
+            counts: Counter,
+            component_type: str,
+            format_key,
+            emit_value) -> Dict[tuple, str]:
+        '''
+        Assign a unique, spec-safe component key to each value that's
+        cheaper to reference than to repeat, i.e. when every `$ref` plus the
+        one definition in the components is smaller than the inline copies
+        '''
+
+        keys = dict()
+        used_keys = set()
+        saved = 0
+
+        for value, count in counts.items():
+            if count < 2:
+                continue
+
+            key = _component_key_pattern.sub(
+                '_', str(format_key(value)))[:64]
+
+            # Values that only differ by characters that aren't allowed in a
+            # key will sanitize to the same key, so suffix the duplicates
+            unique_key, suffix = key, 1
+            while unique_key in used_keys:
+                suffix += 1
+                unique_key = f'{key}.{suffix}'
+
+            inline = emit_value(value)
+            inline_size = _get_size(inline)
+            reference_size = _get_size({
+                Schema.REF: f'#/components/{component_type}/{unique_key}'
+            })
+
+            # The definition is `"key":{...},` in the components section
+            definition_size = _get_size(unique_key) + inline_size + 2
+
+            difference = count * inline_size - (
+                count * reference_size + definition_size)
+
+            if difference <= 0:
+                continue
+
+            used_keys.add(unique_key)
+            keys[value] = unique_key
+            saved += difference
+
+        # The section itself (`"parameters":{},`) has to be paid for too
+        if saved <= _get_size(component_type) + 4:
+            return dict()
+
+        return keys
+
+    def _get_parameter_value(self, parameter: SwaggerParameter) -> Tuple[str, str, bool]:
+        return (parameter.name, parameter.location, parameter.required)
+
+    def _get_response_value(self, response: SwaggerResponse) -> Tuple[str, str]:
+        return (response.status_code, response.description)
+
+
+def _get_size(node) -> int:
+    '''Get the size of a node in the compact JSON encoding'''
+
+    return len(json.dumps(node, separators=(',', ':')).encode('utf-8'))
+
+
+def _sort_keys(node):
+    '''Copy the node with the keys of every object sorted'''
+
+    if isinstance(node, dict):
+        return {
+            key: _sort_keys(node[key])
+            for key in sorted(node)
+        }
+
+    if isinstance(node, list):
+        return [_sort_keys(value) for value in node]
+
+    return node
+
+
+class JsonEmitter(DictEmitter):
+    '''Generate the spec as UTF-8 encoded JSON'''
+
+    def emit(self, document: SwaggerDocument) -> bytes:
+        return json.dumps(
+            super().emit(document),
+            separators=(',', ':')).encode('utf-8')
+
+
+class YamlEmitter(DictEmitter):
+    '''
+    Generate the spec as YAML.  This requires `PyYAML`, which isn't a
+    dependency of the package and has to be installed separately
+    '''
+
+    def emit(self, document: SwaggerDocument) -> str:
+        try:
+            import yaml
+        except ImportError:
+            raise Exception(
+                'PyYAML must be installed to generate the spec as YAML')
+
+        return yaml.safe_dump(
+            super().emit(document),
+            sort_keys=False)
@@ -3,15 +3,43 @@ from swagger_gen.lib.utils import (
     not_null
 )
 from swagger_gen.lib.constants import Method
-from werkzeug.routing import Rule
-from typing import List
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from flask import Flask
+    from werkzeug.routing import Rule
+
+# Methods that aren't displayed in the Swagger UI
+HIDDEN_METHODS = frozenset([
+    Method.OPTIONS,
+    Method.HEAD
+])
 
 
 class SwaggerEndpoint:
-    def __init__(self, rule: Rule):
+    '''
+    Wraps a `werkzeug` `Rule`.  The derived values (tag, literal, methods,
+    etc) are parsed from the rule string on first access and memoized, so
+    repeated reads during the buildup don't re-split and re-scan the rule
+    '''
+
+    __slots__ = (
+        '_rule',
+        '_view_name',
+        '_endpoint_tag',
+        '_route_literal',
+        '_methods'
+    )
+
+    def __init__(self, rule: 'Rule'):
         not_null(rule, 'rule')
         self._rule = rule
 
+        self._view_name = None
+        self._endpoint_tag = None
+        self._route_literal = None
+        self._methods = None
+
     @property
     def view_function_name(self):
         ''' The name of the method that defines the route '''
@@ -20,17 +48,23 @@ class SwaggerEndpoint:
     @property
     def methods(self):
         ''' The allowed methods on the route '''
-        return self._get_methods()
+        if self._methods is None:
+            self._methods = self._get_methods()
+        return self._methods
 
     @property
     def component_key(self) -> str:
         '''Key linking the path and the component in the spec'''
-        return self._get_view_name()
+        if self._view_name is None:
+            self._view_name = self._get_view_name()
+        return self._view_name
 
     @property
     def endpoint_literal(self) -> str:
         ''' The endpoint name to display on the Swagger page '''
-        return self._format_route_literal()
+        if self._route_literal is None:
+            self._route_literal = self._format_route_literal()
+        return self._route_literal
 
     @property
     def segment_params(self):
@@ -40,7 +74,9 @@ class SwaggerEndpoint:
     @property
     def tag(self):
         ''' The section name that groups the endpoints in the Swagger UI '''
-        return self._get_endpoint_tag()
+        if self._endpoint_tag is None:
+            self._endpoint_tag = self._get_endpoint_tag()
+        return self._endpoint_tag
 
     def _get_view_name(self) -> str:
         '''Get the formatted view name, removing blueprint prefixes'''
@@ -112,9 +148,45 @@ class SwaggerEndpoint:
     def _get_methods(self) -> List[str]:
         '''Get display methods, ignoring OPTIONS and HEAD'''
 
-        return ([
+        # The rule methods are a set, so they're sorted to keep the order the
+        # same across processes
+        return sorted(
             method for method in self._rule.methods
-            if method not in [
-                Method.OPTIONS,
-                Method.HEAD]
-        ])
+            if method not in HIDDEN_METHODS)
+
+
+def get_swagger_endpoints(app: 'Flask', exclude_routes: List[str] = None) -> List[SwaggerEndpoint]:
+    '''
+    Parse the endpoints from the `werkzeug` `Rule` definitions
+    in the Flask app
+
+    params:
+    `app`: the Flask app
+    `exclude_routes`: additional route keys to exclude from the documentation
+    '''
+
+    not_null(app, 'app')
+
+    # TODO Feature to define custom exclusions
+
+    # Default keys to exclude from list of endpoints to generate definitions
+    exclusion_keys = ['swagger', 'static']
+
+    # Allow addition route exclusions if required.  Anything specified here
+    # will not be displayed in the documentation
+    if (exclude_routes is not None
+        and isinstance(exclude_routes, list)
+            and len(exclude_routes) > 0):
+        exclusion_keys.extend(exclude_routes)
+
+    endpoints = []
+
+    # Fetch the endpoints from the mapped rules in the Flask app
+    for rule in app.url_map.iter_rules():
+        # If the endpoint is not in the list of excluded routes
+        if not any([x for x in exclusion_keys if x in rule.rule]):
+            endpoint = SwaggerEndpoint(
+                rule=rule)
+            endpoints.append(endpoint)
+
+    return endpoints
@@ -0,0 +1,418 @@
+from swagger_gen.lib.constants import ComponentType, Schema
+from swagger_gen.lib.spec import merge_components
+from swagger_gen.lib.utils import is_type, not_null
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple, Union
+from urllib.parse import urlsplit
+import copy
+import gzip
+import http.client
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Upstream:
+    '''
+    A remote service exposing a Swagger spec, i.e. another app running
+    swagger-gen
+
+    params:
+    `name`: the name of the service, used to rename conflicting components
+    `url`: the URL of the spec, i.e. `http://users:5000/swagger/v1/swagger.json`
+    `path_prefix`: the path the service's routes are exposed under on the
+    gateway, the paths in the spec are prefixed with it
+    `ttl`: how long (in seconds) the fetched spec is used before checking the
+    service for changes
+    '''
+
+    __slots__ = (
+        'name',
+        'url',
+        'path_prefix',
+        'ttl',
+        'etag',
+        'content',
+        'definition',
+        'expires_at'
+    )
+
+    def __init__(
+            self,
+            name: str,
+            url: str,
+            path_prefix: str = '',
+            ttl: float = 60):
+
+        not_null(name, 'name')
+        not_null(url, 'url')
+        is_type(name, 'name', str)
+        is_type(url, 'url', str)
+        is_type(path_prefix, 'path_prefix', str)
+        is_type(ttl, 'ttl', (int, float))
+
+        self.name = name
+        self.url = url
+        self.path_prefix = path_prefix.rstrip('/')
+        self.ttl = ttl
+
+        # The cached spec and the validator used to check it for changes
+        self.etag: Union[str, None] = None
+        self.content: Union[bytes, None] = None
+        self.definition: Union[dict, None] = None
+
+        # Expired from the start, so the first refresh fetches everything
+        self.expires_at = 0.0
+
+
+class ConnectionPool:
+    '''
+    A bounded pool of keep-alive HTTP connections.  At most `max_connections`
+    requests are in flight at once across all hosts, and idle connections
+    are reused for the next request to the same host
+
+    params:
+    `max_connections`: the maximum number of concurrent connections
+    `timeout`: the connection and read timeout, in seconds
+    '''
+
+    def __init__(
+            self,
+            max_connections: int = 10,
+            timeout: float = 5.0):
+
+        self._timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+        # Idle connections, keyed by scheme and host
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = dict()
+        self._idle_lock = threading.Lock()
+
+    def get(self, url: str, headers: dict) -> Tuple[int, dict, bytes]:
+        '''
+        Send a GET request
+
+        returns:
+        `tuple`: the status code, the response headers (lower-cased) and the
+        response body
+        '''
+
+        parts = urlsplit(url)
+        host = (parts.scheme, parts.netloc)
+
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        with self._slots:
+            connection, reused = self._acquire(host)
+
+            try:
+                response = self._send(connection, path, headers)
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+
+                # An idle connection may have been closed by the server since
+                # it was last used, so retry once on a new connection
+                if not reused:
+                    raise
+
+                connection = self._connect(host)
+                try:
+                    response = self._send(connection, path, headers)
+                except Exception:
+                    connection.close()
+                    raise
+            except Exception:
+                connection.close()
+                raise
+
+            status, response_headers, body, will_close = response
+
+            if will_close:
+                connection.close()
+            else:
+                self._release(host, connection)
+
+            return status, response_headers, body
+
+    def close(self) -> None:
+        '''Close all idle connections'''
+
+        with self._idle_lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+    def _send(self, connection, path: str, headers: dict) -> tuple:
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+
+        response_headers = {
+            key.lower(): value
+            for key, value in response.getheaders()
+        }
+
+        return response.status, response_headers, body, response.will_close
+
+    def _acquire(self, host: Tuple[str, str]) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._idle_lock:
+            connections = self._idle.get(host)
+            if connections:
+                return connections.pop(), True
+
+        return self._connect(host), False
+
+    def _release(self, host: Tuple[str, str], connection: http.client.HTTPConnection) -> None:
+        with self._idle_lock:
+            self._idle.setdefault(host, []).append(connection)
+
+    def _connect(self, host: Tuple[str, str]) -> http.client.HTTPConnection:
+        scheme, netloc = host
+
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self._timeout)
+        return http.client.HTTPConnection(netloc, timeout=self._timeout)
+
+
+class SpecFederation:
+    '''
+    Fetches the specs of the upstream services concurrently and merges them
+    into a single spec.  Each fetched spec is cached until its TTL expires,
+    after which the service is asked for the spec again with the cached
+    `ETag` in `If-None-Match`.  A refresh only reports a change when one of
+    the specs actually changed, so the merged spec is only rebuilt then.
+    If a service can't be reached, its last fetched spec keeps being used
+
+    params:
+    `upstreams`: the upstream services
+    `max_connections`: the maximum number of concurrent fetches
+    `timeout`: the fetch timeout, in seconds
+    '''
+
+    def __init__(
+            self,
+            upstreams: List[Upstream],
+            max_connections: int = 10,
+            timeout: float = 5.0):
+
+        is_type(upstreams, 'upstreams', list)
+
+        if not upstreams:
+            raise Exception("'upstreams' must list at least one upstream")
+
+        # Copied, so the refresh delay always has an upstream to go by
+        self._upstreams = list(upstreams)
+        self._max_connections = max_connections
+        self._pool = ConnectionPool(
+            max_connections=max_connections,
+            timeout=timeout)
+
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def refresh(self) -> bool:
+        '''
+        Fetch the specs of any upstreams whose cached spec has expired
+
+        returns:
+        `bool`: whether any of the specs changed
+        '''
+
+        with self._refresh_lock:
+            now = time.monotonic()
+            expired = [
+                upstream for upstream in self._upstreams
+                if upstream.expires_at <= now
+            ]
+
+            if not any(expired):
+                return False
+
+            with ThreadPoolExecutor(
+                    max_workers=min(len(expired), self._max_connections),
+                    thread_name_prefix='swagger-gen-federation') as executor:
+                changes = list(executor.map(self._fetch, expired))
+
+            return any(changes)
+
+    def merge(self, definition: dict) -> dict:
+        '''
+        Merge the cached upstream specs into the definition.  The paths of each
+        upstream are prefixed with its path prefix.  Identical components are
+        only included once, a component with the same key as an existing one
+        but a different model is renamed with the upstream name and the
+        references to it are updated
+
+        params:
+        `definition`: the definition to merge the specs into, i.e. the spec of
+        the gateway itself.  It isn't modified
+
+        returns:
+        `dict`: the merged definition
+        '''
+
+        not_null(definition, 'definition')
+
+        merged = copy.deepcopy(definition)
+        merged.setdefault(Schema.PATHS, dict())
+        merged.setdefault(Schema.COMPONENTS, dict())
+
+        for upstream in self._upstreams:
+            # Nothing has been fetched from the upstream yet
+            if upstream.definition is None:
+                continue
+
+            self._merge_upstream(merged, upstream)
+
+        return merged
+
+    def start(self, on_change: Callable[[], None]) -> None:
+        '''
+        Refresh the upstream specs in the background as they expire and call
+        `on_change` when any of them change
+        '''
+
+        not_null(on_change, 'on_change')
+
+        def watch():
+            while not self._stopped.wait(self._get_refresh_delay()):
+                try:
+                    if self.refresh():
+                        on_change()
+                except Exception:
+                    logger.exception('Failed to refresh the federated spec')
+
+        worker = threading.Thread(
+            target=watch,
+            name='swagger-gen-federation-refresh',
+            daemon=True)
+        worker.start()
+
+    def stop(self) -> None:
+        '''Stop refreshing the upstream specs and close the connections'''
+
+        self._stopped.set()
+        self._pool.close()
+
+    def _get_refresh_delay(self) -> float:
+        '''Time until the next upstream spec expires, at least a second'''
+
+        next_expiry = min(
+            upstream.expires_at for upstream in self._upstreams)
+
+        return max(next_expiry - time.monotonic(), 1.0)
+
+    def _fetch(self, upstream: Upstream) -> bool:
+        '''Fetch the spec from an upstream, returns whether it changed'''
+
+        headers = {
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip'
+        }
+
+        if upstream.etag is not None:
+            headers['If-None-Match'] = upstream.etag
+
+        try:
+            status, response_headers, body = self._pool.get(
+                url=upstream.url,
+                headers=headers)
+
+            # Unchanged since the last fetch
+            if status == 304:
+                return False
+
+            if status != 200:
+                raise Exception(f'Unexpected status code {status}')
+
+            if response_headers.get('content-encoding') == 'gzip':
+                body = gzip.decompress(body)
+
+            upstream.etag = response_headers.get('etag')
+
+            # A service that doesn't support ETags sends the whole spec every
+            # time, so compare the content as well
+            if body == upstream.content:
+                return False
+
+            upstream.definition = json.loads(body)
+            upstream.content = body
+            return True
+
+        except Exception as ex:
+            logger.warning(
+                f"Failed to fetch the spec for upstream '{upstream.name}': {str(ex)}")
+            return False
+
+        finally:
+            upstream.expires_at = time.monotonic() + upstream.ttl
+
+    def _merge_upstream(self, merged: dict, upstream: Upstream) -> None:
+        '''
+        Merge the spec of a single upstream into the merged definition.  The
+        nodes are copied as they're merged, so the merged definition never
+        shares anything with the cached spec of the upstream
+        '''
+
+        source = upstream.definition
+        components = merged[Schema.COMPONENTS]
+
+        # Work out the renamed components first, so the references in both
+        # the paths and the components themselves can be updated
+        additions, renamed_keys = merge_components(
+            existing=components,
+            incoming=source.get(Schema.COMPONENTS) or {},
+            namespace=upstream.name)
+
+        renamed = {
+            f'#/components/{component_type}/{key}': f'#/components/{component_type}/{merged_key}'
+            for (component_type, key), merged_key in renamed_keys.items()
+        }
+
+        # Security requirements reference the scheme by name
+        renamed_schemes = {
+            key: merged_key
+            for (component_type, key), merged_key in renamed_keys.items()
+            if component_type == ComponentType.SECURITY_SCHEMES
+        }
+
+        for component_type, key, model in additions:
+            components.setdefault(component_type, dict())[key] = _rewrite_references(
+                model, renamed)
+
+        for endpoint_literal, path_item in (source.get(Schema.PATHS) or {}).items():
+            path_item = _rewrite_references(path_item, renamed)
+
+            if any(renamed_schemes):
+                for operation in path_item.values():
+                    if isinstance(operation, dict) and Schema.SECURITY in operation:
+                        operation[Schema.SECURITY] = [
+                            {renamed_schemes.get(name, name): scopes
+                             for name, scopes in requirement.items()}
+                            for requirement in operation[Schema.SECURITY]
+                        ]
+
+            merged[Schema.PATHS][f'{upstream.path_prefix}{endpoint_literal}'] = path_item
+
+
+def _rewrite_references(node, renamed: dict):
+    '''Copy the node, replacing any renamed component references'''
+
+    if isinstance(node, dict):
+        return {
+            key: (renamed.get(value, value)
+                  if key == Schema.REF and isinstance(value, str)
+                  else _rewrite_references(value, renamed))
+            for key, value in node.items()
+        }
+
+    if isinstance(node, list):
+        return [_rewrite_references(value, renamed) for value in node]
+
+    return node
@@ -0,0 +1,628 @@
+from swagger_gen.lib.constants import (
+    ContentType,
+    Method,
+    ParameterType,
+    Schema
+)
+from swagger_gen.lib.mock import get_content_schema, get_example, resolve_reference
+from swagger_gen.lib.utils import is_type, not_null
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple, Union
+from urllib.parse import quote, urlencode, urljoin, urlsplit
+import http.client
+import io
+import json
+import math
+import re
+import socket
+import sys
+import threading
+import time
+
+# Operations are driven in this order, so the report is stable
+_operation_methods = (
+    Method.GET,
+    Method.POST,
+    Method.PUT,
+    Method.PATCH,
+    Method.DELETE
+)
+
+# The URLs the Swagger UI index loads: its stylesheets, scripts and icons,
+# and the spec.  Only the attributes of the elements are matched, not any
+# markup in the strings of inlined scripts
+_index_reference_pattern = re.compile(
+    r'<(?:link|script|img)\b[^>]*?\b(?:href|src)="([^"]+)"|\burl: "([^"]+)"')
+
+# Example values for path and query parameters
+_parameter_examples = {
+    'integer': '1',
+    'number': '1',
+    'boolean': 'true'
+}
+
+
+class SyntheticRequest:
+    '''
+    A request synthesized for an operation in the spec.  Requests for the
+    same operation are reported together under the operation name, i.e.
+    `GET /users/{user_id}`
+    '''
+
+    __slots__ = (
+        'operation',
+        'method',
+        'path',
+        'query',
+        'body',
+        'headers'
+    )
+
+    def __init__(
+            self,
+            operation: str,
+            method: str,
+            path: str,
+            query: str = '',
+            body: bytes = b'',
+            headers: Union[Dict[str, str], None] = None):
+
+        self.operation = operation
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.headers = headers or dict()
+
+
+def get_docs_paths(index: bytes, index_url: str = '/swagger') -> List[str]:
+    '''
+    Get the paths a browser requests from the server to load the Swagger UI
+    index: the index itself, the spec and the assets it references.  Assets
+    on another host (i.e. with `assets_url`) and inlined ones aren't
+    requested from the server, so they aren't included
+
+    params:
+    `index`: the served index document
+    `index_url`: the path the index was served from, relative references
+    are resolved against it
+    '''
+
+    not_null(index, 'index')
+    is_type(index, 'index', bytes)
+    is_type(index_url, 'index_url', str)
+
+    paths = [index_url]
+
+    for match in _index_reference_pattern.finditer(index.decode('utf-8')):
+        url = urlsplit(urljoin(index_url, match.group(1) or match.group(2)))
+
+        if url.scheme or url.netloc or not url.path:
+            continue
+
+        path = f'{url.path}?{url.query}' if url.query else url.path
+        if path not in paths:
+            paths.append(path)
+
+    return paths
+
+
+def synthesize_requests(
+        definition: dict,
+        docs_paths: Union[List[str], None] = None,
+        headers: Union[Dict[str, str], None] = None) -> List[SyntheticRequest]:
+    '''
+    Synthesize a valid request for every operation in the spec.  Path
+    parameters and required query parameters are filled in with example
+    values, and request bodies with an example of the request model
+
+    params:
+    `definition`: the spec, i.e. from `SwaggerDefinition.get_definition()`
+    `docs_paths`: paths to request along with the operations, i.e. the
+    index, the spec and the assets from `get_docs_paths`
+    `headers`: headers to send with every request, i.e. `Authorization`
+    '''
+
+    not_null(definition, 'definition')
+    is_type(definition, 'definition', dict)
+    is_type(docs_paths, 'docs_paths', list)
+
+    headers = dict(headers or {})
+    headers.setdefault('Accept-Encoding', 'gzip')
+
+    requests = list()
+
+    for endpoint_literal, path_item in (definition.get(Schema.PATHS) or {}).items():
+        for method in _operation_methods:
+            operation = path_item.get(method.lower())
+            if operation is None:
+                continue
+
+            requests.append(_synthesize_request(
+                definition=definition,
+                endpoint_literal=endpoint_literal,
+                method=method,
+                operation=operation,
+                parameters=(path_item.get(Schema.PARAMETERS) or [])
+                + (operation.get(Schema.PARAMETERS) or []),
+                headers=headers))
+
+    for docs_path in docs_paths or []:
+        path, _, query = docs_path.partition('?')
+
+        requests.append(SyntheticRequest(
+            operation=f'{Method.GET} {path}',
+            method=Method.GET,
+            path=path,
+            query=query,
+            headers=headers))
+
+    return requests
+
+
+def _synthesize_request(
+        definition: dict,
+        endpoint_literal: str,
+        method: str,
+        operation: dict,
+        parameters: List[dict],
+        headers: Dict[str, str]) -> SyntheticRequest:
+    '''Synthesize the request for a single operation'''
+
+    path = endpoint_literal
+    query = dict()
+
+    for parameter in parameters:
+        parameter = resolve_reference(definition, parameter)
+        name = parameter.get(Schema.NAME)
+        schema = resolve_reference(
+            definition, parameter.get(Schema.SCHEMA) or {})
+
+        value = _parameter_examples.get(
+            schema.get(Schema.PROPERTY_TYPE), '1')
+        if schema.get('enum'):
+            value = str(schema['enum'][0])
+
+        if parameter.get(Schema.IN) == ParameterType.PATH:
+            path = path.replace(f'{{{name}}}', quote(value, safe=''))
+
+        elif (parameter.get(Schema.IN) == ParameterType.QUERY
+              and parameter.get(Schema.REQUIRED)):
+            query[name] = value
+
+    request_headers = dict(headers)
+    body = b''
+
+    schema = get_content_schema(
+        definition, operation.get(Schema.REQUEST_BODY) or {})
+    if schema is not None:
+        body = json.dumps(
+            get_example(definition, schema),
+            separators=(',', ':')).encode('utf-8')
+        request_headers['Content-Type'] = ContentType.APPLICATION_JSON
+
+    return SyntheticRequest(
+        operation=f'{method} {endpoint_literal}',
+        method=method,
+        path=path,
+        query=urlencode(query),
+        body=body,
+        headers=request_headers)
+
+
+class WsgiTransport:
+    '''
+    Sends requests to a WSGI app in-process, without a server or sockets.
+    The environ of each request is built once, so only the app is measured
+
+    params:
+    `wsgi_app`: the WSGI app, i.e. `app.wsgi_app` or `app`
+    '''
+
+    def __init__(self, wsgi_app: Callable):
+        not_null(wsgi_app, 'wsgi_app')
+
+        self._wsgi_app = wsgi_app
+        self._environs: Dict[int, dict] = dict()
+
+    def send(self, request: SyntheticRequest) -> Tuple[int, int]:
+        '''Send a request, returns the status code and the body size'''
+
+        environ = self._environs.get(id(request))
+        if environ is None:
+            environ = self._environs[id(request)] = self._create_environ(request)
+
+        environ = dict(environ)
+        environ['wsgi.input'] = io.BytesIO(request.body)
+
+        status = list()
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(status_line)
+
+        result = self._wsgi_app(environ, start_response)
+        try:
+            size = sum(len(chunk) for chunk in result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        return int(status[0].split(' ', 1)[0]), size
+
+    def close(self) -> None:
+        pass
+
+    def _create_environ(self, request: SyntheticRequest) -> dict:
+        environ = {
+            'REQUEST_METHOD': request.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': request.path,
+            'QUERY_STRING': request.query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_HOST': 'localhost',
+            'CONTENT_LENGTH': str(len(request.body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+
+        for name, value in request.headers.items():
+            key = name.upper().replace('-', '_')
+            if key == 'CONTENT_TYPE':
+                environ[key] = value
+            else:
+                environ[f'HTTP_{key}'] = value
+
+        return environ
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    '''An HTTP connection over a unix socket'''
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class HttpTransport:
+    '''
+    Sends requests to a running server over HTTP, with a keep-alive
+    connection per worker thread
+
+    params:
+    `url`: the base URL of the server, i.e. `http://127.0.0.1:5000`, or
+    `unix:///path/to/socket` for a unix socket
+    `timeout`: the connection and read timeout, in seconds
+    '''
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        not_null(url, 'url')
+        is_type(url, 'url', str)
+
+        parts = urlsplit(url)
+
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._timeout = timeout
+        self._local = threading.local()
+
+        # The whole URL is the path of a unix socket, otherwise the path is
+        # the prefix of every request path
+        self._socket_path = None
+        self._path_prefix = parts.path.rstrip('/')
+        if parts.scheme == 'unix':
+            self._socket_path = parts.path
+            self._path_prefix = ''
+
+        self._connections: List[http.client.HTTPConnection] = list()
+        self._connections_lock = threading.Lock()
+
+    def send(self, request: SyntheticRequest) -> Tuple[int, int]:
+        '''Send a request, returns the status code and the body size'''
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+
+        path = f'{self._path_prefix}{request.path}'
+        if request.query:
+            path = f'{path}?{request.query}'
+
+        try:
+            connection.request(
+                request.method,
+                path,
+                body=request.body or None,
+                headers=request.headers)
+            response = connection.getresponse()
+            size = len(response.read())
+        except Exception:
+            # Reconnect on the next request
+            connection.close()
+            self._local.connection = None
+            raise
+
+        return response.status, size
+
+    def fetch(self, path: str) -> bytes:
+        '''Get the body of a path on the server, i.e. the spec'''
+
+        connection = self._connect()
+        try:
+            connection.request(Method.GET, f'{self._path_prefix}{path}')
+            response = connection.getresponse()
+            body = response.read()
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            raise Exception(
+                f'Failed to fetch {path}, the server returned {response.status}')
+
+        return body
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._socket_path is not None:
+            connection = _UnixConnection(self._socket_path, self._timeout)
+        elif self._scheme == 'https':
+            connection = http.client.HTTPSConnection(
+                self._netloc, timeout=self._timeout)
+        else:
+            connection = http.client.HTTPConnection(
+                self._netloc, timeout=self._timeout)
+
+        with self._connections_lock:
+            self._connections.append(connection)
+
+        return connection
+
+
+class OperationResult:
+    '''The latencies and outcomes of the requests for a single operation'''
+
+    __slots__ = (
+        'operation',
+        'latencies',
+        'errors',
+        'status_codes',
+        'bytes'
+    )
+
+    def __init__(self, operation: str):
+        self.operation = operation
+
+        # Seconds per request, sorted once the run is over
+        self.latencies: List[float] = list()
+        self.errors = 0
+        self.status_codes: Dict[int, int] = dict()
+        self.bytes = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    def get_percentile(self, percentile: float) -> float:
+        '''Get a latency percentile (nearest rank), in seconds'''
+
+        if not self.latencies:
+            return 0.0
+
+        rank = math.ceil(percentile / 100 * len(self.latencies))
+        return self.latencies[max(rank - 1, 0)]
+
+    def merge(self, other: 'OperationResult') -> None:
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.bytes += other.bytes
+
+        for status_code, count in other.status_codes.items():
+            self.status_codes[status_code] = (
+                self.status_codes.get(status_code, 0) + count)
+
+
+class LoadReport:
+    '''The results of a load run, per operation and overall'''
+
+    def __init__(
+            self,
+            operations: Dict[str, OperationResult],
+            elapsed: float,
+            concurrency: int):
+
+        self.operations = operations
+        self.elapsed = elapsed
+        self.concurrency = concurrency
+
+    @property
+    def requests(self) -> int:
+        return sum(result.requests for result in self.operations.values())
+
+    @property
+    def throughput(self) -> float:
+        '''Requests per second across all operations'''
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def to_text(self) -> str:
+        '''Format the report for display'''
+
+        def milliseconds(seconds):
+            return f'{seconds * 1000:9.2f}'
+
+        lines = [
+            f'{self.requests:,} requests in {self.elapsed:.2f}s with '
+            f'{self.concurrency} workers, {self.throughput:,.0f} req/s',
+            '',
+            f'{"req/s":>10} {"p50 ms":>9} {"p90 ms":>9} {"p99 ms":>9} '
+            f'{"max ms":>9} {"errors":>7}  operation'
+        ]
+
+        for operation, result in sorted(self.operations.items()):
+            throughput = result.requests / self.elapsed if self.elapsed else 0.0
+            status_codes = ', '.join(
+                f'{status_code} x {count:,}'
+                for status_code, count in sorted(result.status_codes.items()))
+
+            lines.append(
+                f'{throughput:>10,.0f} '
+                f'{milliseconds(result.get_percentile(50))} '
+                f'{milliseconds(result.get_percentile(90))} '
+                f'{milliseconds(result.get_percentile(99))} '
+                f'{milliseconds(result.get_percentile(100))} '
+                f'{result.errors:>7,}  {operation} ({status_codes})')
+
+        return '\n'.join(lines)
+
+
+class LoadGenerator:
+    '''
+    Drives synthesized requests against an app from a pool of worker
+    threads and measures the latency of each request.  Each worker cycles
+    through all of the requests, starting at a different one, until the
+    duration or the number of requests is reached.  Responses with a `5xx`
+    status code and requests that raise are counted as errors
+
+    params:
+    `transport`: how the requests are sent, a `WsgiTransport` or an
+    `HttpTransport`
+    `requests`: the requests to send, i.e. from `synthesize_requests`
+    `concurrency`: the number of worker threads
+    '''
+
+    def __init__(
+            self,
+            transport: Union[WsgiTransport, HttpTransport],
+            requests: List[SyntheticRequest],
+            concurrency: int = 8):
+
+        not_null(transport, 'transport')
+        not_null(requests, 'requests')
+        is_type(requests, 'requests', list)
+        is_type(concurrency, 'concurrency', int)
+
+        if not any(requests):
+            raise Exception('There are no requests to send')
+
+        self._transport = transport
+        self._requests = requests
+        self._concurrency = concurrency
+
+    def run(
+            self,
+            duration: Union[float, None] = 10.0,
+            max_requests: Union[int, None] = None,
+            warmup: int = 1) -> LoadReport:
+        '''
+        Run the load
+
+        params:
+        `duration`: how long to run for, in seconds
+        `max_requests`: stop after this many requests per worker
+        `warmup`: the number of passes through the requests to make before
+        the measurements start, so the first requests don't include any lazy
+        loading in the app
+        '''
+
+        if duration is None and max_requests is None:
+            raise Exception(
+                "Either 'duration' or 'max_requests' must be provided")
+
+        for _ in range(warmup):
+            for request in self._requests:
+                try:
+                    self._transport.send(request)
+                except Exception:
+                    pass
+
+        started = time.perf_counter()
+        deadline = started + duration if duration is not None else math.inf
+
+        try:
+            with ThreadPoolExecutor(
+                    max_workers=self._concurrency,
+                    thread_name_prefix='swagger-gen-load') as executor:
+                results = list(executor.map(
+                    lambda worker: self._work(worker, deadline, max_requests),
+                    range(self._concurrency)))
+        finally:
+            self._transport.close()
+
+        elapsed = time.perf_counter() - started
+
+        # Each worker records its own results, they're only combined here
+        operations: Dict[str, OperationResult] = dict()
+        for worker_results in results:
+            for operation, result in worker_results.items():
+                existing = operations.get(operation)
+                if existing is None:
+                    operations[operation] = result
+                else:
+                    existing.merge(result)
+
+        for result in operations.values():
+            result.latencies.sort()
+
+        return LoadReport(
+            operations=operations,
+            elapsed=elapsed,
+            concurrency=self._concurrency)
+
+    def _work(
+            self,
+            worker: int,
+            deadline: float,
+            max_requests: Union[int, None]) -> Dict[str, OperationResult]:
+
+        results: Dict[str, OperationResult] = dict()
+        request_count = len(self._requests)
+        send = self._transport.send
+        clock = time.perf_counter
+
+        index = worker % request_count
+        sent = 0
+
+        while max_requests is None or sent < max_requests:
+            request = self._requests[index]
+            index = (index + 1) % request_count
+            sent += 1
+
+            result = results.get(request.operation)
+            if result is None:
+                result = results[request.operation] = OperationResult(
+                    request.operation)
+
+            started = clock()
+            try:
+                status_code, size = send(request)
+            except Exception:
+                status_code, size = 0, 0
+
+            finished = clock()
+            result.latencies.append(finished - started)
+            result.bytes += size
+            result.status_codes[status_code] = (
+                result.status_codes.get(status_code, 0) + 1)
+
+            if status_code == 0 or status_code >= 500:
+                result.errors += 1
+
+            if finished >= deadline:
+                break
+
+        return results
@@ -0,0 +1,132 @@
+from swagger_gen.lib.metadata import METADATA_KEYS, EndpointMetadata
+from swagger_gen.lib.utils import is_type, not_null
+from typing import Dict, Union
+import json
+
+# The manifest is keyed by the full endpoint name, so the blueprint keys of
+# the decorator don't apply.  `response` isn't used by the build
+MANIFEST_KEYS = METADATA_KEYS - frozenset(['blueprint', 'response'])
+
+# The type of each metadata value.  Tuples are lists once they've been
+# through JSON or YAML
+_value_types = {
+    'query_params': list,
+    'summary': str,
+    'description': str,
+    'request_model': dict,
+    'response_model': list,
+    'security': str,
+    'scopes': list,
+    'visibility': str
+}
+
+
+class MetadataManifest:
+    '''
+    The metadata of many endpoints declared in one place, instead of with
+    `@swagger_metadata` on each view function.  The manifest is keyed by the
+    endpoint name Flask gives the route (the view function name, prefixed
+    with `blueprint.` on a blueprint), and each entry takes the same
+    parameters as the decorator:
+
+    ```python
+    manifest = MetadataManifest({
+        'get_users': {'summary': 'List users', 'query_params': ['page']},
+        'admin.wipe': {'visibility': 'admin'}
+    })
+    ```
+
+    The whole manifest is validated in a single pass when it's created, and
+    indexed by endpoint name, so the build looks each endpoint up with one
+    dictionary lookup.  Nothing runs when the view functions are imported.
+    Entries in the manifest take precedence over `@swagger_metadata`
+
+    params:
+    `entries`: the metadata keyed by endpoint name
+    '''
+
+    def __init__(self, entries: Dict[str, dict]):
+        not_null(entries, 'entries')
+        is_type(entries, 'entries', dict)
+
+        self._metadata: Dict[str, EndpointMetadata] = dict()
+
+        for view_function_name, metadata in entries.items():
+            not_null(view_function_name, 'view_function_name')
+            is_type(view_function_name, 'view_function_name', str)
+
+            self._metadata[view_function_name] = EndpointMetadata(
+                view_function=view_function_name,
+                metadata=_validate_entry(view_function_name, metadata))
+
+    def get(self, view_function_name: str) -> Union[EndpointMetadata, None]:
+        '''
+        Get the metadata for an endpoint, `None` if it isn't in the manifest
+
+        params:
+        `view_function_name`: the endpoint name
+        '''
+
+        return self._metadata.get(view_function_name)
+
+    def __contains__(self, view_function_name: str) -> bool:
+        return view_function_name in self._metadata
+
+    def __len__(self) -> int:
+        return len(self._metadata)
+
+
+def load_metadata_manifest(path: str) -> MetadataManifest:
+    '''
+    Load a manifest from a JSON or YAML file.  Files ending in `.yaml` or
+    `.yml` are read as YAML, which requires `PyYAML`, anything else as JSON
+
+    params:
+    `path`: the path of the manifest file
+    '''
+
+    not_null(path, 'path')
+    is_type(path, 'path', str)
+
+    with open(path, 'r', encoding='utf-8') as file:
+        if not path.lower().endswith(('.yaml', '.yml')):
+            return MetadataManifest(json.load(file))
+
+        try:
+            import yaml
+        except ImportError:
+            raise Exception(
+                'PyYAML must be installed to load a YAML metadata manifest')
+
+        return MetadataManifest(yaml.safe_load(file))
+
+
+def _validate_entry(view_function_name: str, metadata: dict) -> dict:
+    '''Validate the metadata of a single endpoint in the manifest'''
+
+    is_type(metadata, view_function_name, dict, null=False)
+
+    invalid_keys = [
+        key for key in metadata
+        if key not in MANIFEST_KEYS
+    ]
+
+    if any(invalid_keys):
+        invalid_params = ', '.join(invalid_keys)
+        raise Exception(
+            f"Invalid Swagger metadata parameter(s) for '{view_function_name}': {invalid_params}")
+
+    for key, value in metadata.items():
+        is_type(value, f'{view_function_name}.{key}', _value_types[key])
+
+    for query_param in metadata.get('query_params') or []:
+        not_null(query_param, f'{view_function_name}.query_params')
+        is_type(query_param, f'{view_function_name}.query_params', str)
+
+    for descriptor in metadata.get('response_model') or []:
+        if not isinstance(descriptor, (list, tuple)) or len(descriptor) != 2:
+            raise Exception(
+                f"Invalid response definition for '{view_function_name}'.  Each response "
+                'must be a status code and a description')
+
+    return metadata
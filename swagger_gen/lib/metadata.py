@@ -6,10 +6,26 @@ from typing import (
     Union
 )
 
+# Parameters accepted by the metadata decorator
+METADATA_KEYS = frozenset([
+    'query_params',
+    'summary',
+    'description',
+    'response',
+    'blueprint',
+    'request_model',
+    'response_model',
+    'security',
+    'scopes',
+    'visibility'
+])
+
 
 class EndpointMetadata:
-    def __init__(self, view_function, metadata):
-        self.function_key = view_function.__name__
+    def __init__(self, view_function: Union[Callable, str], metadata):
+        # Metadata from a manifest only has the endpoint name
+        self.function_key = (view_function if isinstance(view_function, str)
+                             else view_function.__name__)
         self._validate_metadata_params(metadata)
         self.metadata = metadata
 
@@ -53,21 +69,15 @@ class EndpointMetadata:
         '''Scopes for OAuth security scheme'''
         return self.metadata.get('scopes') or False
 
-    def _validate_metadata_params(self, metadata: dict) -> None:
-        meta_keys = [
-            'query_params',
-            'summary',
-            'description',
-            'response',
-            'blueprint',
-            'request_model',
-            'response_model',
-            'security',
-            'scopes']
+    @property
+    def visibility(self) -> Union[str, bool]:
+        '''The least privileged audience that can see the endpoint'''
+        return self.metadata.get('visibility') or False
 
+    def _validate_metadata_params(self, metadata: dict) -> None:
         invalid_keys = [
             x for x in metadata.keys()
-            if x not in meta_keys]
+            if x not in METADATA_KEYS]
 
         if len(invalid_keys) > 0:
             invalid_params = ', '.join(invalid_keys)
@@ -79,10 +89,19 @@ class MetadataCollection:
     def __init__(self):
         self._metadata = dict()
 
+        # Incremented every time metadata is added, so changes to the
+        # collection can be detected without comparing the contents
+        self.version = 0
+
     def __getitem__(self, view_function_name: Union[Callable, str]) -> EndpointMetadata:
         ''' Return the endpoint metadata at the given key (name of the view function) '''
         return self._metadata.get(view_function_name)
 
+    def __delitem__(self, view_function_name: Union[Callable, str]):
+        ''' Remove the endpoint metadata at the given key, if there is any '''
+        if self._metadata.pop(view_function_name, None) is not None:
+            self.version += 1
+
     def __setitem__(self, view_function_name: Union[Callable, str], endpoint_metadata: EndpointMetadata):
         not_null(view_function_name, 'view_function_name')
         not_null(endpoint_metadata, 'endpoint_metadata')
@@ -93,3 +112,10 @@ class MetadataCollection:
             or enable 'implicit_blueprints' if your app does not contain multiple blueprints in a single context""")
 
         self._metadata[view_function_name] = endpoint_metadata
+        self.version += 1
+
+    def clear(self):
+        ''' Remove the metadata of every endpoint '''
+        if any(self._metadata):
+            self._metadata.clear()
+            self.version += 1
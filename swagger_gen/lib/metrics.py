@@ -0,0 +1,386 @@
+from swagger_gen.lib.utils import is_type, not_null
+from bisect import bisect_left
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Union
+import threading
+import time
+
+if TYPE_CHECKING:
+    from swagger_gen.lib.provider import SpecBuild
+
+# Request durations, in seconds
+REQUEST_DURATION_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Build durations, in seconds
+BUILD_DURATION_BUCKETS = (
+    0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metric:
+    '''
+    A metric with a value per combination of label values.  Label values
+    are passed positionally, in the order of the label names
+    '''
+
+    metric_type = None
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            label_names: Tuple[str, ...] = ()):
+
+        not_null(name, 'name')
+        is_type(name, 'name', str)
+
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+
+        self._values = dict()
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        '''Render the metric in the text exposition format'''
+
+        lines = [
+            f'# HELP {self.name} {_escape_help(self.description)}',
+            f'# TYPE {self.name} {self.metric_type}'
+        ]
+
+        with self._lock:
+            values = list(self._values.items())
+
+        for label_values, value in values:
+            lines += self._render_value(label_values, value)
+
+        return lines
+
+    def _render_value(self, label_values: tuple, value) -> List[str]:
+        return [
+            f'{self.name}{self._format_labels(label_values)} {_format_number(value)}'
+        ]
+
+    def _format_labels(self, label_values: tuple, extra: str = None) -> str:
+        labels = [
+            f'{name}="{_escape_label(value)}"'
+            for name, value in zip(self.label_names, label_values)
+        ]
+
+        if extra is not None:
+            labels.append(extra)
+
+        if not any(labels):
+            return ''
+
+        return '{' + ','.join(labels) + '}'
+
+
+class Counter(Metric):
+    '''A value that only goes up, i.e. the number of requests'''
+
+    metric_type = 'counter'
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(
+                label_values, 0) + amount
+
+
+class Gauge(Metric):
+    '''A value that's set to its current reading, i.e. the size of the spec'''
+
+    metric_type = 'gauge'
+
+    def set(self, *label_values, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(Metric):
+    '''
+    Observations counted into cumulative buckets, along with their sum and
+    count, i.e. request durations
+    '''
+
+    metric_type = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            buckets: Tuple[float, ...],
+            label_names: Tuple[str, ...] = ()):
+
+        super().__init__(
+            name=name,
+            description=description,
+            label_names=label_names)
+
+        not_null(buckets, 'buckets')
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *label_values, value: float) -> None:
+        # Only the bucket the value falls in is counted here, the counts are
+        # made cumulative when they're rendered
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            observations = self._values.get(label_values)
+            if observations is None:
+                # Bucket counts (the last is +Inf), the sum and the count
+                observations = self._values[label_values] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0]
+
+            observations[0][index] += 1
+            observations[1] += value
+            observations[2] += 1
+
+    def _render_value(self, label_values: tuple, value) -> List[str]:
+        counts, total, count = value
+
+        lines = []
+        cumulative = 0
+
+        for upper_bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            labels = self._format_labels(
+                label_values,
+                extra=f'le="{_format_number(upper_bound)}"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+
+        labels = self._format_labels(label_values)
+        lines.append(f'{self.name}_sum{labels} {_format_number(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+
+        return lines
+
+
+class MetricsRegistry:
+    '''
+    A collection of metrics, rendered in the Prometheus text exposition
+    format.  To expose the swagger-gen metrics on an existing metrics route,
+    pass the registry to `Swagger` and append `render()` to the output of
+    the route, or register a collector with `add_collector` to render other
+    metrics along with them
+    '''
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = dict()
+        self._collectors: List[Callable[[], str]] = list()
+        self._lock = threading.Lock()
+
+    def counter(
+            self,
+            name: str,
+            description: str,
+            label_names: Tuple[str, ...] = ()) -> Counter:
+        '''Get or create a counter'''
+
+        return self._register(Counter(
+            name=name,
+            description=description,
+            label_names=label_names))
+
+    def gauge(
+            self,
+            name: str,
+            description: str,
+            label_names: Tuple[str, ...] = ()) -> Gauge:
+        '''Get or create a gauge'''
+
+        return self._register(Gauge(
+            name=name,
+            description=description,
+            label_names=label_names))
+
+    def histogram(
+            self,
+            name: str,
+            description: str,
+            buckets: Tuple[float, ...],
+            label_names: Tuple[str, ...] = ()) -> Histogram:
+        '''Get or create a histogram'''
+
+        return self._register(Histogram(
+            name=name,
+            description=description,
+            buckets=buckets,
+            label_names=label_names))
+
+    def add_collector(self, collector: Callable[[], str]) -> None:
+        '''
+        Add a callable that returns metrics already in the text exposition
+        format, which are rendered after the registered metrics
+        '''
+
+        not_null(collector, 'collector')
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        '''Render all of the metrics in the text exposition format'''
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+
+        for collector in self._collectors:
+            lines.append(collector().rstrip('\n'))
+
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+
+            # The same metrics are shared by every swagger-gen instance using
+            # the registry
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise Exception(
+                        f"Metric '{metric.name}' is already registered as a {existing.metric_type}")
+                return existing
+
+            self._metrics[metric.name] = metric
+            return metric
+
+
+class SwaggerMetrics:
+    '''
+    The metrics recorded for the swagger-gen routes and builds:
+
+    `swagger_gen_requests_total`: requests by route and status code
+    `swagger_gen_response_bytes_total`: response body bytes sent by route
+    `swagger_gen_request_duration_seconds`: request durations by route
+    `swagger_gen_cache_lookups_total`: in-memory cache hits and misses for
+    the index and the dependencies
+    `swagger_gen_builds_total`: spec builds by result
+    `swagger_gen_build_duration_seconds`: spec build durations
+    `swagger_gen_spec_bytes`: the size of the current spec by encoding
+
+    Recording a request costs a couple of clock reads and a few dictionary
+    updates, none of which depend on the size of the response
+
+    params:
+    `registry`: the registry to record the metrics to
+    '''
+
+    def __init__(self, registry: MetricsRegistry):
+        not_null(registry, 'registry')
+        is_type(registry, 'registry', MetricsRegistry)
+
+        self.registry = registry
+
+        self._requests = registry.counter(
+            name='swagger_gen_requests_total',
+            description='Requests to the swagger-gen routes',
+            label_names=('route', 'status'))
+        self._response_bytes = registry.counter(
+            name='swagger_gen_response_bytes_total',
+            description='Response body bytes sent by the swagger-gen routes',
+            label_names=('route',))
+        self._request_duration = registry.histogram(
+            name='swagger_gen_request_duration_seconds',
+            description='Duration of requests to the swagger-gen routes',
+            buckets=REQUEST_DURATION_BUCKETS,
+            label_names=('route',))
+        self._cache_lookups = registry.counter(
+            name='swagger_gen_cache_lookups_total',
+            description='In-memory cache lookups for the Swagger UI index and dependencies',
+            label_names=('route', 'result'))
+        self._builds = registry.counter(
+            name='swagger_gen_builds_total',
+            description='Spec builds',
+            label_names=('result',))
+        self._build_duration = registry.histogram(
+            name='swagger_gen_build_duration_seconds',
+            description='Duration of spec builds',
+            buckets=BUILD_DURATION_BUCKETS)
+        self._spec_bytes = registry.gauge(
+            name='swagger_gen_spec_bytes',
+            description='Size of the current spec',
+            label_names=('encoding',))
+
+    def instrument(self, route: str, view_function: Callable) -> Callable:
+        '''
+        Wrap a view function to record the requests to it
+
+        params:
+        `route`: the route name the requests are recorded under
+        `view_function`: the view function
+        '''
+
+        from flask import make_response
+        from werkzeug.exceptions import HTTPException
+
+        @wraps(view_function)
+        def instrumented(*args, **kwargs):
+            started = time.perf_counter()
+
+            try:
+                response = make_response(view_function(*args, **kwargs))
+            except HTTPException as ex:
+                self.record_request(route, ex.code, 0, time.perf_counter() - started)
+                raise
+
+            # The body isn't sent on a 304, and the length of a body that's
+            # already in memory is counted without reading it
+            size = (response.calculate_content_length() or 0
+                    if response.status_code != 304 else 0)
+
+            self.record_request(
+                route, response.status_code, size, time.perf_counter() - started)
+
+            return response
+
+        return instrumented
+
+    def record_request(self, route: str, status_code: int, size: int, duration: float) -> None:
+        '''Record a request to a swagger-gen route'''
+
+        self._requests.inc(route, str(status_code))
+        self._response_bytes.inc(route, amount=size)
+        self._request_duration.observe(route, value=duration)
+
+    def record_cache_lookup(self, route: str, hit: bool) -> None:
+        '''Record a lookup of in-memory content for a route'''
+
+        self._cache_lookups.inc(route, 'hit' if hit else 'miss')
+
+    def record_build(self, duration: float, spec_build: Union['SpecBuild', None]) -> None:
+        '''Record a spec build, the build is `None` if it failed'''
+
+        self._build_duration.observe(value=duration)
+
+        if spec_build is None:
+            self._builds.inc('failure')
+            return
+
+        self._builds.inc('success')
+        self._spec_bytes.set('identity', value=spec_build.spec.size)
+        self._spec_bytes.set('gzip', value=len(spec_build.spec.compressed))
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+def _escape_label(value) -> str:
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _escape_help(value: str) -> str:
+    return (value or '').replace('\\', '\\\\').replace('\n', '\\n')
@@ -0,0 +1,185 @@
+from swagger_gen.lib.constants import ContentType, DocsRoute, DocsUrl, Method
+from swagger_gen.lib.utils import not_null
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Callable, List, Tuple, Union
+import math
+import time
+
+if TYPE_CHECKING:
+    from swagger_gen.lib.dependency import DependencyProvider
+    from swagger_gen.lib.metrics import SwaggerMetrics
+    from swagger_gen.lib.provider import SpecProvider
+    from swagger_gen.lib.throttle import Throttle
+
+# Status lines for the responses served by the middleware
+status_lines = {
+    status.value: f'{status.value} {status.phrase}'
+    for status in (
+        HTTPStatus.OK,
+        HTTPStatus.NOT_MODIFIED,
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.SERVICE_UNAVAILABLE)
+}
+
+RawResponse = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class DocsMiddleware:
+    '''
+    WSGI middleware that answers requests for the spec, the Swagger UI
+    index and its dependencies from the cached bytes, before they reach
+    Flask.  There's no URL matching against the app's routes, no request
+    context and no `before_request` hooks, and the body is sent as-is.
+    Every other request (and any method other than `GET` and `HEAD`) is
+    passed straight through to the app.  The Flask routes stay bound, and
+    requests the middleware can't answer (i.e. a dependency that doesn't
+    exist) fall through to them
+
+    params:
+    `wsgi_app`: the WSGI app to pass the other requests to
+    `spec_provider`: the provider holding the spec build
+    `index_url`: the path the Swagger UI index is served at
+    `dependency_provider`: the Swagger UI dependencies, if the UI is served
+    `metrics`: if provided, the requests served are recorded
+    `throttle`: if provided, requests over its limits get a 429
+    '''
+
+    def __init__(
+            self,
+            wsgi_app: Callable,
+            spec_provider: 'SpecProvider',
+            index_url: str,
+            dependency_provider: Union['DependencyProvider', None] = None,
+            metrics: Union['SwaggerMetrics', None] = None,
+            throttle: Union['Throttle', None] = None):
+
+        not_null(wsgi_app, 'wsgi_app')
+        not_null(spec_provider, 'spec_provider')
+        not_null(index_url, 'index_url')
+
+        self._wsgi_app = wsgi_app
+        self._spec_provider = spec_provider
+        self._index_url = index_url
+        self._dependency_provider = dependency_provider
+        self._metrics = metrics
+        self._throttle = throttle
+
+    def __call__(self, environ: dict, start_response: Callable):
+        method = environ.get('REQUEST_METHOD')
+        if method != Method.GET and method != Method.HEAD:
+            return self._wsgi_app(environ, start_response)
+
+        route = self._get_route(environ.get('PATH_INFO') or '')
+        if route is None:
+            return self._wsgi_app(environ, start_response)
+
+        started = time.perf_counter()
+
+        # A dependency that doesn't exist is left to the app, without taking
+        # a token for it.  Only the names are checked, nothing is loaded
+        # before the throttle
+        if (route == DocsRoute.RESOURCE
+                and not self._dependency_provider.has_resource(
+                    environ['PATH_INFO'][len(DocsUrl.RESOURCE_PREFIX):])):
+            return self._wsgi_app(environ, start_response)
+
+        response = self._get_throttled_response(environ)
+        if response is None:
+            response = self._get_response(route, environ)
+
+        # Nothing to serve, let the app handle it
+        if response is None:
+            return self._wsgi_app(environ, start_response)
+
+        status_code, headers, body = response
+
+        if method == Method.HEAD:
+            body = b''
+
+        if self._metrics is not None:
+            self._metrics.record_request(
+                route, status_code, len(body), time.perf_counter() - started)
+
+        start_response(status_lines[status_code], headers)
+        return [body]
+
+    def _get_route(self, path: str) -> Union[str, None]:
+        '''Get the name of the route for the path, if it's one served here'''
+
+        if path == DocsUrl.SPEC:
+            return DocsRoute.SPEC
+
+        if self._dependency_provider is None:
+            return None
+
+        if path == self._index_url:
+            return DocsRoute.INDEX
+
+        # The dependencies are served from a single path segment, unless
+        # they're offloaded
+        if (path.startswith(DocsUrl.RESOURCE_PREFIX)
+                and self._dependency_provider.serves_resources):
+            resource_name = path[len(DocsUrl.RESOURCE_PREFIX):]
+            if resource_name and '/' not in resource_name:
+                return DocsRoute.RESOURCE
+
+        return None
+
+    def _get_response(self, route: str, environ: dict) -> Union[RawResponse, None]:
+        from werkzeug.utils import get_content_type
+
+        if route == DocsRoute.RESOURCE:
+            resource = self._dependency_provider.get_resource(
+                environ['PATH_INFO'][len(DocsUrl.RESOURCE_PREFIX):])
+
+            if resource is None:
+                return None
+
+            content, mimetype = resource
+            return 200, [
+                ('Content-Type', get_content_type(
+                    mimetype or ContentType.TEXT_HTML, 'utf-8')),
+                ('Content-Length', str(len(content)))
+            ], content
+
+        if route == DocsRoute.INDEX and not self._dependency_provider.is_inline:
+            content = self._dependency_provider.get_index()
+            return 200, [
+                ('Content-Type', get_content_type(
+                    ContentType.TEXT_HTML, 'utf-8')),
+                ('Content-Length', str(len(content)))
+            ], content
+
+        spec_build = self._spec_provider.get_build()
+
+        # The definition is still being built in the background
+        if spec_build is None:
+            return 503, [
+                ('Retry-After', '1'),
+                ('Content-Length', '0')
+            ], b''
+
+        content = (
+            spec_build.get_spec(environ) if route == DocsRoute.SPEC
+            else self._dependency_provider.get_inline_index(spec_build))
+
+        return content.get_raw_response(
+            accept_encoding=environ.get('HTTP_ACCEPT_ENCODING'),
+            if_none_match=environ.get('HTTP_IF_NONE_MATCH'))
+
+    def _get_throttled_response(self, environ: dict) -> Union[RawResponse, None]:
+        '''Get the 429 response if the request is over the throttle limits'''
+
+        if self._throttle is None:
+            return None
+
+        from werkzeug.wrappers import Request
+
+        wait = self._throttle.check(Request(environ))
+        if wait <= 0:
+            return None
+
+        return 429, [
+            ('Retry-After', str(math.ceil(wait))),
+            ('Content-Length', '0')
+        ], b''
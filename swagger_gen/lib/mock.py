@@ -0,0 +1,355 @@
+from swagger_gen.lib.constants import ContentType, Method, Schema
+from swagger_gen.lib.utils import is_type, not_null
+from http import HTTPStatus
+from typing import Callable, Dict, List, Tuple, Union
+import json
+import re
+
+# Keys of a path item that are operations
+_operation_methods = frozenset(
+    method.lower() for method in (
+        Method.GET,
+        Method.PUT,
+        Method.DELETE,
+        Method.POST,
+        Method.HEAD,
+        Method.OPTIONS,
+        Method.PATCH
+    )
+)
+
+# Example values for the schema types
+_type_examples = {
+    'string': 'string',
+    'integer': 0,
+    'number': 0.0,
+    'boolean': True
+}
+
+# A path segment that's a single parameter
+_parameter_pattern = re.compile(r'\{[^{}/]*\}')
+
+# Responses that can't have a body
+_bodiless_status_codes = frozenset([204, 304])
+
+# The status line, the headers and the body
+MockResponse = Tuple[str, List[Tuple[str, str]], bytes]
+
+# The responses keyed by the upper-cased method, and the response for any
+# other method
+MockRoute = Tuple[Dict[str, MockResponse], MockResponse]
+
+
+class _RouteNode:
+    '''
+    A path segment in the tree of templated paths.  Literal segments are
+    looked up by value, and preferred over a parameter in the same place,
+    so `/users/me/{tab}` wins over `/users/{id}/{tab}`
+    '''
+
+    __slots__ = (
+        'literals',
+        'parameter',
+        'patterns',
+        'route'
+    )
+
+    def __init__(self):
+        self.literals: Dict[str, '_RouteNode'] = dict()
+        self.parameter: Union['_RouteNode', None] = None
+
+        # Segments mixing literals and parameters, i.e. `{name}.{format}`
+        self.patterns: List[Tuple['re.Pattern', '_RouteNode']] = list()
+
+        self.route: Union[MockRoute, None] = None
+
+    def add(self, segments: List[str], route: MockRoute) -> None:
+        node = self
+        for segment in segments:
+            node = node._get_child(segment)
+
+        # The first path wins if two templates only differ by parameter names
+        if node.route is None:
+            node.route = route
+
+    def match(self, segments: List[str], index: int) -> Union[MockRoute, None]:
+        if index == len(segments):
+            return self.route
+
+        segment = segments[index]
+
+        child = self.literals.get(segment)
+        if child is not None:
+            route = child.match(segments, index + 1)
+            if route is not None:
+                return route
+
+        if not segment:
+            return None
+
+        for pattern, child in self.patterns:
+            if pattern.fullmatch(segment):
+                route = child.match(segments, index + 1)
+                if route is not None:
+                    return route
+
+        if self.parameter is not None:
+            return self.parameter.match(segments, index + 1)
+
+        return None
+
+    def _get_child(self, segment: str) -> '_RouteNode':
+        if '{' not in segment:
+            return self.literals.setdefault(segment, _RouteNode())
+
+        if _parameter_pattern.fullmatch(segment):
+            if self.parameter is None:
+                self.parameter = _RouteNode()
+            return self.parameter
+
+        pattern = re.compile(_get_segment_pattern(segment))
+        for existing, child in self.patterns:
+            if existing.pattern == pattern.pattern:
+                return child
+
+        child = _RouteNode()
+        self.patterns.append((pattern, child))
+        return child
+
+
+class MockServer:
+    '''
+    A WSGI app that serves every operation in a spec with an example
+    response, as a stand-in for the real service when load testing its
+    clients.  Each operation responds with its lowest documented success
+    status code.  The body is an example of the response schema if the spec
+    has one, otherwise an example of the request model (i.e. the created or
+    updated resource), otherwise an empty object.
+
+    Everything is worked out when the server is created: the responses are
+    serialized once, the static paths are looked up in a dictionary and the
+    templated paths are compiled into a tree of path segments, so matching
+    a path costs the same however many operations there are and serving a
+    request is a few lookups and a write.  Unknown paths get a `404` and
+    undocumented methods a `405`
+
+    params:
+    `definition`: the spec, i.e. from `SwaggerDefinition.get_definition()`
+    `path_prefix`: a prefix the paths are served under
+    '''
+
+    def __init__(
+            self,
+            definition: dict,
+            path_prefix: str = ''):
+
+        not_null(definition, 'definition')
+        is_type(definition, 'definition', dict)
+        is_type(path_prefix, 'path_prefix', str)
+
+        self._definition = definition
+        path_prefix = path_prefix.rstrip('/')
+
+        self._static_routes: Dict[str, MockRoute] = dict()
+        self._template_routes = _RouteNode()
+
+        for endpoint_literal, path_item in (definition.get(Schema.PATHS) or {}).items():
+            methods = {
+                method.upper(): self._create_response(operation)
+                for method, operation in path_item.items()
+                if method in _operation_methods
+            }
+
+            # Answer HEAD like GET, the body is dropped when it's sent
+            if Method.GET in methods and Method.HEAD not in methods:
+                methods[Method.HEAD] = methods[Method.GET]
+
+            route = (methods, _get_method_not_allowed(methods))
+            path = f'{path_prefix}{endpoint_literal}'
+
+            if '{' not in path:
+                self._static_routes[path] = route
+            else:
+                self._template_routes.add(path.split('/'), route)
+
+        self._not_found = _serialize(HTTPStatus.NOT_FOUND, {
+            Schema.DESCRIPTION: HTTPStatus.NOT_FOUND.phrase
+        })
+
+    def __call__(self, environ: dict, start_response: Callable):
+        path = environ.get('PATH_INFO') or '/'
+
+        route = self._static_routes.get(path)
+        if route is None:
+            route = self._template_routes.match(path.split('/'), 0)
+
+        if route is None:
+            status_line, headers, body = self._not_found
+        else:
+            methods, method_not_allowed = route
+            method = environ.get('REQUEST_METHOD')
+
+            status_line, headers, body = methods.get(
+                method, method_not_allowed)
+
+            if method == Method.HEAD:
+                body = b''
+
+        start_response(status_line, headers)
+        return [body]
+
+    def _create_response(self, operation: dict) -> MockResponse:
+        '''Serialize the example response for an operation'''
+
+        responses = operation.get(Schema.ENDPOINT_RESPONSES) or {}
+        status_code, response = _get_success_response(responses)
+
+        if status_code in _bodiless_status_codes:
+            return _serialize(status_code, None)
+
+        # The response schema if the spec defines one, otherwise echo the
+        # request model
+        schema = get_content_schema(self._definition, response)
+        if schema is None:
+            schema = get_content_schema(
+                self._definition, operation.get(Schema.REQUEST_BODY) or {})
+
+        example = dict()
+        if schema is not None:
+            example = get_example(self._definition, schema)
+
+        return _serialize(status_code, example)
+
+
+def get_example(definition: dict, schema: dict, depth: int = 0):
+    '''
+    Generate an example value for a schema
+
+    params:
+    `definition`: the spec the schema is from, for resolving references
+    `schema`: the schema
+    '''
+
+    # Recursive models are cut off
+    if depth > 8 or not isinstance(schema, dict):
+        return None
+
+    schema = resolve_reference(definition, schema)
+
+    if 'example' in schema:
+        return schema['example']
+
+    if schema.get('enum'):
+        return schema['enum'][0]
+
+    schema_type = schema.get(Schema.PROPERTY_TYPE)
+
+    if schema_type == 'object' or Schema.PROPERTIES in schema:
+        return {
+            name: get_example(definition, property_schema, depth + 1)
+            for name, property_schema in (schema.get(Schema.PROPERTIES) or {}).items()
+        }
+
+    if schema_type == 'array':
+        item = get_example(definition, schema.get(Schema.ITEMS) or {}, depth + 1)
+        return [item] if item is not None else []
+
+    return _type_examples.get(schema_type)
+
+
+def get_content_schema(definition: dict, node: dict) -> Union[dict, None]:
+    '''
+    Get the JSON schema of a request body or response, `None` if it doesn't
+    have one
+
+    params:
+    `definition`: the spec the node is from, for resolving references
+    `node`: the request body or response
+    '''
+
+    node = resolve_reference(definition, node)
+
+    return (((node.get(Schema.CONTENT) or {})
+             .get(ContentType.APPLICATION_JSON) or {})
+            .get(Schema.SCHEMA))
+
+
+def resolve_reference(definition: dict, node: dict) -> dict:
+    '''
+    Follow a local `$ref` to the component it references.  Nodes that aren't
+    references are returned as-is
+
+    params:
+    `definition`: the spec the node is from
+    `node`: the node that may be a reference
+    '''
+
+    reference = node.get(Schema.REF)
+    if not isinstance(reference, str) or not reference.startswith('#/'):
+        return node
+
+    resolved = definition
+    for segment in reference[2:].split('/'):
+        segment = segment.replace('~1', '/').replace('~0', '~')
+        resolved = resolved.get(segment) if isinstance(resolved, dict) else None
+
+    return resolved if isinstance(resolved, dict) else {}
+
+
+def _get_success_response(responses: dict) -> Tuple[int, dict]:
+    '''Get the lowest success status code and its response'''
+
+    status_codes = dict()
+    for status_code, response in responses.items():
+        # The default response stands in for anything that isn't listed
+        if status_code == 'default':
+            status_codes.setdefault(200, response)
+        elif str(status_code).isdigit():
+            status_codes[int(status_code)] = response
+
+    if not any(status_codes):
+        return 200, {}
+
+    success = [
+        status_code for status_code in status_codes
+        if 200 <= status_code < 300
+    ]
+
+    status_code = min(success or status_codes)
+    return status_code, status_codes[status_code] or {}
+
+
+def _get_method_not_allowed(methods: Dict[str, MockResponse]) -> MockResponse:
+    status_line, headers, body = _serialize(HTTPStatus.METHOD_NOT_ALLOWED, {
+        Schema.DESCRIPTION: HTTPStatus.METHOD_NOT_ALLOWED.phrase
+    })
+
+    return status_line, headers + [('Allow', ', '.join(sorted(methods)))], body
+
+
+def _get_segment_pattern(segment: str) -> str:
+    '''Get the pattern matching a path segment with parameters in it'''
+
+    return re.sub(
+        r'\\\{[^/]*?\\\}',
+        '[^/]+?',
+        re.escape(segment))
+
+
+def _serialize(status_code: int, body) -> MockResponse:
+    '''Serialize a response'''
+
+    try:
+        status_line = f'{status_code} {HTTPStatus(status_code).phrase}'
+    except ValueError:
+        status_line = f'{status_code} Status {status_code}'
+
+    if body is None:
+        return status_line, [('Content-Length', '0')], b''
+
+    content = json.dumps(body, separators=(',', ':')).encode('utf-8')
+
+    return status_line, [
+        ('Content-Type', ContentType.APPLICATION_JSON),
+        ('Content-Length', str(len(content)))
+    ], content
@@ -0,0 +1,320 @@
+from swagger_gen.lib.constants import BuildMode, ContentType
+from swagger_gen.lib.content import CachedContent
+from swagger_gen.lib.utils import not_null, validate_constant
+from typing import TYPE_CHECKING, Callable, List, Tuple, Union
+import json
+import logging
+import threading
+import time
+
+if TYPE_CHECKING:
+    from swagger_gen.lib.audience import AudienceResolver
+    from swagger_gen.lib.metrics import SwaggerMetrics
+    from swagger_gen.lib.servers import ServerTemplate, ServerVariants
+
+logger = logging.getLogger(__name__)
+
+
+class SpecBuild:
+    '''
+    The result of a spec build: the definition and the serialized spec
+    served by the spec route.  A build is never modified once it's created,
+    a rebuild replaces it as a whole.  In low-memory mode only the
+    compressed spec is kept, and the definition is parsed from it when it's
+    requested.  A canonical build is serialized with the keys sorted, so
+    definitions that were merged after they were emitted (i.e. federated
+    specs) are canonical as well.  With a server template, the spec is
+    served with the servers for the host of each request, and with
+    audiences, each audience is served its own spec (see `get_spec`)
+    '''
+
+    __slots__ = (
+        '_definition',
+        'spec',
+        '_served',
+        '_audience_specs',
+        '_audience_resolver'
+    )
+
+    def __init__(
+            self,
+            definition: dict,
+            low_memory: bool = False,
+            canonical: bool = False,
+            server_template: Union['ServerTemplate', None] = None,
+            audiences: Union[List[str], None] = None,
+            audience_resolver: Union['AudienceResolver', None] = None):
+
+        not_null(definition, 'definition')
+
+        self._definition = definition if not low_memory else None
+        self._audience_specs = None
+        self._audience_resolver = audience_resolver
+
+        if audiences is None:
+            self._served = self._create_spec(
+                definition=definition,
+                low_memory=low_memory,
+                canonical=canonical,
+                server_template=server_template)
+
+        # Every audience is split and serialized up front, so picking the
+        # spec for a request is a lookup
+        else:
+            from swagger_gen.lib.audience import split_audiences
+
+            not_null(audience_resolver, 'audience_resolver')
+
+            self._audience_specs = {
+                audience: self._create_spec(
+                    definition=audience_definition,
+                    low_memory=low_memory,
+                    canonical=canonical,
+                    server_template=server_template,
+                    vary=audience_resolver.vary)
+                for audience, audience_definition in split_audiences(
+                    definition=definition,
+                    audiences=audiences).items()
+            }
+
+            # Requests for an unknown audience get the most restricted one
+            self._served = self._audience_specs[audiences[0]]
+
+        # Requests without a usable host get the default servers
+        self.spec = (self._served
+                     if isinstance(self._served, CachedContent)
+                     else self._served.default)
+
+    @property
+    def definition(self) -> dict:
+        if self._definition is not None:
+            return self._definition
+
+        # The last audience sees every operation
+        spec = self.spec
+        if self._audience_specs is not None:
+            spec = next(reversed(self._audience_specs.values()))
+
+        return json.loads(spec.get_content())
+
+    def get_spec(self, environ: dict) -> CachedContent:
+        '''
+        Get the spec to serve for a request
+
+        params:
+        `environ`: the WSGI environ of the request
+        '''
+
+        served = self._served
+        if self._audience_specs is not None:
+            served = self._audience_specs.get(
+                self._audience_resolver.resolve(environ),
+                served)
+
+        if isinstance(served, CachedContent):
+            return served
+
+        return served.get_spec(environ)
+
+    def _create_spec(
+            self,
+            definition: dict,
+            low_memory: bool,
+            canonical: bool,
+            server_template: Union['ServerTemplate', None],
+            vary: Tuple[str, ...] = ()) -> Union[CachedContent, 'ServerVariants']:
+        '''Serialize a definition, or split it for the servers of each host'''
+
+        if server_template is not None:
+            from swagger_gen.lib.servers import ServerVariants
+
+            return ServerVariants(
+                server_template=server_template,
+                definition=definition,
+                canonical=canonical,
+                vary=vary)
+
+        return CachedContent(
+            content=json.dumps(
+                definition,
+                separators=(',', ':'),
+                sort_keys=canonical).encode('utf-8'),
+            mimetype=ContentType.APPLICATION_JSON,
+            compressed_only=low_memory,
+            vary=vary)
+
+
+class SpecProvider:
+    '''
+    Builds the Swagger definition and holds on to it for the spec route.
+    When the build happens depends on the build mode:
+
+    `eager`: the definition is built when the provider is started, which
+    is the startup path of the app (this is the default)
+
+    `lazy`: the definition is built on the first request for it.  Requests
+    that arrive while the build is running wait on the same build
+
+    `background`: the build is started on a worker thread when the provider
+    is started, and startup continues without waiting on it.  Requests that
+    arrive before the build is done wait up to `build_timeout` seconds for
+    it, or indefinitely if there's no timeout
+
+    Once there's a build, it can be replaced with `rebuild`.  Requests keep
+    getting the previous build until the new one is ready.  With
+    `low_memory` enabled, builds only keep the compressed spec, and with
+    `canonical` enabled the spec is serialized in canonical form.  With a
+    `server_template`, the servers are generated per host, and with
+    `audiences` each audience is served its own spec.  If
+    `metrics` are provided, the duration and result of every build and the
+    size of the spec are recorded
+    '''
+
+    def __init__(
+            self,
+            build_definition: Callable[[], dict],
+            build_mode: str = BuildMode.EAGER,
+            build_timeout: Union[float, None] = None,
+            low_memory: bool = False,
+            canonical: bool = False,
+            metrics: Union['SwaggerMetrics', None] = None,
+            server_template: Union['ServerTemplate', None] = None,
+            audiences: Union[List[str], None] = None,
+            audience_resolver: Union['AudienceResolver', None] = None):
+
+        not_null(build_definition, 'build_definition')
+        not_null(build_mode, 'build_mode')
+        validate_constant(BuildMode, build_mode)
+
+        self._build_definition = build_definition
+        self._build_mode = build_mode
+        self._build_timeout = build_timeout
+        self._low_memory = low_memory
+        self._canonical = canonical
+        self._metrics = metrics
+        self._server_template = server_template
+        self._audiences = audiences
+        self._audience_resolver = audience_resolver
+
+        self._spec_build = None
+        self._build_error = None
+
+        self._build_lock = threading.Lock()
+        self._build_complete = threading.Event()
+
+    def start(self) -> None:
+        '''Start the build according to the build mode'''
+
+        if self._build_mode == BuildMode.EAGER:
+            self._build()
+
+        if self._build_mode == BuildMode.BACKGROUND:
+            worker = threading.Thread(
+                target=self._build,
+                name='swagger-gen-build',
+                daemon=True)
+            worker.start()
+
+    def get_build(self) -> Union[SpecBuild, None]:
+        '''
+        Get the current build.  Returns `None` if the definition is being
+        built in the background and isn't ready before the build timeout
+        '''
+
+        if self._build_complete.is_set():
+            return self._get_result()
+
+        # In lazy mode the first request does the build, any requests that come
+        # in while it's running wait on the lock and pick up the result
+        if self._build_mode == BuildMode.LAZY:
+            self._build()
+            return self._get_result()
+
+        if not self._build_complete.wait(self._build_timeout):
+            return None
+
+        return self._get_result()
+
+    def get_definition(self) -> Union[dict, None]:
+        '''
+        Get the built definition.  Returns `None` if the definition is being
+        built in the background and isn't ready before the build timeout
+        '''
+
+        spec_build = self.get_build()
+        if spec_build is None:
+            return None
+
+        return spec_build.definition
+
+    def rebuild(self) -> None:
+        '''
+        Build the definition again and replace the current build once it's
+        done.  Requests aren't blocked while the rebuild runs, they're served
+        the previous build until it's replaced
+        '''
+
+        with self._build_lock:
+            # Swapping the reference is atomic, readers either get the whole
+            # previous build or the whole new one
+            self._spec_build = self._create_build()
+            self._build_error = None
+
+            self._build_complete.set()
+
+    def _build(self) -> None:
+        '''Build the definition, only once'''
+
+        with self._build_lock:
+            if self._build_complete.is_set():
+                return
+
+            try:
+                self._spec_build = self._create_build()
+            except Exception as ex:
+                # An eager build fails the app startup like it always has
+                if self._build_mode == BuildMode.EAGER:
+                    raise
+
+                # Otherwise surface the failure on the request rather than
+                # losing it on the worker thread
+                logger.exception('Failed to build the Swagger definition')
+                self._build_error = ex
+
+            self._build_complete.set()
+
+    def _create_build(self) -> SpecBuild:
+        '''Build the definition and serialize the spec'''
+
+        if self._metrics is None:
+            return SpecBuild(
+                definition=self._build_definition(),
+                low_memory=self._low_memory,
+                canonical=self._canonical,
+                server_template=self._server_template,
+                audiences=self._audiences,
+                audience_resolver=self._audience_resolver)
+
+        started = time.perf_counter()
+        spec_build = None
+
+        try:
+            spec_build = SpecBuild(
+                definition=self._build_definition(),
+                low_memory=self._low_memory,
+                canonical=self._canonical,
+                server_template=self._server_template,
+                audiences=self._audiences,
+                audience_resolver=self._audience_resolver)
+            return spec_build
+        finally:
+            self._metrics.record_build(
+                duration=time.perf_counter() - started,
+                spec_build=spec_build)
+
+    def _get_result(self) -> SpecBuild:
+        if self._build_error is not None:
+            raise Exception(
+                f'Failed to build Swagger definition: {str(self._build_error)}')
+
+        return self._spec_build
@@ -0,0 +1,147 @@
+from swagger_gen.lib.utils import not_null
+from swagger_gen.lib.wrappers import endpoint_metadata
+from typing import TYPE_CHECKING, List, Union
+import logging
+import threading
+import time
+
+if TYPE_CHECKING:
+    from flask import Flask
+    from swagger_gen.lib.provider import SpecProvider
+    from swagger_gen.lib.sampler import TrafficSampler
+
+logger = logging.getLogger(__name__)
+
+
+class SpecReloader:
+    '''
+    Development hot reload for the spec.  A daemon thread polls for changes
+    to the route metadata (`swagger_metadata` applied or released) and, with
+    a traffic sampler, to the samples (new query parameters, bodies and
+    status codes).  Once the changes have settled for the debounce period,
+    the spec is rebuilt on the same thread.  Requests for the spec are served
+    the previous build until the rebuild is done, so they never wait on it.
+
+    Routes are only picked up until the app handles its first request, i.e.
+    blueprints registered after `configure`: Flask doesn't allow routes to
+    be added after that, so from then on the route map isn't checked.
+    Changes to source files are left to the Flask reloader, which restarts
+    the process.  Reloading the route modules in-process would register
+    the views on the app a second time
+
+    params:
+    `app`: the Flask app
+    `spec_provider`: the provider holding the spec build
+    `mounted_apps`: other apps whose routes are in the spec, i.e. the apps
+    mounted under a dispatcher.  Their routes are watched the same way
+    `interval`: how often to check for changes, in seconds
+    `debounce`: how long the changes have to settle before a rebuild, in
+    seconds
+    `traffic_sampler`: the sampler whose samples are merged into the spec
+    '''
+
+    def __init__(
+            self,
+            app: 'Flask',
+            spec_provider: 'SpecProvider',
+            mounted_apps: Union[List['Flask'], None] = None,
+            interval: float = 1.0,
+            debounce: float = 0.5,
+            traffic_sampler: Union['TrafficSampler', None] = None):
+
+        not_null(app, 'app')
+        not_null(spec_provider, 'spec_provider')
+
+        self._apps = [app, *(mounted_apps or [])]
+        self._spec_provider = spec_provider
+        self._interval = interval
+        self._debounce = debounce
+        self._traffic_sampler = traffic_sampler
+
+        # A route map can't change once its app has handled a request, so
+        # its hash is kept from then on
+        self._routes_fingerprints = [None] * len(self._apps)
+
+        self._stopped = threading.Event()
+        self._worker = None
+
+    def start(self) -> None:
+        '''Start watching for changes'''
+
+        self._worker = threading.Thread(
+            target=self._watch,
+            name='swagger-gen-reload',
+            daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        '''Stop watching for changes'''
+
+        self._stopped.set()
+
+    def _get_fingerprint(self) -> int:
+        '''Get a hash of everything the spec is built from'''
+
+        samples_version = None
+        if self._traffic_sampler is not None:
+            samples_version = self._traffic_sampler.version
+
+        return hash((
+            self._get_routes_fingerprint(),
+            endpoint_metadata.version,
+            samples_version))
+
+    def _get_routes_fingerprint(self) -> int:
+        '''Get a hash of the route maps, hashing each until its app is serving'''
+
+        fingerprints = list()
+
+        for index, app in enumerate(self._apps):
+            fingerprint = self._routes_fingerprints[index]
+
+            if fingerprint is None:
+                # Checked before the rules are read, so a route added in
+                # between is caught on the next poll instead of being missed
+                serving = getattr(app, '_got_first_request', False)
+
+                fingerprint = hash(tuple(
+                    (rule.rule, rule.endpoint, tuple(sorted(rule.methods or [])))
+                    for rule in app.url_map.iter_rules()))
+
+                if serving:
+                    self._routes_fingerprints[index] = fingerprint
+
+            fingerprints.append(fingerprint)
+
+        return hash(tuple(fingerprints))
+
+    def _watch(self) -> None:
+        # Anything that happened before the reloader started is already in the
+        # initial build
+        fingerprint = self._get_fingerprint()
+
+        while not self._stopped.wait(self._interval):
+            current = self._get_fingerprint()
+            if current == fingerprint:
+                continue
+
+            # Wait for the changes to settle, i.e. a blueprint being registered
+            # route by route, so there's one rebuild instead of many
+            while not self._stopped.wait(self._debounce):
+                settled = self._get_fingerprint()
+                if settled == current:
+                    break
+                current = settled
+
+            fingerprint = current
+
+            try:
+                started = time.perf_counter()
+                self._spec_provider.rebuild()
+
+                logger.info(
+                    f'Rebuilt Swagger definition in {time.perf_counter() - started:.3f}s')
+            except Exception:
+                # Keep serving the previous build, the next change will trigger
+                # another attempt
+                logger.exception('Failed to rebuild the Swagger definition')
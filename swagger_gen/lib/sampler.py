@@ -0,0 +1,372 @@
+from swagger_gen.lib.constants import Schema
+from swagger_gen.lib.utils import is_type, not_null
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
+import logging
+import random
+import threading
+
+if TYPE_CHECKING:
+    from flask import Flask, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Shapes are hashable, so identical shapes are only counted once.  Values
+# are a JSON type name, arrays are `('array', item_shape)` and objects are
+# `('object', ((key, shape), ...))` with the keys sorted.  `None` is a value
+# past the depth limit, which could be anything
+_shape_types = {
+    bool: 'boolean',
+    int: 'integer',
+    float: 'number',
+    str: 'string',
+    type(None): 'null'
+}
+
+
+class OperationSamples:
+    '''
+    The traffic observed on a single method of an endpoint: the query
+    parameter names, a fixed-size reservoir of JSON body shapes and the
+    response status codes, each with a fixed maximum size
+    '''
+
+    __slots__ = (
+        'query_params',
+        'body_shapes',
+        'status_codes',
+        'requests',
+        'bodies'
+    )
+
+    def __init__(self):
+        self.query_params: Dict[str, int] = dict()
+        self.body_shapes: List[tuple] = list()
+        self.status_codes: Dict[int, int] = dict()
+
+        # The number of sampled requests, and of those with a JSON body
+        self.requests = 0
+        self.bodies = 0
+
+    def copy(self) -> 'OperationSamples':
+        '''Copy the samples, so they can be read while more are recorded'''
+
+        samples = OperationSamples()
+        samples.query_params = dict(self.query_params)
+        samples.body_shapes = list(self.body_shapes)
+        samples.status_codes = dict(self.status_codes)
+        samples.requests = self.requests
+        samples.bodies = self.bodies
+
+        return samples
+
+
+class TrafficSampler:
+    '''
+    Samples a fraction of the requests to the app and records what they
+    looked like for each endpoint (the `Rule.endpoint`) and method: the
+    query parameter names, the shape of JSON request bodies and the response
+    status codes.  When the spec is built, this is merged into the
+    operations that don't define it in `@swagger_metadata`, as optional
+    query parameters, an inferred request model and the observed responses.
+
+    Unsampled requests only cost a call to `random.random()`.  Sampled
+    requests are recorded after the view returns, from the parsed body
+    Flask has cached, and the time and memory spent on each are capped by
+    the limits below.  A body is only walked if it's going to be kept in
+    the reservoir.  Nothing is recorded past the limits, and the sampler
+    never fails a request
+
+    params:
+    `rate`: the fraction of requests to sample, between `0` and `1`
+    `reservoir_size`: the number of body shapes kept per operation.  Once
+    it's full, new shapes replace the kept ones at random, so the kept ones
+    are a uniform sample of all the sampled bodies
+    `max_operations`: the maximum number of endpoint methods to record
+    `max_query_params`: the maximum number of query parameter names and of
+    status codes recorded per operation
+    `max_body_bytes`: bodies larger than this aren't recorded
+    `max_depth`: how deep into a body the shape is recorded
+    `max_keys`: the maximum number of keys recorded per object in a body
+    `max_nodes`: the maximum number of values recorded per body, across all
+    of its objects and arrays
+    '''
+
+    def __init__(
+            self,
+            rate: float = 0.01,
+            reservoir_size: int = 16,
+            max_operations: int = 1000,
+            max_query_params: int = 32,
+            max_body_bytes: int = 65536,
+            max_depth: int = 4,
+            max_keys: int = 32,
+            max_nodes: int = 256):
+
+        is_type(rate, 'rate', (int, float))
+        is_type(reservoir_size, 'reservoir_size', int)
+        is_type(max_operations, 'max_operations', int)
+        is_type(max_query_params, 'max_query_params', int)
+        is_type(max_body_bytes, 'max_body_bytes', int)
+        is_type(max_depth, 'max_depth', int)
+        is_type(max_keys, 'max_keys', int)
+        is_type(max_nodes, 'max_nodes', int)
+
+        if not 0 <= rate <= 1:
+            raise Exception("'rate' must be between 0 and 1")
+
+        self._rate = rate
+        self._reservoir_size = reservoir_size
+        self._max_operations = max_operations
+        self._max_query_params = max_query_params
+        self._max_body_bytes = max_body_bytes
+        self._max_depth = max_depth
+        self._max_keys = max_keys
+        self._max_nodes = max_nodes
+
+        # Samples keyed by the rule endpoint and the upper-cased method
+        self._operations: Dict[Tuple[str, str], OperationSamples] = dict()
+        self._lock = threading.Lock()
+
+        # Bumped whenever a sample would change the spec, so the reloader can
+        # pick it up
+        self.version = 0
+
+    def install(self, app: 'Flask') -> None:
+        '''
+        Start sampling the requests to the app
+
+        params:
+        `app`: the Flask app
+        '''
+
+        not_null(app, 'app')
+
+        app.after_request(self._after_request)
+
+    def get_samples(
+            self,
+            view_function_name: str,
+            method: str) -> Union[OperationSamples, None]:
+        '''
+        Get a copy of the samples recorded for a method on an endpoint,
+        `None` if none of its requests have been sampled
+
+        params:
+        `view_function_name`: the rule endpoint
+        `method`: the request method
+        '''
+
+        with self._lock:
+            samples = self._operations.get((view_function_name, method.upper()))
+            if samples is None:
+                return None
+
+            return samples.copy()
+
+    def record(
+            self,
+            view_function_name: str,
+            method: str,
+            query_params,
+            body,
+            status_code: int) -> None:
+        '''
+        Record a request.  Called for the sampled requests, but can be used to
+        record requests from elsewhere, i.e. access logs
+
+        params:
+        `view_function_name`: the rule endpoint
+        `method`: the request method
+        `query_params`: the query parameter names
+        `body`: the parsed JSON body, `None` if there wasn't one
+        `status_code`: the response status code
+        '''
+
+        key = (view_function_name, method.upper())
+
+        with self._lock:
+            samples = self._operations.get(key)
+            if samples is None:
+                if len(self._operations) >= self._max_operations:
+                    return
+                samples = self._operations[key] = OperationSamples()
+
+            changed = False
+            samples.requests += 1
+
+            for name in query_params:
+                if name in samples.query_params:
+                    samples.query_params[name] += 1
+                elif len(samples.query_params) < self._max_query_params:
+                    samples.query_params[name] = 1
+                    changed = True
+
+            if status_code in samples.status_codes:
+                samples.status_codes[status_code] += 1
+            elif len(samples.status_codes) < self._max_query_params:
+                samples.status_codes[status_code] = 1
+                changed = True
+
+            if body is not None:
+                changed = self._add_body(samples, body) or changed
+
+            if changed:
+                self.version += 1
+
+    def _add_body(self, samples: OperationSamples, body) -> bool:
+        '''Add a body to the reservoir, returns whether the reservoir changed'''
+
+        samples.bodies += 1
+
+        # Algorithm R: the nth body replaces a kept one with probability
+        # size / n.  The slot is picked first, so the bodies that aren't kept
+        # are never walked
+        index = len(samples.body_shapes)
+        if index >= self._reservoir_size:
+            index = random.randrange(samples.bodies)
+            if index >= self._reservoir_size:
+                return False
+
+        shape = self._get_shape(body, 0, [self._max_nodes])
+
+        if index == len(samples.body_shapes):
+            samples.body_shapes.append(shape)
+            return True
+
+        # The inferred model depends on every kept shape (i.e. which keys are
+        # required), so replacing one with a different shape changes it
+        if samples.body_shapes[index] == shape:
+            return False
+
+        samples.body_shapes[index] = shape
+        return True
+
+    def _after_request(self, response: 'Response') -> 'Response':
+        if random.random() >= self._rate:
+            return response
+
+        try:
+            from flask import request
+
+            self._sample(request, response)
+        except Exception:
+            logger.exception('Failed to sample request')
+
+        return response
+
+    def _sample(self, request: 'Request', response: 'Response') -> None:
+        # Not found, or the request didn't match a route for another reason
+        if request.url_rule is None:
+            return
+
+        body = None
+        if (request.is_json
+                and request.content_length is not None
+                and request.content_length <= self._max_body_bytes):
+            body = request.get_json(silent=True)
+
+        self.record(
+            view_function_name=request.url_rule.endpoint,
+            method=request.method,
+            query_params=request.args.keys(),
+            body=body,
+            status_code=response.status_code)
+
+    def _get_shape(self, value, depth: int, budget: List[int]):
+        '''
+        Get the shape of a parsed JSON value.  The budget is the number of
+        nodes left to walk, shared by the whole body
+        '''
+
+        budget[0] -= 1
+        if depth >= self._max_depth or budget[0] < 0:
+            return None
+
+        value_type = type(value)
+
+        if value_type is dict:
+            keys = sorted(value)[:self._max_keys]
+            return ('object', tuple([
+                (key, self._get_shape(value[key], depth + 1, budget))
+                for key in keys
+            ]))
+
+        if value_type is list:
+            # The first item stands in for the rest, so the cost doesn't grow
+            # with the length of the array
+            return ('array', (
+                self._get_shape(value[0], depth + 1, budget)
+                if value else None))
+
+        return _shape_types.get(value_type)
+
+
+def get_shape_schema(shapes: List[tuple]) -> dict:
+    '''
+    Merge body shapes into a single schema.  Object properties present in
+    every shape are required, values that are `null` in some shapes are
+    nullable and values with conflicting types are left untyped
+
+    params:
+    `shapes`: the shapes to merge
+    '''
+
+    not_null(shapes, 'shapes')
+
+    nullable = 'null' in shapes
+    shapes = [shape for shape in shapes if shape is not None and shape != 'null']
+
+    schema = dict()
+
+    if not shapes:
+        pass
+
+    elif all(isinstance(shape, tuple) and shape[0] == 'object' for shape in shapes):
+        properties: Dict[str, list] = dict()
+        for shape in shapes:
+            for key, value in shape[1]:
+                properties.setdefault(key, []).append(value)
+
+        schema[Schema.PROPERTY_TYPE] = 'object'
+        schema[Schema.PROPERTIES] = {
+            key: get_shape_schema(values)
+            for key, values in properties.items()
+        }
+
+        required = [
+            key for key, values in properties.items()
+            if len(values) == len(shapes)
+        ]
+        if any(required):
+            schema[Schema.REQUIRED] = required
+
+    elif all(isinstance(shape, tuple) and shape[0] == 'array' for shape in shapes):
+        schema[Schema.PROPERTY_TYPE] = 'array'
+        schema[Schema.ITEMS] = get_shape_schema([
+            shape[1] for shape in shapes
+        ])
+
+    elif all(isinstance(shape, str) for shape in shapes):
+        types = set(shapes)
+
+        # An integer in one body and a number in another is a number
+        if types == {'integer', 'number'}:
+            types = {'number'}
+
+        if len(types) == 1:
+            schema[Schema.PROPERTY_TYPE] = types.pop()
+
+    if nullable:
+        schema[Schema.NULLABLE] = True
+
+    return schema
+
+
+def get_status_description(status_code: int) -> str:
+    '''The description of an observed response status code'''
+
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return f'Status {status_code}'
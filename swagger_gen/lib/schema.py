@@ -1,35 +1,48 @@
 from swagger_gen.lib.constants import (
     AuthType,
     ComponentType,
-    ContentType,
-    Meta,
     ParameterType,
     Schema,
 )
-from typing import List, Union
+from typing import TYPE_CHECKING, List, Tuple, Union
+from swagger_gen.lib.emitter import DictEmitter
 from swagger_gen.lib.endpoint import SwaggerEndpoint
 from swagger_gen.lib.metadata import EndpointMetadata
+from swagger_gen.lib.spec import (
+    SwaggerComponent,
+    SwaggerDocument,
+    SwaggerOperation,
+    SwaggerParameter,
+    SwaggerResponse,
+    merge_components
+)
 from swagger_gen.lib.wrappers import get_endpoint_metadata
 from swagger_gen.lib.utils import (
     element_at,
-    first,
     validate_constant,
     defined,
     is_type,
     not_null,
 )
 
+if TYPE_CHECKING:
+    from swagger_gen.lib.sampler import OperationSamples
+
+# Shared by every operation that doesn't define its own responses
+DEFAULT_RESPONSES = (
+    SwaggerResponse(
+        status_code='200',
+        description='Success'),
+)
+
 
 class SwaggerDefinition:
     '''
-    The definition buildup utility.  This should not be long for this world.
-    Improvements can be made to pull this apart into classes that handle their
-    own schema generation, i.e. SwaggerQueryParam..  There are a handful of 
-    clear benefits from this:
-        - Less likely to break shit in the schema
-        - Separate implementation details.  i.e. generic schema objects that
-        should be interchangable to generate JSON, YAML, etc.
-            - generating the schema can be hidden.
+    The definition buildup utility.  Each endpoint is parsed once into the
+    `SwaggerDocument` intermediate representation (operations, parameters,
+    responses and components), and the spec output is generated from the
+    document by an emitter, i.e. `DictEmitter`, `JsonEmitter` or
+    `YamlEmitter`
     '''
 
     def __init__(
@@ -54,6 +67,12 @@ class SwaggerDefinition:
         self._app_external_doc_url = kwargs.get('external_doc_url')
         self._app_servers = kwargs.get('servers')
         self._app_auth_schemes = kwargs.get('auth_schemes')
+        self._shared_components = kwargs.get('shared_components') or False
+        self._canonical = kwargs.get('canonical') or False
+        self._traffic_sampler = kwargs.get('traffic_sampler')
+        self._audiences = kwargs.get('audiences')
+        self._blueprint_visibility = kwargs.get('blueprint_visibility') or {}
+        self._metadata_manifest = kwargs.get('metadata_manifest')
 
         is_type(self._app_servers, 'auth_schemes', list)
         is_type(self._app_servers, 'servers', list)
@@ -64,8 +83,54 @@ class SwaggerDefinition:
         is_type(self._app_contact_email, 'contact_email', str)
         is_type(self._app_description, 'description', str)
         is_type(self._app_terms_of_service, 'terms_of_service', str)
+        is_type(self._shared_components, 'shared_components', bool)
+        is_type(self._canonical, 'canonical', bool)
+        is_type(self._audiences, 'audiences', list)
+        is_type(self._blueprint_visibility, 'blueprint_visibility', dict)
+
+        # The optional features are only imported when they're used
+        if self._traffic_sampler is not None:
+            from swagger_gen.lib.sampler import TrafficSampler
+            is_type(self._traffic_sampler, 'traffic_sampler', TrafficSampler)
+
+        if self._metadata_manifest is not None:
+            from swagger_gen.lib.manifest import MetadataManifest
+            is_type(self._metadata_manifest, 'metadata_manifest', MetadataManifest)
+
+        for visibility in self._blueprint_visibility.values():
+            self._validate_visibility(visibility)
+
+        # Security schemes keyed by name for the endpoint security lookups
+        self._auth_schemes_by_name = {
+            auth_scheme.name: auth_scheme
+            for auth_scheme in self._app_auth_schemes or []
+        }
+
+        self._document = SwaggerDocument(
+            header=self._get_base_definition())
+
+        # The generated definition is cached until the next endpoint is added
+        self._definition = None
+
+        # Identical parameters are only created once and shared between the
+        # operations that use them
+        self._parameters = dict()
+
+        # If there are auth schemes defined, parse and add them to the components
+        # section
+        if (defined(self._app_auth_schemes)
+                and any(self._app_auth_schemes)):
+            self._create_auth_section()
 
-        self._definition = self._get_base_definition()
+    def get_document(self) -> SwaggerDocument:
+        '''
+        Return the spec intermediate representation
+
+        returns:
+        `SwaggerDocument`: the spec document
+        '''
+
+        return self._document
 
     def get_definition(self) -> dict:
         '''
@@ -75,6 +140,11 @@ class SwaggerDefinition:
         `dict`: Swagger definitions
         '''
 
+        if self._definition is None:
+            self._definition = DictEmitter(
+                shared_components=self._shared_components,
+                canonical=self._canonical).emit(self._document)
+
         return self._definition
 
     def add_endpoint(
@@ -93,178 +163,282 @@ class SwaggerDefinition:
 
         self._create_endpoint_definition(endpoint)
 
+        self._definition = None
+
+    def add_endpoints(
+            self,
+            endpoints: List[SwaggerEndpoint]) -> None:
+        '''
+        Parse a list of endpoints and add them to the Swagger definitions
+
+        params:
+        `endpoints` : endpoints to parse
+        '''
+
+        is_type(endpoints, 'endpoints', list)
+
+        for endpoint in endpoints:
+            self._create_endpoint_definition(endpoint)
+
+        self._definition = None
+
+    def add_document(
+            self,
+            document: SwaggerDocument,
+            path_prefix: str = '',
+            name: Union[str, None] = None) -> None:
+        '''
+        Merge another Swagger document into this definition, i.e. the document
+        of an app mounted under a dispatcher.  Identical components are only
+        included once.  A component with the same key as an existing one but a
+        different model is renamed with the path prefix (i.e. `users.User` for
+        `/users`), or with the name for a document mounted at the root, and
+        the operations that reference it are updated
+
+        params:
+        `document`: the document to merge.  The operations are added to this
+        definition as-is, so the document shouldn't be used again afterwards
+        `path_prefix`: the path the document's routes are mounted under
+        `name`: the name of the document's app, conflicting components are
+        renamed with it when there's no path prefix
+        '''
+
+        not_null(document, 'document')
+        is_type(document, 'document', SwaggerDocument)
+        is_type(path_prefix, 'path_prefix', str)
+        is_type(name, 'name', str)
+
+        path_prefix = path_prefix.rstrip('/')
+
+        # A document mounted at the root has no prefix to rename with
+        namespace = path_prefix.strip('/').replace('/', '.') or name
+
+        additions, renamed = merge_components(
+            existing={
+                component_type: {
+                    key: component.model
+                    for key, component in section.items()
+                }
+                for component_type, section in self._document.components.items()
+            },
+            incoming={
+                component_type: {
+                    key: component.model
+                    for key, component in section.items()
+                }
+                for component_type, section in document.components.items()
+            },
+            namespace=namespace)
+
+        for component_type, key, model in additions:
+            self._document.add_component(SwaggerComponent(
+                component_type=component_type,
+                key=key,
+                model=model))
+
+        for endpoint_literal, operations in document.paths.items():
+            for operation in operations.values():
+                if operation.request_model_key is not None:
+                    operation.request_model_key = renamed.get(
+                        (ComponentType.SCHEMAS, operation.request_model_key),
+                        operation.request_model_key)
+
+                if operation.security is not None:
+                    scheme_name, scopes = operation.security
+                    operation.security = (
+                        renamed.get(
+                            (ComponentType.SECURITY_SCHEMES, scheme_name),
+                            scheme_name),
+                        scopes)
+
+                self._document.add_operation(
+                    endpoint_literal=f'{path_prefix}{endpoint_literal}',
+                    operation=operation)
+
+        self._definition = None
+
+    def _validate_response(self, response: List[tuple]) -> None:
+        '''Validate the response descriptors defined in the metadata'''
+
+        is_type(response, 'response', list)
+
+        for descriptor in response:
+            # Verify the response descriptor contains both the status and description
+            if len(descriptor) != 2:
+                raise Exception(f'''
+                    Invalid response definition.  The response must either be a list of tuples
+                    or a single tuple with a status code and a description describing the status''')
+
+    def _validate_security(self, metadata: EndpointMetadata) -> None:
+        '''Validate the security scheme defined in the metadata'''
+
+        # If no schemes are defined
+        if not defined(self._app_auth_schemes):
+            raise Exception('No security schemes are defined')
+
+        # If the requested scheme is not defined
+        security_schema = self._auth_schemes_by_name.get(metadata.security)
+
+        if security_schema is None:
+            raise Exception(
+                f"No scheme with the name '{metadata.security}' is defined")
+
+        # Scopes are required for the OAuth schemes
+        if (security_schema.auth_type == AuthType.OAUTH_2
+                and not defined(metadata.scopes)):
+            raise Exception(
+                'Scopes must be provided when using an OAuth flow')
+
+    def _validate_visibility(self, visibility: str) -> None:
+        '''Validate a visibility is one of the audiences'''
+
+        is_type(visibility, 'visibility', str)
+
+        if self._audiences is not None and visibility not in self._audiences:
+            audiences = ', '.join(self._audiences)
+            raise Exception(
+                f"Invalid visibility '{visibility}', expected one of: {audiences}")
+
     def _add_path(
             self,
             endpoint_literal: str,
-            definition: dict) -> None:
-        '''Add the generated endpoint path schema to the Swagger definition'''
+            operation: SwaggerOperation) -> None:
+        '''Add the generated endpoint operation to the Swagger document'''
 
         not_null(endpoint_literal, 'endpoint_literal')
-        not_null(definition, 'definition')
+        not_null(operation, 'operation')
 
-        # If we've already defined a method on this endpoint literal, we'll need to
-        # add the supplied definitions to the existing endpoint definition.
-        if self._definition[Schema.PATHS].get(endpoint_literal):
-            for method in definition.keys():
-                self._definition[Schema.PATHS][endpoint_literal][method] = definition[method]
-
-        # If this is the first or only endpoint definition, just set it on the key
-        else:
-            self._definition[Schema.PATHS][endpoint_literal] = definition
+        # If we've already defined a method on this endpoint literal the operation
+        # is added alongside the existing ones
+        self._document.add_operation(
+            endpoint_literal=endpoint_literal,
+            operation=operation)
 
     def _add_component(
             self,
             component_key: str,
             component_type: str,
             component_model: dict) -> None:
-        '''Add the generated component schema to the definition'''
+        '''Add the generated component schema to the document'''
 
         not_null(component_key, 'component_key')
         not_null(component_type, 'component_type')
         not_null(component_model, 'component_model')
 
-        # Set an empty dictionary if the section doesn't exist yet for the specified
-        # component type
-        if self._definition[Schema.COMPONENTS].get(component_type) is None:
-            self._definition[Schema.COMPONENTS][component_type] = dict()
-
-        self._definition[Schema.COMPONENTS][component_type][component_key] = component_model
+        self._document.add_component(
+            SwaggerComponent(
+                component_type=component_type,
+                key=component_key,
+                model=component_model))
 
     def _create_endpoint_definition(
             self,
             endpoint: SwaggerEndpoint) -> None:
-        ''' Generate the endpoint definition from the provided SwaggerEndpoint '''
+        ''' Generate the endpoint operations from the provided SwaggerEndpoint '''
 
         not_null(endpoint, 'endpoint')
-        definition = dict()
-
-        # If there are auth schemes defined, parse and add them to the components
-        # section
-        if (defined(self._app_auth_schemes)
-                and any(self._app_auth_schemes)):
-            self._create_auth_section()
 
-        # There can be multiple methods per endpoint, each with their own definition
+        # Fetch any defined route metadata from the metadata collection.  When the
+        # app starts and routes are registered, we build out the route metadata from
+        # details provided on the wrappers (swagger_metadata, etc).  Since this occurs
+        # before `werkzeug` maps are available (which the base documentation is parsed
+        # from) it's stored in a global MetadataCollection instance, and fetched here
+        # by the view function name as the key.  Metadata declared in a manifest
+        # is indexed the same way, and takes precedence
+        metadata = self._get_endpoint_metadata(
+            view_function_name=endpoint.view_function_name)
+
+        # Handle the route segments.  These have to be modified slightly
+        # from Flask's formatting to match Swagger conventions.  Basically
+        # just swapping the carats for curly braces.  The parameters are the
+        # same for every method on the endpoint, so they're only created once
+        path_parameters = tuple(
+            self._create_parameter_definition(
+                arg, ParameterType.PATH)
+            for arg in endpoint.segment_params
+        )
+
+        # Visibility only matters when the spec is split into audiences
+        visibility = None
+        if self._audiences is not None:
+            visibility = self._get_visibility(
+                endpoint=endpoint,
+                metadata=metadata)
+
+        # There can be multiple methods per endpoint, each with their own operation
         for method in endpoint.methods:
 
             # Start with the endpoint tag, or the 'section' the endpoint will be displayed
             # under in the Swagger UI
-            method_definition = {
-                Schema.ENDPOINT_TAGS: [endpoint.tag]
-            }
+            operation = SwaggerOperation(
+                method=method.lower(),
+                tag=endpoint.tag)
 
-            # Fetch any defined route metadata from the metadata collection.  When the
-            # app starts and routes are registered, we build out the route metadata from
-            # details provided on the wrappers (swagger_metadata, etc).  Since this occurs
-            # before `werkzeug` maps are available (which the base documentation is parsed
-            # from) it's stored in a global MetadataCollection instance, and fetched here
-            # by the view function name as the key
-            metadata = get_endpoint_metadata(
-                view_function_name=endpoint.view_function_name)
-
-            # Handle the route segments.  These have to be modified slightly
-            # from Flask's formatting to match Swagger conventions.  Basically
-            # just swapping the carats for curly braces
-            parameters = list()
-            if any(endpoint.segment_params):
-
-                # Generate the documentation for the route segment
-                path_parameters = (
-                    [
-                        self._create_parameter_definition(
-                            arg, Meta.PARAM_PATH_TYPE)
-                        for arg in endpoint.segment_params
-                    ])
-
-                parameters.extend(path_parameters)
+            operation.parameters = path_parameters
+            operation.visibility = visibility
 
             # If the endpoint has metadata defined, parse it and include it in the
-            # definition
+            # operation
             if metadata is not None:
                 self._add_metadata(
-                    method_definition=method_definition,
+                    operation=operation,
                     endpoint=endpoint,
-                    metadata=metadata,
-                    parameters=parameters)
+                    metadata=metadata)
 
             # Add generic metadata if it's not defined on the route
             else:
-                defaults = self._get_default_metadata()
-                method_definition = method_definition | defaults
-
-            if not any(parameters):
-                method_definition[Schema.PARAMETERS] = parameters
-
-        # Set the method definition on the endpoint definition using the lowered
-        # method name
-        definition[method.lower()] = method_definition
-
-        # Add the endpoint definition to the spec
-        self._add_path(
-            endpoint_literal=endpoint.endpoint_literal,
-            definition=definition)
-
-    def _get_default_metadata(self):
-        _metadata = dict()
-        _metadata[Schema.ENDPOINT_RESPONSES] = self._get_default_responses()
-
-        return _metadata
-
-    def _get_base_method_definition(self, endpoint: SwaggerEndpoint) -> dict:
-        '''
-        Get the base definition for the endpoint request method.
-        '''
-
-        not_null(endpoint, 'endpoint')
-
-        is_type(endpoint, 'endpoint', SwaggerEndpoint)
-
-        # TODO: This can probably be ditched and inclued somewhere else.
-        # there used to be more going on in here
-
-        return {
-            Schema.ENDPOINT_TAGS: [endpoint.tag]
-        }
+                operation.responses = self._get_default_responses()
+
+            # Fill in anything the metadata doesn't define from the sampled
+            # traffic
+            if self._traffic_sampler is not None:
+                samples = self._traffic_sampler.get_samples(
+                    view_function_name=endpoint.view_function_name,
+                    method=method)
+
+                if samples is not None:
+                    self._add_samples(
+                        operation=operation,
+                        endpoint=endpoint,
+                        metadata=metadata,
+                        samples=samples)
+
+            # Add the operation to the spec
+            self._add_path(
+                endpoint_literal=endpoint.endpoint_literal,
+                operation=operation)
 
     def _add_metadata(
             self,
             endpoint: SwaggerEndpoint,
             metadata: EndpointMetadata,
-            parameters: List,
-            method_definition: dict) -> None:
+            operation: SwaggerOperation) -> None:
         '''
-        Add any defined metadata for the endpoint to the definition
+        Add any defined metadata for the endpoint to the operation
         '''
 
         not_null(endpoint, 'endpoint')
         not_null(metadata, 'metadata')
-        not_null(method_definition, 'method_definition')
+        not_null(operation, 'operation')
 
         # Validate types
         is_type(endpoint, 'endpoint', SwaggerEndpoint)
         is_type(metadata, 'metadata', EndpointMetadata)
-        is_type(parameters, 'parameters', list, null=True)
-        is_type(method_definition, 'method_definition', dict)
+        is_type(operation, 'operation', SwaggerOperation)
 
         # If query parameters are defined in the metadata, parse them and add to the
-        # endpoint definition.
+        # operation after the path parameters
         if metadata.query_params:
-            query_parameters = (
-                [
-                    self._create_parameter_definition(
-                        name=arg,
-                        parameter_type=ParameterType.QUERY)
-                    for arg in metadata.query_params
-                ])
-            parameters.extend(query_parameters)
-
-        if any(parameters):
-            method_definition[Schema.PARAMETERS] = parameters
+            operation.parameters = operation.parameters + tuple(
+                self._create_parameter_definition(
+                    name=arg,
+                    parameter_type=ParameterType.QUERY)
+                for arg in metadata.query_params
+            )
 
         # If a request model is defined in the metadata
         if metadata.request_model:
-            method_definition[Schema.REQUEST_BODY] = (
-                self._get_model_reference(endpoint=endpoint))
+            operation.request_model_key = endpoint.component_key
 
             # Add the model to the component section of the documentation.  The models
             # representing the requests are stored under 'components', and on the route
@@ -277,72 +451,138 @@ class SwaggerDefinition:
 
         # If there are respones defined in the metadata, use those
         if metadata.response_model:
-            method_definition[Schema.ENDPOINT_RESPONSES] = (
-                self._format_response(
-                    response=metadata.response_model)
-            )
+            operation.responses = self._format_response(
+                response=metadata.response_model)
 
         # Otherwise just use some default values (200, success)
         else:
-            method_definition[Schema.ENDPOINT_RESPONSES] = (
-                self._get_default_responses()
-            )
+            operation.responses = self._get_default_responses()
 
         # If there are endpoint descriptions provided.  The endpoint description
         # is displayed in the expanded endpoint accordion
         if metadata.description:
-            method_definition[Schema.DESCRIPTION] = metadata.description
+            operation.description = metadata.description
         else:
-            method_definition[Schema.DESCRIPTION] = endpoint.view_function_name
+            operation.description = endpoint.view_function_name
 
         # If there is an endpoint summary provided.  The summary is displayed in
         # the collapsed endpoint accordion, adjacent to the route
         if metadata.summary:
-            method_definition[Schema.SUMMARY] = metadata.summary
+            operation.summary = metadata.summary
 
         # If there are security schemes defined, include them on the endpoint
         if metadata.security:
-            # If no schemes are defined
-            if not defined(self._app_auth_schemes):
-                raise Exception('No security schemes are defined')
+            self._validate_security(metadata)
 
-            # If the requested scheme is not defined
-            security_schema = first(
-                self._app_auth_schemes,
-                lambda x: x.name == metadata.security)
-
-            if security_schema is None:
-                raise Exception(
-                    f"No scheme with the name '{metadata.security}' is defined")
+            security_schema = self._auth_schemes_by_name[metadata.security]
 
             # Include the scopes for the OAuth schemes
             if security_schema.auth_type == AuthType.OAUTH_2:
-                if not defined(metadata.scopes):
-                    raise Exception(
-                        'Scopes must be provided when using an OAuth flow')
-
-                method_definition[Schema.SECURITY] = [{
-                    metadata.security: metadata.scopes
-                }]
+                operation.security = (metadata.security, metadata.scopes)
 
             # Other methods can take an empty list
             else:
-                method_definition[Schema.SECURITY] = [{
-                    metadata.security: []
-                }]
+                operation.security = (metadata.security, [])
+
+    def _get_endpoint_metadata(
+            self,
+            view_function_name: str) -> Union[EndpointMetadata, None]:
+        '''Get the metadata for an endpoint from the manifest, otherwise from the decorator'''
+
+        if self._metadata_manifest is not None:
+            metadata = self._metadata_manifest.get(view_function_name)
+            if metadata is not None:
+                return metadata
+
+        return get_endpoint_metadata(
+            view_function_name=view_function_name)
+
+    def _get_visibility(
+            self,
+            endpoint: SwaggerEndpoint,
+            metadata: Union[EndpointMetadata, None]) -> Union[str, None]:
+        '''
+        Get the visibility of an endpoint from its metadata, otherwise from
+        the blueprint it's on
+        '''
+
+        visibility = None
+        if metadata is not None and metadata.visibility:
+            visibility = metadata.visibility
+
+        # Blueprint endpoints are named `blueprint.view`, nested blueprints
+        # are named `parent.child.view`
+        elif '.' in endpoint.view_function_name:
+            blueprint_name = endpoint.view_function_name.rpartition('.')[0]
+            visibility = self._blueprint_visibility.get(blueprint_name)
+
+        if visibility is not None:
+            self._validate_visibility(visibility)
+
+        return visibility
+
+    def _add_samples(
+            self,
+            endpoint: SwaggerEndpoint,
+            metadata: Union[EndpointMetadata, None],
+            samples: 'OperationSamples',
+            operation: SwaggerOperation) -> None:
+        '''
+        Add the query parameters, request model and responses inferred from
+        the sampled traffic to the operation, where the metadata doesn't
+        define them
+        '''
+
+        from swagger_gen.lib.sampler import get_shape_schema, get_status_description
+
+        # Observed query parameters aren't sent on every request, so they're
+        # added as optional
+        defined_params = set()
+        if metadata is not None and metadata.query_params:
+            defined_params.update(metadata.query_params)
+
+        inferred_params = sorted(
+            name for name in samples.query_params
+            if name not in defined_params)
+
+        if any(inferred_params):
+            operation.parameters = operation.parameters + tuple(
+                self._create_parameter_definition(
+                    name=name,
+                    parameter_type=ParameterType.QUERY,
+                    required=False)
+                for name in inferred_params
+            )
+
+        # Each method gets its own inferred model, the bodies sent to them
+        # aren't necessarily the same
+        if (any(samples.body_shapes)
+                and (metadata is None or not metadata.request_model)):
+            component_key = f'{endpoint.component_key}.{operation.method}'
+            operation.request_model_key = component_key
+
+            self._add_component(
+                component_type=ComponentType.SCHEMAS,
+                component_key=component_key,
+                component_model=get_shape_schema(samples.body_shapes))
+
+        if (any(samples.status_codes)
+                and (metadata is None or not metadata.response_model)):
+            operation.responses = tuple(
+                SwaggerResponse(
+                    status_code=str(status_code),
+                    description=get_status_description(status_code))
+                for status_code in sorted(samples.status_codes)
+            )
 
     def _get_base_definition(self) -> dict:
         '''
-        Get the boilerplate definition schema.  This serves as the base for the Swagger
-        definitions, where paths and component schemas are populated during the buildup
+        Get the boilerplate definition header.  This serves as the base for the Swagger
+        definitions, the paths and component schemas are generated from the document
         '''
 
         base = {
-            Schema.OPEN_API: Schema.OPEN_API_VERSION,
-            Schema.PATHS: {},
-            Schema.COMPONENTS: {
-                Schema.SCHEMAS: {}
-            }
+            Schema.OPEN_API: Schema.OPEN_API_VERSION
         }
 
         # The title is the only required value here, if it isn't provided during buildup
@@ -391,33 +631,12 @@ class SwaggerDefinition:
         base[Schema.INFO] = info
         return base
 
-    def _get_default_responses(self) -> dict:
+    def _get_default_responses(self) -> Tuple[SwaggerResponse, ...]:
         '''The default endpoint responses, used if no others are defined'''
 
         # TODO: Pass down responses from create_endpoint -> _create_path, etc
 
-        return {
-            '200': {
-                Schema.DESCRIPTION: 'Success'
-            }
-        }
-
-    def _get_model_reference(
-            self,
-            endpoint: SwaggerEndpoint) -> Union[dict, None]:
-        '''Get the endpoint request model definition to be included in the definition components'''
-
-        not_null(endpoint, 'endpoint')
-
-        return {
-            Schema.CONTENT: {
-                ContentType.APPLICATION_JSON: {
-                    Schema.SCHEMA: {
-                        Schema.REF: f'#/components/schemas/{endpoint.component_key}'
-                    }
-                }
-            }
-        }
+        return DEFAULT_RESPONSES
 
     def _get_model_component_schema(
             self,
@@ -441,34 +660,28 @@ class SwaggerDefinition:
 
         return model_metadata
 
-    def _format_response(self, response: List[tuple]) -> dict:
+    def _format_response(self, response: List[tuple]) -> Tuple[SwaggerResponse, ...]:
         '''
         Format response definitions for the Swagger documentation
         '''
 
         # TODO: Verify status code cardinality as it's used as a key
-        _responses = dict()
-        is_type(response, 'response', list)
+        _responses = list()
 
-        for descriptor in response:
-            # Verify the response descriptor contains both the status and description
-            if len(descriptor) != 2:
-                raise Exception(f'''
-                    Invalid response definition.  The response must either be a list of tuples
-                    or a single tuple with a status code and a description describing the status''')
+        self._validate_response(response)
 
-            _status_code = str(element_at(descriptor, 0))
-            _responses[_status_code] = {
-                Schema.DESCRIPTION: element_at(descriptor, 1)
-            }
+        for descriptor in response:
+            _responses.append(SwaggerResponse(
+                status_code=str(element_at(descriptor, 0)),
+                description=element_at(descriptor, 1)))
 
-        return _responses
+        return tuple(_responses)
 
     def _create_parameter_definition(
             self,
             name: str,
             parameter_type: str,
-            required=True) -> dict:
+            required=True) -> SwaggerParameter:
         '''
         Generate an endpoint paramaeter definition
 
@@ -487,17 +700,18 @@ class SwaggerDefinition:
         # Validate parameter type options
         validate_constant(ParameterType, parameter_type)
 
-        return {
-            Schema.NAME: name,
-            Schema.IN: parameter_type,
-            Schema.REQUIRED: required,
-            Schema.SCHEMA: {
-                Schema.PROPERTY_TYPE: 'string',
-                Schema.NULLABLE: False
-            }
-        }
+        parameter_key = (name, parameter_type, required)
+        parameter = self._parameters.get(parameter_key)
+
+        if parameter is None:
+            parameter = self._parameters[parameter_key] = SwaggerParameter(
+                name=name,
+                location=parameter_type,
+                required=required)
+
+        return parameter
 
-    def _create_auth_section(self) -> dict:
+    def _create_auth_section(self) -> None:
         '''Generate the spec for the auth schemes'''
 
         for auth_scheme in self._app_auth_schemes:
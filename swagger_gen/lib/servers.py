@@ -0,0 +1,207 @@
+from swagger_gen.lib.constants import ContentType, Schema
+from swagger_gen.lib.content import CachedContent
+from swagger_gen.lib.utils import is_type, not_null
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union
+import json
+import re
+import threading
+
+# Stands in for the servers section when the spec is serialized, so the
+# serialized spec can be split around it
+_servers_placeholder = '\x00swagger-gen-servers\x00'
+
+# Hosts (with an optional port) that can be put in a server URL
+_host_pattern = re.compile(r'[A-Za-z0-9.-]+(:[0-9]{1,5})?|\[[0-9A-Fa-f:.]+\](:[0-9]{1,5})?')
+
+
+class ServerTemplate:
+    '''
+    Server URLs generated from the host each request was sent to, so a
+    deployment that answers on several hostnames (internal, external,
+    regional, etc) gives each caller a spec with its own base URL.  The
+    host is read from `Host` and the scheme from the request, or from
+    `X-Forwarded-Host` and `X-Forwarded-Proto` behind a trusted proxy
+
+    params:
+    `urls`: the server URL templates, with `{scheme}` and `{host}` replaced
+    per request, i.e. `{scheme}://{host}/api`
+    `allowed_hosts`: the hosts that get their own servers.  Requests for any
+    other host are served the default servers, so a caller can't put its
+    own host in the spec
+    `trust_forwarded`: read the host and scheme from the `X-Forwarded-*`
+    headers.  Only enable it behind a proxy that sets them, otherwise
+    callers can set them to anything
+    `max_variants`: the maximum number of hosts to cache the spec for.  The
+    least recently requested host is dropped first
+    '''
+
+    def __init__(
+            self,
+            urls: Union[str, List[str]],
+            allowed_hosts: List[str],
+            trust_forwarded: bool = False,
+            max_variants: int = 32):
+
+        not_null(urls, 'urls')
+        is_type(urls, 'urls', (str, list))
+        is_type(allowed_hosts, 'allowed_hosts', list)
+        is_type(trust_forwarded, 'trust_forwarded', bool)
+        is_type(max_variants, 'max_variants', int)
+
+        self.urls = [urls] if isinstance(urls, str) else urls
+        self.trust_forwarded = trust_forwarded
+        self.max_variants = max_variants
+
+        if not allowed_hosts:
+            raise Exception("'allowed_hosts' must list at least one host")
+
+        self._allowed_hosts = frozenset(
+            host.lower() for host in allowed_hosts)
+
+    def get_origin(self, environ: dict) -> Union[Tuple[str, str], None]:
+        '''
+        Get the scheme and host of a request.  Returns `None` if the host
+        isn't allowed, or isn't a valid host
+
+        params:
+        `environ`: the WSGI environ of the request
+        '''
+
+        host = None
+        scheme = None
+
+        if self.trust_forwarded:
+            host = environ.get('HTTP_X_FORWARDED_HOST')
+            scheme = environ.get('HTTP_X_FORWARDED_PROTO')
+
+        # The first proxy in the chain is the one the caller connected to
+        if host:
+            host = host.split(',', 1)[0].strip()
+        else:
+            host = environ.get('HTTP_HOST')
+
+        if scheme:
+            scheme = scheme.split(',', 1)[0].strip().lower()
+        else:
+            scheme = environ.get('wsgi.url_scheme') or 'http'
+
+        if not host or scheme not in ('http', 'https'):
+            return None
+
+        host = host.lower()
+
+        if not _host_pattern.fullmatch(host):
+            return None
+
+        if host not in self._allowed_hosts:
+            return None
+
+        return scheme, host
+
+    def get_servers(self, scheme: str, host: str) -> List[Dict[str, str]]:
+        '''Get the servers section for a scheme and host'''
+
+        return [
+            {Schema.URL: url.replace('{scheme}', scheme).replace('{host}', host)}
+            for url in self.urls
+        ]
+
+
+class ServerVariants:
+    '''
+    The spec of a single build, served with the servers for each host.  The
+    spec is serialized once with a placeholder for the servers, and split
+    around it.  The spec for a host is the two halves joined around its
+    servers, so the spec is never built or serialized again per host.  The
+    spec for each host is cached (with its `ETag`) in a least recently used
+    cache, and only compressed once a request for it accepts gzip
+
+    params:
+    `server_template`: the server URL templates
+    `definition`: the built definition
+    `canonical`: serialize the spec in canonical form
+    `vary`: any other request headers the spec depends on
+    '''
+
+    def __init__(
+            self,
+            server_template: ServerTemplate,
+            definition: dict,
+            canonical: bool = False,
+            vary: Tuple[str, ...] = ()):
+
+        not_null(server_template, 'server_template')
+        not_null(definition, 'definition')
+
+        self._server_template = server_template
+        self._canonical = canonical
+
+        # Without a host, the servers from the definition are used.  If there
+        # aren't any, the servers default to the root of the current host
+        default_servers = (definition.get(Schema.SERVERS)
+                           or [{Schema.URL: '/'}])
+
+        content = json.dumps(
+            dict(definition, **{Schema.SERVERS: _servers_placeholder}),
+            separators=(',', ':'),
+            sort_keys=canonical).encode('utf-8')
+
+        self._prefix, self._suffix = content.split(
+            json.dumps(_servers_placeholder).encode('utf-8'), 1)
+
+        # The request headers the servers depend on
+        self._vary = ('Host',)
+        if server_template.trust_forwarded:
+            self._vary += ('X-Forwarded-Host', 'X-Forwarded-Proto')
+        self._vary += tuple(vary)
+
+        self.default = self._create_variant(default_servers)
+
+        self._variants: 'OrderedDict[Tuple[str, str], CachedContent]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_spec(self, environ: dict) -> CachedContent:
+        '''
+        Get the spec with the servers for the host of a request
+
+        params:
+        `environ`: the WSGI environ of the request
+        '''
+
+        origin = self._server_template.get_origin(environ)
+        if origin is None:
+            return self.default
+
+        with self._lock:
+            variant = self._variants.get(origin)
+            if variant is not None:
+                self._variants.move_to_end(origin)
+                return variant
+
+        # Created outside the lock, so a new host doesn't hold up requests
+        # for the others.  Two requests for the same new host may both create
+        # it, the result is the same
+        variant = self._create_variant(
+            self._server_template.get_servers(*origin))
+
+        with self._lock:
+            self._variants[origin] = variant
+            self._variants.move_to_end(origin)
+
+            while len(self._variants) > self._server_template.max_variants:
+                self._variants.popitem(last=False)
+
+        return variant
+
+    def _create_variant(self, servers: List[dict]) -> CachedContent:
+        servers_content = json.dumps(
+            servers,
+            separators=(',', ':'),
+            sort_keys=self._canonical).encode('utf-8')
+
+        return CachedContent(
+            content=b''.join((self._prefix, servers_content, self._suffix)),
+            mimetype=ContentType.APPLICATION_JSON,
+            vary=self._vary,
+            lazy=True)
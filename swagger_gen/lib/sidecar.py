@@ -0,0 +1,186 @@
+from swagger_gen.lib.utils import is_type, not_null
+from typing import Callable, Union
+import errno
+import logging
+import os
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def not_found(environ: dict, start_response: Callable):
+    '''WSGI app for anything the sidecar doesn't serve'''
+
+    start_response('404 Not Found', [
+        ('Content-Type', 'text/plain; charset=utf-8'),
+        ('Content-Length', '9')
+    ])
+    return [b'Not Found']
+
+
+class DocsServer:
+    '''
+    A small HTTP server for the docs, running on a daemon thread next to the
+    app.  It listens on its own port or unix socket and handles each request
+    on its own thread, so docs requests never wait on the app's workers (or
+    the other way around), and it can be kept off the public network.
+
+    Under a server with multiple worker processes each process starts its
+    own sidecar.  The first one to bind the port or socket serves the docs
+    and the others skip it.  A socket file left behind by a previous run is
+    replaced
+
+    params:
+    `wsgi_app`: the WSGI app serving the docs
+    `host`: the interface to listen on
+    `port`: the port to listen on
+    `unix_socket`: the path of a unix socket to listen on instead of a port
+    '''
+
+    def __init__(
+            self,
+            wsgi_app: Callable,
+            host: str = '127.0.0.1',
+            port: Union[int, None] = None,
+            unix_socket: Union[str, None] = None):
+
+        not_null(wsgi_app, 'wsgi_app')
+        is_type(host, 'host', str)
+        is_type(port, 'port', int)
+        is_type(unix_socket, 'unix_socket', str)
+
+        if port is None and unix_socket is None:
+            raise Exception(
+                "Either 'port' or 'unix_socket' must be provided")
+
+        self._wsgi_app = wsgi_app
+        self._host = host
+        self._port = port
+        self._unix_socket = unix_socket
+
+        self._server = None
+
+    @property
+    def address(self) -> Union[str, None]:
+        '''The address the server is listening on, if it's running'''
+
+        if self._server is None:
+            return None
+
+        if self._unix_socket is not None:
+            return f'unix://{self._unix_socket}'
+
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> bool:
+        '''
+        Start serving on a daemon thread
+
+        returns:
+        `bool`: whether the server was started, `False` if the port is
+        already taken by another process
+        '''
+
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class RequestHandler(WSGIRequestHandler):
+            # Errors are still logged, but not every request
+            def log_request(self, *args, **kwargs):
+                pass
+
+        # The socket is bound here rather than by the server, which exits the
+        # process if the address is in use
+        listener = self._listen()
+        if listener is None:
+            return False
+
+        try:
+            self._server = make_server(
+                host=self._get_server_host(),
+                port=self._port or 0,
+                app=self._wsgi_app,
+                threaded=True,
+                request_handler=RequestHandler,
+                fd=listener.fileno())
+        finally:
+            # The server listens on a duplicate of the socket
+            listener.close()
+
+        worker = threading.Thread(
+            target=self._server.serve_forever,
+            name='swagger-gen-sidecar',
+            daemon=True)
+        worker.start()
+
+        logger.info(f'Serving the docs sidecar on {self.address}')
+        return True
+
+    def stop(self) -> None:
+        '''Stop serving and close the socket'''
+
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+        if self._unix_socket is not None and os.path.exists(self._unix_socket):
+            os.unlink(self._unix_socket)
+
+    def _get_server_host(self) -> str:
+        if self._unix_socket is not None:
+            return f'unix://{self._unix_socket}'
+        return self._host
+
+    def _listen(self) -> Union[socket.socket, None]:
+        '''
+        Bind and listen on the address.  Returns `None` if it's in use by
+        another process
+        '''
+
+        from werkzeug.serving import get_sockaddr, select_address_family
+
+        host = self._get_server_host()
+        family = select_address_family(host, self._port or 0)
+        address = get_sockaddr(host, self._port or 0, family)
+
+        listener = socket.socket(family, socket.SOCK_STREAM)
+        if self._unix_socket is None:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            listener.bind(address)
+        except OSError as ex:
+            listener.close()
+
+            if ex.errno != errno.EADDRINUSE:
+                raise
+
+            # Nothing is listening on the socket file, it's left over from a
+            # previous run
+            if self._unix_socket is not None and not _is_listening(address):
+                os.unlink(address)
+                return self._listen()
+
+            logger.info(
+                f'Not starting the docs sidecar, {host} is in use')
+            return None
+
+        listener.listen(128)
+        return listener
+
+
+def _is_listening(path: str) -> bool:
+    '''Whether anything is accepting connections on the unix socket'''
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
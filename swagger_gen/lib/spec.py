@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Tuple, Union
+
+
+class SwaggerParameter:
+    '''A path segment or query parameter on an operation'''
+
+    __slots__ = (
+        'name',
+        'location',
+        'required'
+    )
+
+    def __init__(
+            self,
+            name: str,
+            location: str,
+            required: bool = True):
+
+        self.name = name
+        self.location = location
+        self.required = required
+
+
+class SwaggerResponse:
+    '''A single status code and description on an operation'''
+
+    __slots__ = (
+        'status_code',
+        'description'
+    )
+
+    def __init__(
+            self,
+            status_code: str,
+            description: str):
+
+        self.status_code = status_code
+        self.description = description
+
+
+class SwaggerComponent:
+    '''
+    A model stored under the `components` section of the spec, i.e. a
+    request model schema or a security scheme
+    '''
+
+    __slots__ = (
+        'component_type',
+        'key',
+        'model'
+    )
+
+    def __init__(
+            self,
+            component_type: str,
+            key: str,
+            model: dict):
+
+        self.component_type = component_type
+        self.key = key
+        self.model = model
+
+
+class SwaggerOperation:
+    '''A single method on a path'''
+
+    __slots__ = (
+        'method',
+        'tag',
+        'summary',
+        'description',
+        'parameters',
+        'request_model_key',
+        'responses',
+        'security',
+        'visibility'
+    )
+
+    def __init__(
+            self,
+            method: str,
+            tag: str):
+
+        self.method = method
+        self.tag = tag
+
+        self.summary: Union[str, None] = None
+        self.description: Union[str, None] = None
+        self.parameters: Tuple[SwaggerParameter, ...] = ()
+        self.request_model_key: Union[str, None] = None
+        self.responses: Tuple[SwaggerResponse, ...] = ()
+
+        # Tuple containing the scheme name and the scopes
+        self.security: Union[Tuple[str, List[str]], None] = None
+
+        # The least privileged audience that can see the operation
+        self.visibility: Union[str, None] = None
+
+
+class SwaggerDocument:
+    '''
+    The intermediate representation of the spec.  Paths are keyed by the
+    endpoint literal and then by the lowered method name, components are
+    keyed by the component type and then by the component key.  Emitters
+    walk the document to generate the spec output
+    '''
+
+    __slots__ = (
+        'header',
+        'paths',
+        'components'
+    )
+
+    def __init__(self, header: dict):
+        self.header = header
+        self.paths: Dict[str, Dict[str, SwaggerOperation]] = dict()
+        self.components: Dict[str, Dict[str, SwaggerComponent]] = dict()
+
+    def add_operation(
+            self,
+            endpoint_literal: str,
+            operation: SwaggerOperation) -> None:
+        '''Add an operation to the path at the endpoint literal'''
+
+        operations = self.paths.get(endpoint_literal)
+        if operations is None:
+            operations = self.paths[endpoint_literal] = dict()
+
+        operations[operation.method] = operation
+
+    def add_component(
+            self,
+            component: SwaggerComponent) -> None:
+        '''Add a component to the section of the component type'''
+
+        section = self.components.get(component.component_type)
+        if section is None:
+            section = self.components[component.component_type] = dict()
+
+        section[component.key] = component
+
+
+def merge_components(
+        existing: Dict[str, Dict[str, Any]],
+        incoming: Dict[str, Dict[str, Any]],
+        namespace: str) -> Tuple[List[Tuple[str, str, Any]], Dict[Tuple[str, str], str]]:
+    '''
+    Work out the keys the components of another spec are merged under.  A
+    component with the same key and model as an existing one is left out.
+    A component with the same key but a different model is renamed
+    `namespace.key`, or `namespace.key.2` and so on if that's taken as well.
+    Returns the components to add, as the component type, merged key and
+    model, and the renamed keys, keyed by the component type and the
+    original key
+
+    params:
+    `existing`: the models of the components already in the spec, keyed by
+    the component type and then by the component key
+    `incoming`: the models of the components to merge, keyed the same way
+    `namespace`: what conflicting keys are prefixed with, i.e. the name of
+    the app or service the components come from
+    '''
+
+    additions = list()
+    renamed = dict()
+
+    for component_type, section in incoming.items():
+        existing_section = existing.get(component_type) or dict()
+
+        # The keys of this merge, so a renamed component can't collide with
+        # another component being merged
+        taken = set(section)
+
+        for key, model in section.items():
+            existing_model = existing_section.get(key)
+
+            # Already defined by another spec
+            if existing_model is not None and existing_model == model:
+                continue
+
+            merged_key = key
+            if existing_model is not None:
+                prefix = f'{namespace}.{key}' if namespace else key
+
+                merged_key = prefix
+                suffix = 1
+                while merged_key in existing_section or merged_key in taken:
+                    suffix += 1
+                    merged_key = f'{prefix}.{suffix}'
+
+                taken.add(merged_key)
+                renamed[(component_type, key)] = merged_key
+
+            additions.append((component_type, merged_key, model))
+
+    return additions, renamed
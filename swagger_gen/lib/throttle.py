@@ -0,0 +1,281 @@
+from swagger_gen.lib.utils import is_type, not_null
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, List, Union
+import logging
+import math
+import threading
+import time
+
+if TYPE_CHECKING:
+    from flask import Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Token bucket in a Redis hash.  The clock is read on the server, so every
+# node refills the bucket against the same time
+redis_token_bucket_script = '''
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(now - updated, 0) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+
+return tostring(wait)
+'''
+
+
+class ThrottleBackend(ABC):
+    '''
+    Storage for the token buckets.  To share the limits between workers or
+    nodes, implement `consume` against a shared store
+    '''
+
+    @abstractmethod
+    def consume(self, key: str, rate: float, capacity: float) -> float:
+        '''
+        Take a token from the bucket at the key.  A new bucket starts full
+
+        params:
+        `key`: the bucket key
+        `rate`: the tokens added to the bucket per second
+        `capacity`: the maximum number of tokens in the bucket
+
+        returns:
+        `float`: `0` if a token was taken, otherwise the number of seconds
+        until one is available
+        '''
+
+
+class MemoryBackend(ThrottleBackend):
+    '''
+    Token buckets held in memory, so the limits apply per process
+
+    params:
+    `max_keys`: the maximum number of buckets to hold.  Buckets that have
+    refilled are dropped first (a new bucket is the same as a full one),
+    then the least recently used buckets
+    '''
+
+    def __init__(self, max_keys: int = 10000):
+        is_type(max_keys, 'max_keys', int)
+
+        self._max_keys = max_keys
+
+        # The tokens in each bucket, when they were counted and when the
+        # bucket is full again.  Kept in the order the buckets were last used
+        self._buckets: 'OrderedDict[str, List[float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                if len(self._buckets) >= self._max_keys:
+                    self._prune(now)
+
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            self._buckets[key] = [
+                tokens, now, now + (capacity - tokens) / rate]
+
+            return wait
+
+    def _prune(self, now: float) -> None:
+        '''Make room for new buckets'''
+
+        self._buckets = OrderedDict(
+            (key, bucket) for key, bucket in self._buckets.items()
+            if bucket[2] > now)
+
+        # Too many clients are draining their buckets at once, evict the
+        # least recently used buckets to leave room for new ones
+        if len(self._buckets) >= self._max_keys:
+            while len(self._buckets) > self._max_keys * 3 // 4:
+                self._buckets.popitem(last=False)
+
+
+class RedisBackend(ThrottleBackend):
+    '''
+    Token buckets stored in Redis, so the limits are shared by every worker
+    and node using the same server.  Each bucket is updated atomically by a
+    script and expires once it's full again.  Takes a `redis-py` client (or
+    anything with a compatible `register_script`), `redis` isn't a
+    dependency of the package
+
+    params:
+    `client`: the Redis client
+    `prefix`: prefix for the bucket keys
+    '''
+
+    def __init__(self, client, prefix: str = 'swagger-gen:throttle:'):
+        not_null(client, 'client')
+        is_type(prefix, 'prefix', str)
+
+        self._prefix = prefix
+        self._script = client.register_script(
+            redis_token_bucket_script)
+
+    def consume(self, key: str, rate: float, capacity: float) -> float:
+        wait = self._script(
+            keys=[f'{self._prefix}{key}'],
+            args=[rate, capacity])
+
+        if isinstance(wait, bytes):
+            wait = wait.decode('utf-8')
+
+        return float(wait)
+
+
+class Throttle:
+    '''
+    Token bucket limits for the swagger-gen routes (the spec, the index and
+    the Swagger UI dependencies), per client and across all clients.  A
+    request over either limit gets a 429 with `Retry-After` before the view
+    runs, so nothing is serialized or loaded for it.  Requests for a
+    dependency that doesn't exist get a 404 from the dependency names alone,
+    without taking a token.  The client limit is
+    checked first, so a client over its own limit doesn't use up the global
+    limit.  If the backend fails, requests are let through
+
+    Loading the Swagger UI page takes around seven requests (the index, the
+    dependencies and the spec), which the client burst should allow for
+
+    params:
+    `rate`: requests per second across all clients
+    `burst`: the requests allowed at once across all clients, defaults to
+    the rate
+    `client_rate`: requests per second for each client
+    `client_burst`: the requests allowed at once for each client, defaults
+    to the client rate
+    `backend`: where the buckets are stored, defaults to `MemoryBackend`
+    `get_client_key`: gets the client key from the request, defaults to
+    the remote address.  Behind a proxy, use the forwarded address
+    '''
+
+    def __init__(
+            self,
+            rate: Union[float, None] = None,
+            burst: Union[float, None] = None,
+            client_rate: Union[float, None] = None,
+            client_burst: Union[float, None] = None,
+            backend: Union[ThrottleBackend, None] = None,
+            get_client_key: Union[Callable[['Request'], str], None] = None):
+
+        is_type(rate, 'rate', (int, float))
+        is_type(burst, 'burst', (int, float))
+        is_type(client_rate, 'client_rate', (int, float))
+        is_type(client_burst, 'client_burst', (int, float))
+        is_type(backend, 'backend', ThrottleBackend)
+
+        if rate is None and client_rate is None:
+            raise Exception(
+                "Either 'rate' or 'client_rate' must be provided")
+
+        # The buckets refill at the rate, so it has to be positive
+        for name, value in (
+                ('rate', rate),
+                ('burst', burst),
+                ('client_rate', client_rate),
+                ('client_burst', client_burst)):
+            if value is not None and value <= 0:
+                raise Exception(f"'{name}' must be greater than 0")
+
+        self._rate = rate
+        self._burst = max(burst or rate or 0, 1)
+        self._client_rate = client_rate
+        self._client_burst = max(client_burst or client_rate or 0, 1)
+
+        self._backend = backend or MemoryBackend()
+        self._get_client_key = get_client_key or (
+            lambda request: request.remote_addr or '')
+
+    def check(self, request: 'Request') -> float:
+        '''
+        Take a token for the request
+
+        returns:
+        `float`: `0` if the request is allowed, otherwise the number of
+        seconds until it would be
+        '''
+
+        try:
+            if self._client_rate is not None:
+                wait = self._backend.consume(
+                    key=f'client:{self._get_client_key(request)}',
+                    rate=self._client_rate,
+                    capacity=self._client_burst)
+
+                if wait > 0:
+                    return wait
+
+            if self._rate is not None:
+                return self._backend.consume(
+                    key='global',
+                    rate=self._rate,
+                    capacity=self._burst)
+
+            return 0.0
+
+        except Exception as ex:
+            logger.warning(f'Failed to check the throttle: {str(ex)}')
+            return 0.0
+
+    def reject(self, request: 'Request') -> Union['Response', None]:
+        '''
+        Take a token for the request, and get the 429 response if it's over
+        the limits.  Returns `None` if the request is allowed
+        '''
+
+        from flask import Response
+
+        wait = self.check(request)
+        if wait <= 0:
+            return None
+
+        return Response(
+            status=429,
+            headers={'Retry-After': str(math.ceil(wait))})
+
+    def limit(self, view_function: Callable) -> Callable:
+        '''Wrap a view function to reject requests over the limits'''
+
+        from flask import request
+
+        @wraps(view_function)
+        def limited(*args, **kwargs):
+            rejected = self.reject(request)
+            if rejected is not None:
+                return rejected
+
+            return view_function(*args, **kwargs)
+
+        return limited
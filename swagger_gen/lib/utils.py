@@ -1,5 +1,4 @@
-import inspect
-from typing import Any, Iterable, Tuple, Union
+from typing import Any, FrozenSet, Iterable, Tuple, Union
 
 
 def element_at(_iterable: Iterable[Any], index: int) -> Union[Any, None]:
@@ -15,16 +14,31 @@ def first(_iterable, func):
             return item
 
 
-def validate_constant(constant_class, value: Any) -> bool:
+# Constant class values, computed once per class
+_constant_values = dict()
+
+
+def get_constant_values(constant_class) -> FrozenSet[Any]:
+    values = _constant_values.get(constant_class)
+    if values is not None:
+        return values
+
+    import inspect
+
     class_members = inspect.getmembers(
         constant_class, lambda x: not(inspect.isroutine(x)))
 
-    class_attribs = [
+    values = frozenset(
         x[1] for x in class_members
         if not(x[0].startswith('__')
-               and x[0].endswith('__'))]
+               and x[0].endswith('__')))
+
+    _constant_values[constant_class] = values
+    return values
 
-    if value not in class_attribs:
+
+def validate_constant(constant_class, value: Any) -> bool:
+    if value not in get_constant_values(constant_class):
         raise Exception(
             f'Member {value} does not exist in class {constant_class.__name__}')
     return True
@@ -8,12 +8,12 @@ from swagger_gen.lib.utils import (
     is_type,
     not_null
 )
-from typing import Callable
-from flask import Blueprint
-from functools import wraps
-import inspect
+from typing import TYPE_CHECKING, Callable, Iterable
 import logging
 
+if TYPE_CHECKING:
+    from flask import Blueprint
+
 logger = logging.getLogger(__name__)
 endpoint_metadata = MetadataCollection()
 
@@ -43,6 +43,11 @@ def get_blueprint_from_context():
     app to see if we've squirreled away any metadata for it.  Simple enough, right?
     '''
 
+    # Deferred until a blueprint is actually inferred, nothing else in the
+    # package needs to pay for importing inspect
+    import inspect
+    from flask import Blueprint
+
     # Fetch the stack frame second from the top if we can
     caller_frame = element_at(inspect.stack(), 2)
 
@@ -85,7 +90,7 @@ def get_blueprint_from_context():
     return blueprint.name
 
 
-def get_blueprint_view_name(blueprint: Blueprint, view_function: Callable):
+def get_blueprint_view_name(blueprint: 'Blueprint', view_function: Callable):
     '''
     Get the full view function name from the blueprint and the
     view function
@@ -126,6 +131,10 @@ def swagger_metadata(**kwargs):
 
     `response_model`: an example of the endpoint response model
 
+    `visibility`: the least privileged audience that can see the
+    route, one of the `audiences` passed to `Swagger`, i.e. `internal`.
+    Routes without a visibility are visible to every audience
+
     `implicit_blueprints`: default is False, if enabled, we'll try
     to infer the blueprint the route is on (if it exists) by the
     function caller local context.  If more then one blueprint is
@@ -141,6 +150,10 @@ def swagger_metadata(**kwargs):
     def inner(view_function: Callable) -> Callable:
         ''' Flask view function passed in '''
 
+        # The decorated routes are defined on a Flask app, so Flask has already
+        # been imported by the time this runs
+        from flask import Blueprint
+
         # Parameters
         _summary = kwargs.get('summary')
         is_type(_summary, 'summary', str)
@@ -157,6 +170,9 @@ def swagger_metadata(**kwargs):
         _response_model = _request_model = kwargs.get('response_model')
         is_type(_response_model, 'response_model', list)
 
+        _visibility = kwargs.get('visibility')
+        is_type(_visibility, 'visibility', str)
+
         _implicit_blueprints = kwargs.get('implicit_blueprints')
         is_type(_implicit_blueprints, 'implicit_blueprints', bool)
 
@@ -195,10 +211,10 @@ def swagger_metadata(**kwargs):
             # function name
             endpoint_metadata[view_function.__name__] = _endpoint_metadata
 
-        @wraps(view_function)
-        def wrapper(*_args, **_kwargs):
-            return view_function(*_args, **_kwargs)
-        return wrapper
+        # The metadata is registered out-of-band in the collection, so the view
+        # function is returned as-is and the decorator adds nothing to the cost
+        # of handling a request
+        return view_function
     return inner
 
 
@@ -207,3 +223,12 @@ def get_endpoint_metadata(view_function_name) -> dict:
 
     not_null(view_function_name, 'view_function_name')
     return endpoint_metadata[view_function_name]
+
+
+def release_endpoint_metadata(view_function_names: Iterable[str]) -> None:
+    '''Remove the endpoint metadata for the view function name keys'''
+
+    not_null(view_function_names, 'view_function_names')
+
+    for view_function_name in view_function_names:
+        del endpoint_metadata[view_function_name]
@@ -1,12 +1,24 @@
 from swagger_gen.lib.utils import (
     is_type,
-    not_null
+    not_null,
+    validate_constant
 )
-from swagger_gen.lib.dependency import DependencyProvider
-from swagger_gen.lib.endpoint import SwaggerEndpoint
+from swagger_gen.lib.constants import BuildMode, ContentType, DocsRoute, DocsUrl
+from swagger_gen.lib.endpoint import SwaggerEndpoint, get_swagger_endpoints
 from swagger_gen.lib.schema import SwaggerDefinition
-from typing import List
-from flask import Flask
+from swagger_gen.lib.wrappers import release_endpoint_metadata
+from typing import TYPE_CHECKING, List, Union
+
+# The optional features (and what they import, i.e. sockets, compression
+# and hashing) are only imported when they're enabled, so importing
+# swagger-gen costs the same whichever features the app uses
+if TYPE_CHECKING:
+    from flask import Flask
+    from swagger_gen.lib.metrics import MetricsRegistry, SwaggerMetrics
+    from swagger_gen.lib.mock import MockServer
+    from swagger_gen.lib.provider import SpecProvider
+    from swagger_gen.lib.sidecar import DocsServer
+    from swagger_gen.lib.spec import SwaggerDocument
 
 
 class Swagger:
@@ -22,7 +34,7 @@ class Swagger:
     * Route segments as parameters
 
     Additional metadata can be defined via the `swagger_metadata` decorator on the
-    route itself.
+    route itself, or for many routes at once with `metadata_manifest`.
 
     params:
     `app` :   the Flask app
@@ -42,19 +54,110 @@ class Swagger:
     security:
     `auth_schemes`: list of security schemes
 
+    ui:
+    `spec_only`: only serve the spec at `/swagger/v1/swagger.json`, the
+    Swagger UI routes aren't bound and the UI dependencies are never loaded
+    `lazy_assets`: only load each of the Swagger UI dependencies into memory
+    once it's been requested
+    `inline_ui`: serve the Swagger UI as a single document, with the spec and
+    the dependencies inlined in the index.  The page is rendered once per
+    spec build and loads in a single request
+    `assets_url`: load the Swagger UI dependencies from this base URL (i.e.
+    a CDN) instead of serving them from the app.  The assets are exported
+    with `swagger-gen export-assets`
+
+    metadata:
+    `metadata_manifest`: the metadata of many routes, keyed by the endpoint
+    name, in place of `@swagger_metadata`.  Either a `MetadataManifest`, a
+    dictionary or the path of a JSON or YAML file.  It's validated once,
+    here, and takes precedence over the decorator
+
+    build:
+    `build_mode`: when the spec is built, `eager` (default) builds it in
+    `configure`, `lazy` builds it on the first request for the spec and
+    `background` builds it on a worker thread started in `configure`
+    `build_timeout`: in `background` mode, how long (in seconds) a request
+    waits on the build before getting a 503, waits indefinitely if not set
+    `low_memory`: only keep the compressed spec once it's built.  The
+    definition, the endpoints and their `@swagger_metadata` are released
+    after the build, so the spec can't be rebuilt (i.e. with `hot_reload`)
+
+    development:
+    `hot_reload`: watch the route metadata and traffic samples, and the
+    routes until the app handles its first request, and rebuild the spec in
+    the background when they change.  The previous spec is served until the
+    rebuild is done.  Source changes are left to the Flask reloader
+    `reload_interval`: how often to check for changes, in seconds
+    `reload_debounce`: how long changes have to settle before a rebuild, in
+    seconds
+
+    inference:
+    `traffic_sampler`: a `TrafficSampler` recording the query parameters,
+    JSON bodies and status codes of a fraction of the app's requests.  They
+    are added to the routes that don't define them in `@swagger_metadata`
+    on the next build, i.e. with `hot_reload` or `rebuild`
+
+    output:
+    `shared_components`: intern parameters and responses shared by multiple
+    routes into the spec components and reference them with `$ref`, where
+    that makes the spec smaller
+    `canonical`: serve the spec in a canonical form, with paths, methods,
+    components, parameters and keys sorted, so every worker and node
+    serves the same bytes with the same `ETag`
+    `server_template`: a `ServerTemplate` generating the `servers` of the
+    spec from the host of each request, instead of the fixed `servers`
+
+    audiences:
+    `audiences`: serve a separate spec to each audience, ordered from the
+    most to the least restricted, i.e. `['public', 'internal', 'admin']`.
+    Routes are hidden from the audiences before their `visibility` (set
+    with `@swagger_metadata` or `blueprint_visibility`), and each spec only
+    has the components its routes reference.  The specs are split and
+    serialized once per build
+    `audience_resolver`: an `AudienceResolver` picking the audience of
+    each request for the spec.  Requests for an unknown audience get the
+    first one, as does the inlined spec of `inline_ui`
+    `blueprint_visibility`: the visibility of the routes on each blueprint,
+    keyed by the blueprint name, i.e. `{'admin': 'admin'}`
+
+    metrics:
+    `metrics`: record request, cache and build metrics for the swagger-gen
+    routes.  Either `True`, or a `MetricsRegistry` to record them to
+    `metrics_url`: the route to serve the metrics at in the Prometheus text
+    format, i.e. `/swagger/metrics`.  Not bound unless it's set
+
+    throttling:
+    `throttle`: a `Throttle` with the request limits for the spec, index
+    and Swagger UI dependency routes
+
+    serving:
+    `wsgi_fast_path`: answer requests for the spec, index and Swagger UI
+    dependencies in WSGI middleware in front of the app, without Flask
+    routing, request hooks or response objects
+    `sidecar_port`: serve the docs from a separate HTTP server on this port,
+    running on a daemon thread, instead of from the app
+    `sidecar_host`: the interface the sidecar listens on, `127.0.0.1` by
+    default
+    `sidecar_socket`: serve the docs from the sidecar on this unix socket
+    instead of a port
+
     Currently, route-specific versions are not supported, but are slated as a
     priority for future releases
     '''
 
     def __init__(
             self,
-            app: Flask,
+            app: 'Flask',
             **kwargs):
 
         # app_name: str = None,
         # app_version: str = 'v1',
         # url: str = '/swagger'):
 
+        # Flask is only imported here to validate the app, since an app has
+        # been created the import is already paid for
+        from flask import Flask
+
         not_null(app, 'app')
         is_type(app, 'app', Flask)
 
@@ -64,10 +167,139 @@ class Swagger:
         self._url = kwargs.get('url') or '/swagger'
         is_type(self._url, 'url', str, null=False)
 
+        self._spec_only = kwargs.get('spec_only') or False
+        is_type(self._spec_only, 'spec_only', bool)
+
+        self._lazy_assets = kwargs.get('lazy_assets') or False
+        is_type(self._lazy_assets, 'lazy_assets', bool)
+
+        self._inline_ui = kwargs.get('inline_ui') or False
+        is_type(self._inline_ui, 'inline_ui', bool)
+
+        self._assets_url = kwargs.get('assets_url')
+        is_type(self._assets_url, 'assets_url', str)
+
+        # The single document has the dependencies inlined, there's nothing
+        # to offload
+        if self._inline_ui and self._assets_url is not None:
+            raise Exception(
+                "'inline_ui' and 'assets_url' can't be used together")
+
+        self._build_mode = kwargs.get('build_mode') or BuildMode.EAGER
+        is_type(self._build_mode, 'build_mode', str)
+        validate_constant(BuildMode, self._build_mode)
+
+        self._build_timeout = kwargs.get('build_timeout')
+        is_type(self._build_timeout, 'build_timeout', (int, float))
+
+        self._hot_reload = kwargs.get('hot_reload') or False
+        is_type(self._hot_reload, 'hot_reload', bool)
+
+        self._reload_interval = kwargs.get('reload_interval') or 1.0
+        is_type(self._reload_interval, 'reload_interval', (int, float))
+
+        self._reload_debounce = kwargs.get('reload_debounce') or 0.5
+        is_type(self._reload_debounce, 'reload_debounce', (int, float))
+
+        self._low_memory = kwargs.get('low_memory') or False
+        is_type(self._low_memory, 'low_memory', bool)
+
+        self._canonical = kwargs.get('canonical') or False
+        is_type(self._canonical, 'canonical', bool)
+
+        metrics = kwargs.get('metrics') or False
+
+        self._metrics_url = kwargs.get('metrics_url')
+        is_type(self._metrics_url, 'metrics_url', str)
+
+        self._metrics: Union['SwaggerMetrics', None] = None
+        if metrics is not False:
+            self._metrics = self._create_metrics(metrics)
+
+        self._throttle = kwargs.get('throttle')
+        if self._throttle is not None:
+            from swagger_gen.lib.throttle import Throttle
+            is_type(self._throttle, 'throttle', Throttle)
+
+        self._wsgi_fast_path = kwargs.get('wsgi_fast_path') or False
+        is_type(self._wsgi_fast_path, 'wsgi_fast_path', bool)
+
+        self._sidecar_port = kwargs.get('sidecar_port')
+        is_type(self._sidecar_port, 'sidecar_port', int)
+
+        self._sidecar_host = kwargs.get('sidecar_host') or '127.0.0.1'
+        is_type(self._sidecar_host, 'sidecar_host', str)
+
+        self._sidecar_socket = kwargs.get('sidecar_socket')
+        is_type(self._sidecar_socket, 'sidecar_socket', str)
+
+        self._server_template = kwargs.get('server_template')
+        if self._server_template is not None:
+            from swagger_gen.lib.servers import ServerTemplate
+            is_type(self._server_template, 'server_template', ServerTemplate)
+
+        self._traffic_sampler = kwargs.get('traffic_sampler')
+        if self._traffic_sampler is not None:
+            from swagger_gen.lib.sampler import TrafficSampler
+            is_type(self._traffic_sampler, 'traffic_sampler', TrafficSampler)
+
+        self._audiences = kwargs.get('audiences')
+        is_type(self._audiences, 'audiences', list)
+
+        self._audience_resolver = kwargs.get('audience_resolver')
+        if self._audience_resolver is not None:
+            from swagger_gen.lib.audience import AudienceResolver
+            is_type(self._audience_resolver, 'audience_resolver', AudienceResolver)
+
+        if self._audiences is not None:
+            if not any(self._audiences):
+                raise Exception("'audiences' can't be empty")
+
+            for audience in self._audiences:
+                not_null(audience, 'audience')
+                is_type(audience, 'audience', str)
+
+            if self._audience_resolver is None:
+                raise Exception(
+                    "An 'audience_resolver' is required with 'audiences'")
+
+        self._docs_server: Union['DocsServer', None] = None
+
+        # Rebuilding needs the route metadata that low-memory mode releases
+        if self._low_memory and self._hot_reload:
+            raise Exception(
+                "'low_memory' and 'hot_reload' can't be enabled together")
+
+        # The variants are joined from the uncompressed spec
+        if self._low_memory and self._server_template is not None:
+            raise Exception(
+                "'low_memory' and 'server_template' can't be enabled together")
+
+        # The samples are only merged into the spec on a rebuild
+        if self._low_memory and self._traffic_sampler is not None:
+            raise Exception(
+                "'low_memory' and 'traffic_sampler' can't be enabled together")
+
+        # The manifest is loaded and validated once, every build shares it
+        metadata_manifest = kwargs.get('metadata_manifest')
+        if metadata_manifest is not None:
+            from swagger_gen.lib.manifest import MetadataManifest, load_metadata_manifest
+            is_type(metadata_manifest, 'metadata_manifest', (MetadataManifest, dict, str))
+
+        if isinstance(metadata_manifest, str):
+            kwargs['metadata_manifest'] = load_metadata_manifest(metadata_manifest)
+        elif isinstance(metadata_manifest, dict):
+            kwargs['metadata_manifest'] = MetadataManifest(metadata_manifest)
+
+        # Every build starts from a new definition with the same parameters
+        self._definition_kwargs = kwargs
+
         self._definition: SwaggerDefinition = SwaggerDefinition(
             app=app,
             **kwargs)
 
+        self._spec_provider: 'SpecProvider' = None
+
     def configure(self):
         '''
         Configure swagger-gen.
@@ -85,38 +317,246 @@ class Swagger:
         as routes to the app automatically.        
         '''
 
+        from swagger_gen.lib.provider import SpecProvider
+
+        # Build the Swagger spec document, depending on the build mode this
+        # happens now, on the first request or on a worker thread
+        spec_provider = SpecProvider(
+            build_definition=self._build_swagger_definitions,
+            build_mode=self._build_mode,
+            build_timeout=self._build_timeout,
+            low_memory=self._low_memory,
+            canonical=self._canonical,
+            metrics=self._metrics,
+            server_template=self._server_template,
+            audiences=self._audiences,
+            audience_resolver=self._audience_resolver)
+
+        # A background build walks the url map on another thread, which isn't
+        # safe while the docs routes are being added to it, so it's started
+        # once they're bound
+        if self._build_mode != BuildMode.BACKGROUND:
+            spec_provider.start()
+
+        self._spec_provider = spec_provider
+
+        # With a sidecar, the docs are only served by the sidecar and no docs
+        # routes are bound on the app
+        sidecar = (self._sidecar_port is not None
+                   or self._sidecar_socket is not None)
+
         # Configure the Swagger dependency route (to serve css/js files from memory)
-        _resources: DependencyProvider = DependencyProvider(
-            app=self._app,
-            url=self._url)
-        _resources.bind_dependency_routes()
+        # unless we're only serving the spec
+        _resources = None
+        if not self._spec_only:
+            from swagger_gen.lib.dependency import DependencyProvider
+
+            _resources: DependencyProvider = DependencyProvider(
+                app=self._app,
+                url=self._url,
+                lazy_assets=self._lazy_assets,
+                spec_provider=(
+                    spec_provider if self._inline_ui
+                    else None),
+                metrics=self._metrics,
+                throttle=self._throttle,
+                assets_url=self._assets_url)
+
+            if not sidecar:
+                _resources.bind_dependency_routes()
+
+        if not sidecar:
+            self._bind_schema_endpoint(
+                spec_provider=spec_provider)
+
+        if self._metrics is not None and self._metrics_url is not None:
+            self._bind_metrics_endpoint()
+
+        if self._build_mode == BuildMode.BACKGROUND:
+            spec_provider.start()
+
+        # Serve the docs from the cached bytes before the request gets to Flask
+        if self._wsgi_fast_path and not sidecar:
+            from swagger_gen.lib.middleware import DocsMiddleware
+
+            self._app.wsgi_app = DocsMiddleware(
+                wsgi_app=self._app.wsgi_app,
+                spec_provider=spec_provider,
+                index_url=self._url,
+                dependency_provider=_resources,
+                metrics=self._metrics,
+                throttle=self._throttle)
+
+        # Serve the docs on their own port, from the same build as the app
+        if sidecar:
+            from swagger_gen.lib.middleware import DocsMiddleware
+            from swagger_gen.lib.sidecar import DocsServer, not_found
+
+            self._docs_server = DocsServer(
+                wsgi_app=DocsMiddleware(
+                    wsgi_app=not_found,
+                    spec_provider=spec_provider,
+                    index_url=self._url,
+                    dependency_provider=_resources,
+                    metrics=self._metrics,
+                    throttle=self._throttle),
+                host=self._sidecar_host,
+                port=self._sidecar_port,
+                unix_socket=self._sidecar_socket)
+            self._docs_server.start()
+
+        if self._traffic_sampler is not None:
+            self._traffic_sampler.install(self._app)
+
+        # Rebuild the spec in the background when the metadata changes
+        if self._hot_reload:
+            from swagger_gen.lib.reload import SpecReloader
+
+            reloader = SpecReloader(
+                app=self._app,
+                mounted_apps=self._get_mounted_apps(),
+                spec_provider=spec_provider,
+                interval=self._reload_interval,
+                debounce=self._reload_debounce,
+                traffic_sampler=self._traffic_sampler)
+            reloader.start()
+
+    def rebuild(self) -> None:
+        '''
+        Build the spec again, i.e. to include the latest traffic samples.
+        Requests are served the previous spec until the rebuild is done
+        '''
+
+        if self._spec_provider is None:
+            raise Exception("The spec can't be rebuilt before 'configure'")
 
-        # Build the Swagger spec document
-        definition = self._build_swagger_definitions()
+        if self._low_memory:
+            raise Exception(
+                "The spec can't be rebuilt when 'low_memory' is enabled")
 
-        #
-        self._bind_schema_endpoint(
-            definitions=definition)
+        self._spec_provider.rebuild()
 
-    def _bind_schema_endpoint(self, definitions: dict) -> None:
+    def get_document(self) -> 'SwaggerDocument':
+        '''
+        Get the spec intermediate representation, which can be passed to
+        any of the emitters to generate the spec output
+        '''
+
+        if self._definition is None:
+            raise Exception(
+                "The spec document isn't kept when 'low_memory' is enabled")
+
+        return self._definition.get_document()
+
+    def get_definition(self) -> dict:
+        '''
+        Get the built spec as a dictionary, i.e. to generate requests or a
+        mock server from.  Waits for a build that's running in the background
+        '''
+
+        if self._spec_provider is None:
+            raise Exception("The spec isn't built before 'configure'")
+
+        definition = self._spec_provider.get_definition()
+        if definition is None:
+            raise Exception('The Swagger definition is still being built')
+
+        return definition
+
+    def get_mock_server(self) -> 'MockServer':
+        '''
+        Get a WSGI app that serves an example response for every operation in
+        the spec, as a stand-in for the app when load testing its clients
+        '''
+
+        from swagger_gen.lib.mock import MockServer
+
+        return MockServer(definition=self.get_definition())
+
+    def get_metrics(self) -> Union['MetricsRegistry', None]:
+        '''
+        Get the registry the metrics are recorded to, i.e. to render them on
+        an existing metrics route.  Returns `None` if metrics aren't enabled
+        '''
+
+        if self._metrics is None:
+            return None
+
+        return self._metrics.registry
+
+    def _bind_schema_endpoint(self, spec_provider: 'SpecProvider') -> None:
         '''
         Bind the swagger configuration file route
 
         params:
-        schema  :   the swagger configuration file
+        spec_provider  :   the provider that builds the swagger configuration file
         '''
 
-        not_null(definitions, 'definitions')
+        not_null(spec_provider, 'spec_provider')
 
         # Flask view function that will return the Swagger definition
         def get_schema():
-            return definitions
+            from flask import Response, request
+
+            spec_build = spec_provider.get_build()
+
+            # The definition is still being built in the background
+            if spec_build is None:
+                return Response(
+                    status=503,
+                    headers={'Retry-After': '1'})
+
+            # The spec is serialized and compressed once per build, not per
+            # request
+            return spec_build.get_spec(request.environ).get_response(
+                request=request)
+
+        # Throttled requests are rejected before the build is looked up, and
+        # recorded by the metrics
+        if self._throttle is not None:
+            get_schema = self._throttle.limit(get_schema)
+
+        if self._metrics is not None:
+            get_schema = self._metrics.instrument(
+                DocsRoute.SPEC, get_schema)
 
         self._app.add_url_rule(
-            rule='/swagger/v1/swagger.json',
+            rule=DocsUrl.SPEC,
             view_func=get_schema,
             methods=['GET'])
 
+    def _create_metrics(
+            self,
+            metrics: Union[bool, 'MetricsRegistry']) -> 'SwaggerMetrics':
+        '''Create the metrics, recorded to the registry if one is passed'''
+
+        from swagger_gen.lib.metrics import MetricsRegistry, SwaggerMetrics
+        is_type(metrics, 'metrics', (bool, MetricsRegistry))
+
+        return SwaggerMetrics(
+            registry=(metrics if isinstance(metrics, MetricsRegistry)
+                      else MetricsRegistry()))
+
+    def _bind_metrics_endpoint(self) -> None:
+        '''
+        Bind the route serving the metrics in the Prometheus text exposition
+        format
+        '''
+
+        registry = self._metrics.registry
+
+        def get_swagger_metrics():
+            from flask import Response
+
+            return Response(
+                registry.render(),
+                content_type=ContentType.METRICS)
+
+        self._app.add_url_rule(
+            rule=self._metrics_url,
+            view_func=get_swagger_metrics,
+            methods=['GET'])
+
     def _build_swagger_definitions(self) -> dict:
         '''
         Build the Swagger JSON definitions
@@ -126,37 +566,51 @@ class Swagger:
         endpoints = self._get_swagger_endpoints()
 
         # Generate the endpoint documentation
-        for endpoint in endpoints:
-            self._definition.add_endpoint(endpoint)
+        definition = SwaggerDefinition(
+            app=self._app,
+            **self._definition_kwargs)
+        definition.add_endpoints(endpoints)
 
-        return self._definition.get_definition()
+        # Replace the previous definition once the new one is complete
+        self._set_definition(definition, endpoints)
 
-    def _get_swagger_endpoints(self, exclude_routes: List[str] = None) -> List[SwaggerEndpoint]:
+        return definition.get_definition()
+
+    def _set_definition(
+            self,
+            definition: SwaggerDefinition,
+            endpoints: List[SwaggerEndpoint]) -> None:
         '''
-        Parse the endpoints from the `werkzeug` `Rule` definitions
-        in the Flask app
+        Hold on to the built definition, or in low-memory mode release it
+        along with the metadata of the endpoints it was built from and the
+        build parameters
         '''
 
-        # TODO Feature to define custom exclusions
+        if not self._low_memory:
+            self._definition = definition
+            return
 
-        # Default keys to exclude from list of endpoints to generate definitions
-        exclusion_keys = ['swagger', 'static']
+        self._definition = None
+        release_endpoint_metadata(
+            endpoint.view_function_name for endpoint in endpoints)
 
-        # Allow addition route exclusions if required.  Anything specified here
-        # will not be displayed in the documentation
-        if (exclude_routes is not None
-            and isinstance(exclude_routes, list)
-                and len(exclude_routes) > 0):
-            exclusion_keys.extend(exclude_routes)
+        # The spec is never built again, so the build inputs (i.e. the metadata
+        # manifest) are released as well
+        self._definition_kwargs = None
+
+    def _get_mounted_apps(self) -> List['Flask']:
+        '''
+        Get the apps other than `app` whose routes are in the spec
+        '''
 
-        endpoints = []
+        return []
 
-        # Fetch the endpoints from the mapped rules in the Flask app
-        for rule in self._app.url_map.iter_rules():
-            # If the endpoint is not in the list of excluded routes
-            if not any([x for x in ['swagger', 'static'] if x in rule.rule]):
-                endpoint = SwaggerEndpoint(
-                    rule=rule)
-                endpoints.append(endpoint)
+    def _get_swagger_endpoints(self, exclude_routes: List[str] = None) -> List[SwaggerEndpoint]:
+        '''
+        Parse the endpoints from the `werkzeug` `Rule` definitions
+        in the Flask app
+        '''
 
-        return endpoints
+        return get_swagger_endpoints(
+            app=self._app,
+            exclude_routes=exclude_routes)
@@ -0,0 +1,16 @@
+import pytest
+
+from swagger_gen.lib.wrappers import endpoint_metadata
+
+
+@pytest.fixture(autouse=True)
+def clear_endpoint_metadata():
+    '''
+    `@swagger_metadata` records the metadata in a global collection keyed by
+    the view function name, so every test starts with an empty one and the
+    test apps can reuse view function names
+    '''
+
+    endpoint_metadata.clear()
+    yield
+    endpoint_metadata.clear()
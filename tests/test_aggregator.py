@@ -0,0 +1,138 @@
+import time
+
+import pytest
+from flask import Blueprint, Flask
+
+from swagger_gen.aggregator import SwaggerAggregator
+from swagger_gen.lib.manifest import MetadataManifest
+from swagger_gen.lib.spec import merge_components
+
+SPEC_URL = '/swagger/v1/swagger.json'
+
+
+def create_mount(name: str) -> Flask:
+    '''An app with a `create` route, so every mount has a `create` component'''
+
+    app = Flask(name)
+
+    blueprint = Blueprint(f'{name}_api', name)
+    blueprint.add_url_rule(
+        '/items',
+        endpoint='create',
+        view_func=lambda: {},
+        methods=['POST'])
+    app.register_blueprint(blueprint)
+
+    return app
+
+
+def get_spec(mounts: dict, manifest: dict, **kwargs) -> dict:
+    app = Flask('gateway')
+
+    swagger = SwaggerAggregator(
+        app=app,
+        mounts=mounts,
+        title='gateway',
+        metadata_manifest=MetadataManifest(manifest),
+        **kwargs)
+    swagger.configure()
+
+    return app.test_client().get(SPEC_URL).get_json()
+
+
+def get_reference(spec: dict, path: str) -> str:
+    request_body = spec['paths'][path]['post']['requestBody']
+    return request_body['content']['application/json']['schema']['$ref']
+
+
+def test_identical_components_are_merged_once():
+    spec = get_spec(
+        mounts={'/users': create_mount('users'), '/orders': create_mount('orders')},
+        manifest={
+            'users_api.create': {'request_model': {'name': 'string'}},
+            'orders_api.create': {'request_model': {'name': 'string'}}
+        })
+
+    assert list(spec['components']['schemas']) == ['create']
+    assert get_reference(spec, '/users/items') == '#/components/schemas/create'
+    assert get_reference(spec, '/orders/items') == '#/components/schemas/create'
+
+
+def test_conflicting_components_are_renamed_with_the_path_prefix():
+    spec = get_spec(
+        mounts={'/users': create_mount('users'), '/v1/orders/': create_mount('orders')},
+        manifest={
+            'users_api.create': {'request_model': {'name': 'string'}},
+            'orders_api.create': {'request_model': {'total': 'number'}}
+        })
+
+    schemas = spec['components']['schemas']
+    assert list(schemas) == ['create', 'v1.orders.create']
+    assert list(schemas['v1.orders.create']['properties']) == ['total']
+    assert get_reference(spec, '/users/items') == '#/components/schemas/create'
+    assert get_reference(spec, '/v1/orders/items') == '#/components/schemas/v1.orders.create'
+
+
+@pytest.mark.parametrize('path_prefix', ['', '/'])
+def test_conflicting_components_mounted_at_the_root_are_renamed_with_the_app_name(path_prefix):
+    spec = get_spec(
+        mounts={'/users': create_mount('users'), path_prefix: create_mount('orders')},
+        manifest={
+            'users_api.create': {'request_model': {'name': 'string'}},
+            'orders_api.create': {'request_model': {'total': 'number'}}
+        })
+
+    assert list(spec['components']['schemas']) == ['create', 'orders.create']
+    assert get_reference(spec, '/items') == '#/components/schemas/orders.create'
+
+
+def test_merge_components_suffixes_taken_keys():
+    additions, renamed = merge_components(
+        existing={'schemas': {'User': {'a': 1}, 'users.User': {'b': 2}}},
+        incoming={'schemas': {'User': {'c': 3}, 'Order': {'d': 4}}},
+        namespace='users')
+
+    assert additions == [
+        ('schemas', 'users.User.2', {'c': 3}),
+        ('schemas', 'Order', {'d': 4})
+    ]
+    assert renamed == {('schemas', 'User'): 'users.User.2'}
+
+
+def test_merge_components_without_a_namespace_suffixes_the_key():
+    additions, renamed = merge_components(
+        existing={'schemas': {'User': {'a': 1}}},
+        incoming={'schemas': {'User': {'c': 3}}},
+        namespace=None)
+
+    assert additions == [('schemas', 'User.2', {'c': 3})]
+    assert renamed == {('schemas', 'User'): 'User.2'}
+
+
+def test_hot_reload_picks_up_routes_added_to_a_mounted_app():
+    mount = Flask('reload_mount')
+    app = Flask('reload_gateway')
+
+    swagger = SwaggerAggregator(
+        app=app,
+        mounts={'/mounted': mount},
+        title='gateway',
+        hot_reload=True,
+        reload_interval=0.02,
+        reload_debounce=0.02)
+    swagger.configure()
+
+    client = app.test_client()
+    assert client.get(SPEC_URL).get_json()['paths'] == {}
+
+    # The gateway is serving, but the mounted app hasn't handled a request
+    mount.add_url_rule('/late', endpoint='reload_mount_late', view_func=lambda: {})
+
+    deadline = time.monotonic() + 5
+    while True:
+        paths = client.get(SPEC_URL).get_json()['paths']
+        if paths or time.monotonic() > deadline:
+            break
+        time.sleep(0.02)
+
+    assert list(paths) == ['/mounted/late']
@@ -0,0 +1,116 @@
+from swagger_gen.lib.analyzer import SpecAnalyzer
+
+
+def create_model(name: str) -> dict:
+    return {
+        'type': 'object',
+        'properties': {
+            'address': {
+                'type': 'object',
+                'properties': {
+                    'street': {'type': 'string', 'description': f'{name} street'},
+                    'city': {'type': 'string', 'description': f'{name} city'}
+                }
+            }
+        }
+    }
+
+
+def test_only_the_largest_duplicates_are_reported():
+    definition = {
+        'paths': {},
+        'components': {
+            'schemas': {
+                'User': create_model('user'),
+                'Customer': create_model('user'),
+                'Admin': create_model('user')
+            }
+        }
+    }
+
+    report = SpecAnalyzer(min_duplicate_size=16).analyze(definition)
+
+    # The nested address and properties are inside the repeats of the models
+    assert [
+        (duplicate.location, duplicate.count)
+        for duplicate in report.duplicates
+    ] == [('/components/schemas/User', 3)]
+
+
+def test_wasted_bytes_never_exceed_the_spec():
+    definition = {
+        'paths': {},
+        'components': {
+            'schemas': {
+                f'Model{index}': create_model('shared')
+                for index in range(20)
+            }
+        }
+    }
+
+    report = SpecAnalyzer(min_duplicate_size=1).analyze(definition)
+
+    wasted_bytes = sum(duplicate.wasted_bytes for duplicate in report.duplicates)
+    assert wasted_bytes < report.total_bytes
+
+
+def test_nested_duplicates_outside_a_repeat_are_counted():
+    address = create_model('shared')['properties']['address']
+    definition = {
+        'paths': {},
+        'components': {
+            'schemas': {
+                'User': create_model('shared'),
+                'Customer': create_model('shared'),
+                'Address': address
+            }
+        }
+    }
+
+    report = SpecAnalyzer(min_duplicate_size=16).analyze(definition)
+    duplicates = {
+        duplicate.location: duplicate.count
+        for duplicate in report.duplicates
+    }
+
+    # Once in the shared model and once on its own
+    assert duplicates['/components/schemas/User'] == 2
+    assert duplicates['/components/schemas/User/properties/address'] == 2
+
+
+def test_path_items_are_not_reported():
+    operation = {'get': {'summary': 'A long enough summary to be tracked'}}
+    definition = {
+        'paths': {
+            '/users': operation,
+            '/customers': operation
+        }
+    }
+
+    report = SpecAnalyzer(min_duplicate_size=16).analyze(definition)
+
+    assert [duplicate.location for duplicate in report.duplicates] == [
+        '/paths/~1users/get'
+    ]
+
+
+def test_duplicates_are_compared_by_content():
+    definition = {
+        'components': {
+            'schemas': {
+                # Equal once the keys are sorted
+                'First': {'type': 'object', 'description': 'the same model'},
+                'Second': {'description': 'the same model', 'type': 'object'},
+                # Equal in Python, but not as JSON
+                'Flag': {'type': 'object', 'description': 'the same model', 'x': True},
+                'Number': {'type': 'object', 'description': 'the same model', 'x': 1}
+            }
+        }
+    }
+
+    report = SpecAnalyzer(min_duplicate_size=32).analyze(definition)
+
+    assert [
+        (duplicate.location, duplicate.count)
+        for duplicate in report.duplicates
+    ] == [('/components/schemas/First', 2)]
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import re
+
+from flask import Flask
+
+from swagger_gen.cli import main
+from swagger_gen.lib.dependency import index_resources, load_resources, read_resource
+from swagger_gen.lib.loadtest import get_docs_paths
+from swagger_gen.swagger import Swagger
+
+ASSETS_URL = 'https://cdn.example.com/swagger-assets'
+
+
+def test_resource_index_matches_the_bundle():
+    resources = load_resources()
+    index = index_resources()
+
+    assert set(index) == set(resources)
+    for resource_name, content in resources.items():
+        assert read_resource(*index[resource_name]) == content
+
+
+def test_lazy_assets_only_load_requested_resources():
+    app = Flask('lazy_assets')
+
+    swagger = Swagger(app=app, title='app', lazy_assets=True)
+    swagger.configure()
+
+    client = app.test_client()
+    response = client.get('/swagger/swagger-ui.css')
+
+    assert response.status_code == 200
+    assert response.data == load_resources()['swagger-ui.css']
+    assert client.get('/swagger/missing.js').status_code == 404
+
+    dependency_provider = app.view_functions['_get_resource'].__self__
+    assert set(dependency_provider._resources) == {'swagger-ui.css'}
+
+
+def test_offloaded_index_references_the_exported_assets(tmp_path, capsys):
+    assert main(['export-assets', str(tmp_path)]) == 0
+    capsys.readouterr()
+
+    with open(tmp_path / 'manifest.json') as manifest_file:
+        manifest = json.load(manifest_file)
+
+    resources = load_resources()
+    assert 'swagger-ui-bundle.js' in manifest
+
+    # Every exported file is named after a hash of its content
+    for resource_name, fingerprinted_name in manifest.items():
+        content = (tmp_path / fingerprinted_name).read_bytes()
+        assert content == resources[resource_name]
+        assert hashlib.sha256(content).hexdigest()[:12] in fingerprinted_name
+
+    app = Flask('assets_offloaded')
+    Swagger(app=app, title='app', assets_url=f'{ASSETS_URL}/').configure()
+    client = app.test_client()
+
+    index = client.get('/swagger').data.decode('utf-8')
+    asset_urls = re.findall(r'(?:href|src)="([^"]+)"', index)
+
+    # The index loads every asset from the CDN, under its exported name
+    assert any(asset_urls)
+    assert all(url.startswith(f'{ASSETS_URL}/') for url in asset_urls)
+    assert {url[len(ASSETS_URL) + 1:] for url in asset_urls} <= set(manifest.values())
+
+    # Only the index and the spec are left on the app
+    assert get_docs_paths(index.encode('utf-8'), '/swagger') == [
+        '/swagger', '/swagger/v1/swagger.json'
+    ]
+    assert client.get('/swagger/swagger-ui.css').status_code == 404
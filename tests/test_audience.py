@@ -0,0 +1,45 @@
+import pytest
+from flask import Flask
+
+from swagger_gen.lib.audience import AudienceResolver
+from swagger_gen.swagger import Swagger
+
+
+def test_resolver_must_implement_resolve():
+    class IncompleteResolver(AudienceResolver):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteResolver()
+
+
+def test_each_audience_is_served_its_own_spec():
+    class AddressResolver(AudienceResolver):
+        def resolve(self, environ):
+            return 'internal' if environ.get('REMOTE_ADDR') == '10.0.0.1' else None
+
+    app = Flask('audiences')
+    app.add_url_rule('/items', endpoint='audiences_items', view_func=lambda: {})
+    app.add_url_rule('/admin', endpoint='audiences_admin', view_func=lambda: {})
+
+    swagger = Swagger(
+        app=app,
+        title='app',
+        audiences=['public', 'internal'],
+        metadata_manifest={
+            'audiences_items': {'visibility': 'public'},
+            'audiences_admin': {'visibility': 'internal'}
+        },
+        audience_resolver=AddressResolver())
+    swagger.configure()
+
+    client = app.test_client()
+
+    def get_paths(address):
+        response = client.get(
+            '/swagger/v1/swagger.json',
+            environ_base={'REMOTE_ADDR': address})
+        return sorted(response.get_json()['paths'])
+
+    assert get_paths('127.0.0.1') == ['/items']
+    assert get_paths('10.0.0.1') == ['/admin', '/items']
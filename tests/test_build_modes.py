@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from swagger_gen.swagger import Swagger
+
+
+def create_app(routes: int = 200) -> Flask:
+    app = Flask(__name__)
+
+    for index in range(routes):
+        app.add_url_rule(
+            f'/items{index}/<item_id>',
+            endpoint=f'item_{index}',
+            view_func=lambda item_id: {})
+
+    return app
+
+
+def test_invalid_build_mode_is_rejected_by_the_constructor():
+    with pytest.raises(Exception, match='does not exist in class BuildMode'):
+        Swagger(app=create_app(), title='app', build_mode='eventually')
+
+
+@pytest.mark.parametrize('build_mode', ['eager', 'lazy', 'background'])
+def test_concurrent_first_requests_get_the_spec(build_mode):
+    app = create_app()
+
+    swagger = Swagger(app=app, title='app', build_mode=build_mode)
+    swagger.configure()
+
+    client = app.test_client()
+    responses = []
+
+    def request_spec():
+        responses.append(client.get('/swagger/v1/swagger.json'))
+
+    threads = [threading.Thread(target=request_spec) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert len(responses[0].get_json()['paths']) == 200
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import subprocess
+import sys
+
+from flask import Flask
+
+from swagger_gen.swagger import Swagger
+
+SPEC_URL = '/swagger/v1/swagger.json'
+
+# Builds an app with its routes registered in a shuffled order, and prints
+# the ETag and a hash of the served spec
+BUILD_SCRIPT = '''
+import hashlib
+import random
+import sys
+
+from flask import Blueprint, Flask
+
+from swagger_gen.lib.wrappers import swagger_metadata
+from swagger_gen.swagger import Swagger
+
+app = Flask('canonical')
+blueprint = Blueprint('items', 'items')
+
+routes = list(range(30))
+random.Random(int(sys.argv[1])).shuffle(routes)
+
+for index in routes:
+    def view(item_id):
+        return {}
+
+    view.__name__ = f'item_{index}'
+    view = swagger_metadata(
+        summary=f'Item {index}',
+        query_params=[f'q{index % 3}', 'page', 'filter'],
+        request_model={'name': 'string', 'count': 'int', 'tags': 'list'},
+        response_model=[(404, 'Not found'), (200, 'Found')])(view)
+
+    target = blueprint if index % 2 else app
+    target.add_url_rule(
+        f'/items/{index}/<item_id>',
+        view_func=view,
+        methods=['GET', 'PUT', 'DELETE', 'PATCH'])
+
+app.register_blueprint(blueprint)
+
+Swagger(app=app, title='app', canonical=True).configure()
+
+response = app.test_client().get('/swagger/v1/swagger.json')
+print(response.headers['ETag'], hashlib.sha256(response.data).hexdigest())
+'''
+
+
+def build(order_seed: int, hash_seed: str) -> str:
+    environment = dict(os.environ, PYTHONHASHSEED=hash_seed)
+
+    result = subprocess.run(
+        [sys.executable, '-c', BUILD_SCRIPT, str(order_seed)],
+        env=environment,
+        capture_output=True,
+        check=True,
+        timeout=60)
+
+    return result.stdout.decode('utf-8').strip()
+
+
+def test_canonical_spec_is_stable_across_registration_order_and_hash_seed():
+    outputs = {
+        build(order_seed=0, hash_seed='0'),
+        build(order_seed=1, hash_seed='1'),
+        build(order_seed=2, hash_seed='4242'),
+    }
+
+    assert len(outputs) == 1
+
+
+def test_matching_etag_is_answered_with_a_304():
+    app = Flask('canonical_304')
+
+    @app.route('/items/<item_id>')
+    def canonical_get_item(item_id):
+        return {}
+
+    Swagger(app=app, title='app', canonical=True).configure()
+    client = app.test_client()
+
+    response = client.get(SPEC_URL)
+    etag = response.headers['ETag']
+    assert etag.strip('"') == hashlib.sha256(response.data).hexdigest()
+
+    response = client.get(SPEC_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    # The compressed spec has its own tag
+    response = client.get(SPEC_URL, headers={'Accept-Encoding': 'gzip'})
+    gzip_etag = response.headers['ETag']
+    assert gzip_etag != etag
+
+    response = client.get(
+        SPEC_URL,
+        headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag})
+    assert response.status_code == 304
+
+    response = client.get(SPEC_URL, headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
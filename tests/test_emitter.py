@@ -0,0 +1,120 @@
+import json
+
+from flask import Flask
+
+from swagger_gen.lib.endpoint import get_swagger_endpoints
+from swagger_gen.lib.schema import SwaggerDefinition
+from swagger_gen.lib.wrappers import swagger_metadata
+
+ITEM_FOUND = (
+    'The item was found.  The response contains all of its fields, '
+    'including the ones only visible to the owner of the item')
+
+
+def create_app(routes: int) -> Flask:
+    app = Flask(__name__)
+
+    for index in range(routes):
+        def get_item(item_id):
+            return {}
+
+        get_item.__name__ = f'get_item_{index}'
+
+        app.add_url_rule(
+            f'/items/{index}/<item_id>',
+            view_func=swagger_metadata(
+                summary='Get an item',
+                query_params=['page', 'page_size'],
+                response_model=[
+                    (200, ITEM_FOUND),
+                    (404, 'No item')])(get_item))
+
+    return app
+
+
+def get_definition(app: Flask, shared_components: bool) -> dict:
+    definition = SwaggerDefinition(
+        app=app,
+        title='app',
+        shared_components=shared_components)
+    definition.add_endpoints(get_swagger_endpoints(app=app))
+
+    return definition.get_definition()
+
+
+def get_size(definition: dict) -> int:
+    return len(json.dumps(definition, separators=(',', ':')))
+
+
+def get_references(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == '$ref':
+                yield value
+            else:
+                yield from get_references(value)
+
+    elif isinstance(node, list):
+        for value in node:
+            yield from get_references(value)
+
+
+def resolve(definition: dict, reference: str):
+    node = definition
+    for segment in reference.lstrip('#/').split('/'):
+        node = node[segment]
+
+    return node
+
+
+def test_shared_components_never_grow_a_small_spec():
+    app = create_app(routes=3)
+
+    inline = get_definition(app, shared_components=False)
+    shared = get_definition(app, shared_components=True)
+
+    assert get_size(shared) <= get_size(inline)
+
+
+def test_shared_components_shrink_a_large_spec():
+    app = create_app(routes=50)
+
+    inline = get_definition(app, shared_components=False)
+    shared = get_definition(app, shared_components=True)
+
+    assert get_size(shared) < get_size(inline)
+    assert any(shared['components'].get('parameters', {}))
+
+    # The short response is cheaper to repeat than to reference
+    responses = shared['components']['responses']
+    assert [response['description'] for response in responses.values()] == [
+        ITEM_FOUND
+    ]
+
+
+def test_shared_component_references_resolve():
+    app = create_app(routes=50)
+
+    inline = get_definition(app, shared_components=False)
+    shared = get_definition(app, shared_components=True)
+
+    references = list(get_references(shared['paths']))
+    assert any(references)
+
+    for reference in references:
+        assert resolve(shared, reference) is not None
+
+    # The resolved operations are the same as the inline ones
+    for path, operations in inline['paths'].items():
+        for method, operation in operations.items():
+            shared_operation = shared['paths'][path][method]
+
+            assert [
+                resolve(shared, parameter['$ref']) if '$ref' in parameter else parameter
+                for parameter in shared_operation.get('parameters', [])
+            ] == operation.get('parameters', [])
+
+            assert {
+                status: resolve(shared, response['$ref']) if '$ref' in response else response
+                for status, response in shared_operation['responses'].items()
+            } == operation['responses']
@@ -0,0 +1,267 @@
+import hashlib
+import http.client
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+from swagger_gen.federation import SwaggerFederation
+from swagger_gen.lib.federation import ConnectionPool, SpecFederation, Upstream
+
+
+class StubService:
+    '''A local HTTP server serving a spec with an ETag, like swagger-gen does'''
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.requests = []
+
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = json.dumps(service.spec).encode('utf-8')
+                etag = f'"{hashlib.sha256(body).hexdigest()}"'
+
+                if_none_match = self.headers.get('If-None-Match')
+                service.requests.append(if_none_match)
+
+                if if_none_match == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._worker = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.01},
+            daemon=True)
+        self._worker.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/swagger/v1/swagger.json'
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def create_spec(user_properties: dict) -> dict:
+    return {
+        'openapi': '3.0.1',
+        'paths': {
+            '/users': {
+                'post': {
+                    'requestBody': {
+                        'content': {
+                            'application/json': {
+                                'schema': {'$ref': '#/components/schemas/User'}
+                            }
+                        }
+                    },
+                    'security': [{'token': []}]
+                }
+            }
+        },
+        'components': {
+            'schemas': {
+                'User': {'type': 'object', 'properties': user_properties}
+            },
+            'securitySchemes': {
+                'token': {'type': 'http', 'scheme': 'bearer'}
+            }
+        }
+    }
+
+
+@pytest.fixture
+def service():
+    service = StubService(create_spec({'name': {'type': 'string'}}))
+    yield service
+    service.close()
+
+
+def get_reference(definition: dict, path: str) -> str:
+    request_body = definition['paths'][path]['post']['requestBody']
+    return request_body['content']['application/json']['schema']['$ref']
+
+
+def test_fetched_spec_is_merged_under_the_path_prefix(service):
+    federation = SpecFederation(
+        upstreams=[Upstream(name='users', url=service.url, path_prefix='/users/')])
+
+    assert federation.refresh()
+
+    merged = federation.merge({'paths': {}, 'components': {}})
+
+    assert list(merged['paths']) == ['/users/users']
+    assert get_reference(merged, '/users/users') == '#/components/schemas/User'
+    federation.stop()
+
+
+def test_conflicting_components_are_renamed_with_the_upstream_name(service):
+    upstream = Upstream(name='users', url=service.url, path_prefix='/users')
+    federation = SpecFederation(upstreams=[upstream])
+    federation.refresh()
+
+    gateway = create_spec({'id': {'type': 'integer'}})
+    gateway['components']['securitySchemes']['token'] = {'type': 'apiKey'}
+
+    merged = federation.merge(gateway)
+
+    schemas = merged['components']['schemas']
+    assert list(schemas) == ['User', 'users.User']
+    assert list(schemas['users.User']['properties']) == ['name']
+    assert get_reference(merged, '/users') == '#/components/schemas/User'
+    assert get_reference(merged, '/users/users') == '#/components/schemas/users.User'
+
+    schemes = merged['components']['securitySchemes']
+    assert list(schemes) == ['token', 'users.token']
+    assert merged['paths']['/users/users']['post']['security'] == [{'users.token': []}]
+    federation.stop()
+
+
+def test_merged_spec_does_not_share_nodes_with_the_cached_spec(service):
+    upstream = Upstream(name='users', url=service.url)
+    federation = SpecFederation(upstreams=[upstream])
+    federation.refresh()
+
+    cached = json.dumps(upstream.definition)
+
+    merged = federation.merge({'paths': {}, 'components': {}})
+    merged['paths']['/users']['post']['summary'] = 'changed'
+    merged['components']['schemas']['User']['properties'].clear()
+
+    assert json.dumps(upstream.definition) == cached
+    federation.stop()
+
+
+def test_expired_spec_is_revalidated_with_its_etag(service):
+    upstream = Upstream(name='users', url=service.url, ttl=0.05)
+    federation = SpecFederation(upstreams=[upstream])
+
+    assert federation.refresh()
+    assert service.requests == [None]
+
+    # Still cached, nothing is fetched
+    assert not federation.refresh()
+    assert len(service.requests) == 1
+
+    # Expired but unchanged, the service answers 304
+    time.sleep(0.06)
+    assert not federation.refresh()
+    assert service.requests[1] == upstream.etag
+
+    # Expired and changed, the new spec is merged
+    service.spec = create_spec({'email': {'type': 'string'}})
+    time.sleep(0.06)
+    assert federation.refresh()
+
+    merged = federation.merge({'paths': {}, 'components': {}})
+    assert list(merged['components']['schemas']['User']['properties']) == ['email']
+    federation.stop()
+
+
+def test_gateway_serves_the_federated_spec(service):
+    app = Flask('federation_gateway')
+
+    swagger = SwaggerFederation(
+        app=app,
+        title='gateway',
+        upstreams=[Upstream(name='users', url=service.url, path_prefix='/users')])
+    swagger.configure()
+
+    spec = app.test_client().get('/swagger/v1/swagger.json').get_json()
+
+    assert list(spec['paths']) == ['/users/users']
+    assert list(spec['components']['schemas']) == ['User']
+
+
+class GarbageService:
+    '''A local server answering every request with an invalid status line'''
+
+    def __init__(self):
+        self._socket = socket.create_server(('127.0.0.1', 0))
+        self._worker = threading.Thread(target=self._serve, daemon=True)
+        self._worker.start()
+
+    @property
+    def netloc(self) -> str:
+        host, port = self._socket.getsockname()
+        return f'{host}:{port}'
+
+    def _serve(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+
+            with connection:
+                connection.recv(65536)
+                connection.sendall(b'garbage\r\n\r\n')
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+def test_federation_requires_upstreams():
+    with pytest.raises(Exception, match='at least one upstream'):
+        SpecFederation([])
+
+    # Emptying the list afterwards doesn't leave the federation without any
+    upstreams = [Upstream(name='users', url='http://127.0.0.1:1/swagger.json')]
+    federation = SpecFederation(upstreams)
+    upstreams.clear()
+
+    assert federation._get_refresh_delay() >= 0
+
+
+def test_failed_retry_closes_its_connection():
+    service = GarbageService()
+    pool = ConnectionPool(max_connections=1, timeout=1.0)
+
+    host = ('http', service.netloc)
+    connections = []
+
+    connect = pool._connect
+
+    def track(host):
+        connection = connect(host)
+        connections.append(connection)
+        return connection
+
+    pool._connect = track
+
+    # An idle connection that turns out to be broken is retried once on a
+    # new connection
+    pool._idle[host] = [track(host)]
+
+    try:
+        with pytest.raises(http.client.HTTPException):
+            pool.get(f'http://{service.netloc}/swagger.json', headers={})
+    finally:
+        service.close()
+
+    assert len(connections) == 2
+    assert all(connection.sock is None for connection in connections)
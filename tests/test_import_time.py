@@ -0,0 +1,76 @@
+'''
+Importing swagger-gen is on the startup path of every app that uses it, so
+the optional features have to stay out of it until they're enabled
+'''
+
+import os
+import subprocess
+import sys
+
+# Cumulative import time of `swagger_gen.swagger`, best of a few runs.  It's
+# about 30 ms on a laptop, with most of it spent in `typing` and `logging`
+IMPORT_BUDGET_MS = float(os.environ.get('SWAGGER_GEN_IMPORT_BUDGET_MS', 60))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that are only needed by optional features
+DEFERRED_MODULES = [
+    'flask',
+    'werkzeug',
+    'gzip',
+    'hashlib',
+    'random',
+    'socket',
+    'swagger_gen.lib.audience',
+    'swagger_gen.lib.content',
+    'swagger_gen.lib.dependency',
+    'swagger_gen.lib.manifest',
+    'swagger_gen.lib.metrics',
+    'swagger_gen.lib.middleware',
+    'swagger_gen.lib.mock',
+    'swagger_gen.lib.provider',
+    'swagger_gen.lib.reload',
+    'swagger_gen.lib.sampler',
+    'swagger_gen.lib.servers',
+    'swagger_gen.lib.sidecar',
+    'swagger_gen.lib.throttle'
+]
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        capture_output=True,
+        text=True,
+        check=True)
+
+
+def get_import_time_ms() -> float:
+    '''The cumulative import time of swagger_gen.swagger, from -X importtime'''
+
+    result = run_python('-X', 'importtime', '-c', 'import swagger_gen.swagger')
+
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'swagger_gen.swagger':
+            return int(fields[1]) / 1000
+
+    raise AssertionError('swagger_gen.swagger not found in the import times')
+
+
+def test_optional_modules_are_not_imported():
+    result = run_python('-c', (
+        'import sys, swagger_gen.swagger; '
+        'print("\\n".join(sorted(sys.modules)))'))
+
+    imported = set(result.stdout.split())
+    assert [name for name in DEFERRED_MODULES if name in imported] == []
+
+
+def test_import_time_budget():
+    import_time = min(get_import_time_ms() for _ in range(3))
+    assert import_time < IMPORT_BUDGET_MS, (
+        f'import swagger_gen.swagger took {import_time:.1f} ms, '
+        f'the budget is {IMPORT_BUDGET_MS:.0f} ms')
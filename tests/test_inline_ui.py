@@ -0,0 +1,82 @@
+import json
+import re
+
+from flask import Flask
+
+from swagger_gen.lib.loadtest import get_docs_paths
+from swagger_gen.lib.wrappers import swagger_metadata
+from swagger_gen.swagger import Swagger
+
+SPEC_URL = '/swagger/v1/swagger.json'
+
+
+def create_app():
+    app = Flask(__name__)
+
+    def get_user(user_id):
+        return {}
+
+    def list_users():
+        return {}
+
+    app.add_url_rule(
+        '/users/<user_id>',
+        view_func=swagger_metadata(summary='Get a <user>')(get_user))
+    app.add_url_rule('/users', view_func=list_users)
+
+    return app, list_users
+
+
+def get_embedded_spec(index: bytes) -> dict:
+    start = index.index(b'spec: ') + len(b'spec: ')
+
+    spec, _ = json.JSONDecoder().raw_decode(index[start:].decode('utf-8'))
+    return spec
+
+
+def test_inline_index_has_no_external_assets():
+    app, _ = create_app()
+    Swagger(app=app, title='app', inline_ui=True).configure()
+
+    index = app.test_client().get('/swagger').data
+
+    # The page loads in a single request, nothing else is fetched
+    assert get_docs_paths(index, '/swagger') == ['/swagger']
+    assert re.search(rb'(href|src)="(https?:)?//', index) is None
+    assert SPEC_URL.encode('utf-8') not in index
+
+    assert b'<style>' in index
+    assert b'data:image/png;base64,' in index
+
+
+def test_inline_index_embeds_the_current_spec():
+    app, _ = create_app()
+    Swagger(app=app, title='app', inline_ui=True).configure()
+
+    client = app.test_client()
+    index = client.get('/swagger').data
+
+    # A '<' in the spec can't close the script element early
+    assert b'Get a <user>' not in index
+    assert get_embedded_spec(index) == client.get(SPEC_URL).get_json()
+
+
+def test_inline_index_changes_after_a_rebuild():
+    app, list_users = create_app()
+    swagger = Swagger(app=app, title='app', inline_ui=True)
+    swagger.configure()
+
+    client = app.test_client()
+    index = client.get('/swagger').data
+
+    # Metadata applied after `configure` is picked up by the rebuild
+    swagger_metadata(summary='List the users')(list_users)
+    swagger.rebuild()
+
+    rebuilt = client.get('/swagger').data
+
+    assert rebuilt != index
+
+    spec = get_embedded_spec(rebuilt)
+    assert spec == client.get(SPEC_URL).get_json()
+    assert spec['paths']['/users']['get']['summary'] == 'List the users'
@@ -0,0 +1,164 @@
+import json
+
+from flask import Flask
+
+from swagger_gen.lib.loadtest import (
+    LoadGenerator,
+    LoadReport,
+    OperationResult,
+    WsgiTransport,
+    get_docs_paths,
+    synthesize_requests
+)
+from swagger_gen.swagger import Swagger
+
+DEFINITION = {
+    'openapi': '3.0.1',
+    'paths': {
+        '/users/{user_id}': {
+            'parameters': [
+                {'name': 'user_id', 'in': 'path', 'required': True, 'schema': {'type': 'integer'}}
+            ],
+            'get': {
+                'parameters': [
+                    {'$ref': '#/components/parameters/page'},
+                    {'name': 'sort', 'in': 'query', 'required': False, 'schema': {'type': 'string'}}
+                ],
+                'responses': {'200': {'description': 'Success'}}
+            },
+            'post': {
+                'requestBody': {
+                    'content': {
+                        'application/json': {
+                            'schema': {'$ref': '#/components/schemas/User'}
+                        }
+                    }
+                },
+                'responses': {'201': {'description': 'Created'}}
+            }
+        }
+    },
+    'components': {
+        'parameters': {
+            'page': {'name': 'page', 'in': 'query', 'required': True, 'schema': {'type': 'integer'}}
+        },
+        'schemas': {
+            'User': {
+                'type': 'object',
+                'properties': {'name': {'type': 'string'}, 'admin': {'type': 'boolean'}}
+            }
+        }
+    }
+}
+
+
+def test_requests_are_synthesized_for_every_operation():
+    get, post = synthesize_requests(
+        DEFINITION,
+        headers={'Authorization': 'Bearer token'})
+
+    assert (get.operation, get.method, get.path, get.query) == (
+        'GET /users/{user_id}', 'GET', '/users/1', 'page=1')
+    assert get.body == b''
+    assert get.headers == {'Authorization': 'Bearer token', 'Accept-Encoding': 'gzip'}
+
+    assert (post.operation, post.method, post.path, post.query) == (
+        'POST /users/{user_id}', 'POST', '/users/1', '')
+    assert set(json.loads(post.body)) == {'name', 'admin'}
+    assert post.headers['Content-Type'] == 'application/json'
+
+
+def test_docs_paths_are_requested_along_with_the_operations():
+    requests = synthesize_requests(
+        DEFINITION,
+        docs_paths=['/swagger', '/swagger/v1/swagger.json?v=2'])
+
+    assert [(request.operation, request.path, request.query) for request in requests[2:]] == [
+        ('GET /swagger', '/swagger', ''),
+        ('GET /swagger/v1/swagger.json', '/swagger/v1/swagger.json', 'v=2'),
+    ]
+
+
+def test_docs_paths_come_from_the_served_index():
+    app = Flask('loadtest_index')
+    Swagger(app=app, title='app', url='/docs').configure()
+
+    client = app.test_client()
+    paths = get_docs_paths(client.get('/docs').data, '/docs')
+
+    assert paths[0] == '/docs'
+    assert '/swagger/v1/swagger.json' in paths
+    assert '/swagger/swagger-ui-bundle.js' in paths
+    assert '/swagger/swagger-ui.css' in paths
+
+    # Every path is served
+    for path in paths:
+        assert client.get(path).status_code == 200
+
+
+def test_docs_paths_skip_assets_on_other_hosts():
+    index = b'''
+        <link rel="stylesheet" href="https://cdn.example.com/swagger-ui.css" />
+        <link rel="icon" href="data:image/png;base64,AAAA" />
+        <script src="//cdn.example.com/swagger-ui-bundle.js"></script>
+        <script src="local.js"></script>
+        url: "/api/swagger.json",
+    '''
+
+    assert get_docs_paths(index, '/api/docs/') == [
+        '/api/docs/',
+        '/api/docs/local.js',
+        '/api/swagger.json'
+    ]
+
+
+def test_percentiles_use_the_nearest_rank():
+    result = OperationResult('GET /users')
+    result.latencies = [index / 1000 for index in range(1, 101)]
+
+    assert result.get_percentile(50) == 0.050
+    assert result.get_percentile(90) == 0.090
+    assert result.get_percentile(99) == 0.099
+    assert result.get_percentile(100) == 0.100
+
+    assert OperationResult('GET /empty').get_percentile(50) == 0.0
+
+
+def test_report_lists_the_percentiles_of_each_operation():
+    users = OperationResult('GET /users')
+    users.latencies = [0.001, 0.002, 0.003, 0.004]
+    users.status_codes = {200: 3, 500: 1}
+    users.errors = 1
+
+    report = LoadReport(
+        operations={'GET /users': users},
+        elapsed=2.0,
+        concurrency=2)
+
+    assert report.requests == 4
+    assert report.throughput == 2.0
+
+    lines = report.to_text().splitlines()
+
+    assert lines[0] == '4 requests in 2.00s with 2 workers, 2 req/s'
+    assert lines[-1].split() == [
+        '2', '2.00', '4.00', '4.00', '4.00', '1',
+        'GET', '/users', '(200', 'x', '3,', '500', 'x', '1)'
+    ]
+
+
+def test_load_is_driven_against_a_wsgi_app():
+    app = Flask('loadtest_wsgi')
+
+    @app.route('/users/<int:user_id>', methods=['GET', 'POST'])
+    def loadtest_user(user_id):
+        return {'id': user_id}
+
+    report = LoadGenerator(
+        transport=WsgiTransport(app.wsgi_app),
+        requests=synthesize_requests(DEFINITION),
+        concurrency=2).run(duration=None, max_requests=10, warmup=0)
+
+    assert report.requests == 20
+    assert report.operations['GET /users/{user_id}'].status_codes == {200: 10}
+    assert report.operations['POST /users/{user_id}'].status_codes == {200: 10}
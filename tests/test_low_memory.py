@@ -0,0 +1,37 @@
+import gc
+import weakref
+
+import pytest
+from flask import Flask
+
+from swagger_gen.lib.manifest import MetadataManifest
+from swagger_gen.swagger import Swagger
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+    app.add_url_rule('/items', endpoint='items', view_func=lambda: {})
+    return app
+
+
+@pytest.mark.parametrize('build_mode', ['eager', 'lazy'])
+def test_build_inputs_are_released_once_the_spec_is_built(build_mode):
+    app = create_app()
+
+    manifest = MetadataManifest({'items': {'summary': 'List'}})
+    released = weakref.ref(manifest)
+
+    swagger = Swagger(
+        app=app,
+        title='app',
+        low_memory=True,
+        build_mode=build_mode,
+        metadata_manifest=manifest)
+    swagger.configure()
+    del manifest
+
+    spec = app.test_client().get('/swagger/v1/swagger.json').get_json()
+    assert spec['paths']['/items']['get']['summary'] == 'List'
+
+    gc.collect()
+    assert released() is None
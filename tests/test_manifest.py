@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from swagger_gen.lib.manifest import MetadataManifest, load_metadata_manifest
+
+ENTRIES = {
+    'list_users': {
+        'summary': 'List users',
+        'query_params': ['page'],
+        'response_model': [[200, 'Success'], [404, 'Not found']]
+    },
+    'admin.create_user': {
+        'request_model': {'name': 'string'},
+        'visibility': 'admin'
+    }
+}
+
+
+def test_manifest_is_loaded_from_json(tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text(json.dumps(ENTRIES))
+
+    manifest = load_metadata_manifest(str(path))
+
+    assert len(manifest) == 2
+    assert 'admin.create_user' in manifest
+    assert manifest.get('list_users').summary == 'List users'
+    assert manifest.get('list_users').query_params == ['page']
+    assert manifest.get('admin.create_user').request_model == {'name': 'string'}
+    assert manifest.get('missing') is None
+
+
+def test_manifest_is_loaded_from_yaml(tmp_path):
+    yaml = pytest.importorskip('yaml')
+
+    path = tmp_path / 'manifest.yml'
+    path.write_text(yaml.safe_dump(ENTRIES))
+
+    manifest = load_metadata_manifest(str(path))
+
+    assert manifest.get('list_users').response_model == [[200, 'Success'], [404, 'Not found']]
+    assert manifest.get('admin.create_user').visibility == 'admin'
+
+
+@pytest.mark.parametrize('entries, message', [
+    ({'list_users': ['summary']}, 'list_users'),
+    ({'list_users': {'summary': 'List', 'tags': ['users']}}, 'tags'),
+    ({'list_users': {'response': [[200, 'Success']]}}, 'response'),
+    ({'list_users': {'blueprint': 'users'}}, 'blueprint'),
+    ({'list_users': {'summary': 1}}, 'list_users.summary'),
+    ({'list_users': {'query_params': 'page'}}, 'list_users.query_params'),
+    ({'list_users': {'query_params': ['page', 1]}}, 'list_users.query_params'),
+    ({'list_users': {'request_model': [['name', 'string']]}}, 'list_users.request_model'),
+    ({'list_users': {'response_model': [[200]]}}, "Invalid response definition for 'list_users'"),
+])
+def test_invalid_entries_are_rejected(entries, message):
+    with pytest.raises(Exception, match=message):
+        MetadataManifest(entries)
+
+
+def test_the_whole_manifest_is_validated_up_front():
+    entries = dict(ENTRIES)
+    entries['z_broken'] = {'summary': ['not a string']}
+
+    # Nothing is indexed from a manifest with an invalid entry
+    with pytest.raises(Exception, match='z_broken.summary'):
+        MetadataManifest(entries)
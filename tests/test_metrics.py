@@ -0,0 +1,104 @@
+import re
+
+import pytest
+from flask import Flask
+
+from swagger_gen.swagger import Swagger
+
+SPEC_URL = '/swagger/v1/swagger.json'
+METRICS_URL = '/swagger/metrics'
+
+_sample_pattern = re.compile(r'([a-z_]+)(?:\{(.*)\})? (\S+)')
+_label_pattern = re.compile(r'([a-z_]+)="((?:[^"\\]|\\.)*)"')
+
+
+def scrape(client) -> dict:
+    '''Parse the exposition into a value per metric name and labels'''
+
+    response = client.get(METRICS_URL)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+    samples = dict()
+    types = dict()
+
+    for line in response.data.decode('utf-8').splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            types[name] = metric_type
+            continue
+
+        if line.startswith('#'):
+            continue
+
+        name, labels, value = _sample_pattern.fullmatch(line).groups()
+        samples[(name, frozenset(_label_pattern.findall(labels or '')))] = float(value)
+
+    return types, samples
+
+
+@pytest.mark.parametrize('wsgi_fast_path', [False, True])
+def test_docs_requests_are_exposed(wsgi_fast_path):
+    app = Flask(f'metrics_{wsgi_fast_path}')
+
+    Swagger(
+        app=app,
+        title='app',
+        metrics=True,
+        metrics_url=METRICS_URL,
+        wsgi_fast_path=wsgi_fast_path).configure()
+
+    client = app.test_client()
+
+    etag = client.get(SPEC_URL).headers['ETag']
+    client.get(SPEC_URL, headers={'If-None-Match': etag})
+    client.get('/swagger')
+    client.get('/swagger')
+    stylesheet = client.get('/swagger/swagger-ui.css').data
+
+    types, samples = scrape(client)
+
+    assert types == {
+        'swagger_gen_requests_total': 'counter',
+        'swagger_gen_response_bytes_total': 'counter',
+        'swagger_gen_request_duration_seconds': 'histogram',
+        'swagger_gen_cache_lookups_total': 'counter',
+        'swagger_gen_builds_total': 'counter',
+        'swagger_gen_build_duration_seconds': 'histogram',
+        'swagger_gen_spec_bytes': 'gauge',
+    }
+
+    def get(name, **labels):
+        return samples.get((name, frozenset(labels.items())))
+
+    assert get('swagger_gen_requests_total', route='spec', status='200') == 1
+    assert get('swagger_gen_requests_total', route='spec', status='304') == 1
+    assert get('swagger_gen_requests_total', route='index', status='200') == 2
+    assert get('swagger_gen_requests_total', route='resource', status='200') == 1
+
+    # The body isn't sent on the 304
+    assert (get('swagger_gen_response_bytes_total', route='spec')
+            == get('swagger_gen_spec_bytes', encoding='identity'))
+    assert get('swagger_gen_response_bytes_total', route='resource') == len(stylesheet)
+
+    # The index is rendered on the first request and cached after that
+    assert get('swagger_gen_cache_lookups_total', route='index', result='miss') == 1
+    assert get('swagger_gen_cache_lookups_total', route='index', result='hit') == 1
+
+    assert get('swagger_gen_builds_total', result='success') == 1
+    assert get('swagger_gen_build_duration_seconds_count') == 1
+    assert get('swagger_gen_spec_bytes', encoding='gzip') > 0
+
+    # The buckets are cumulative, and the last one counts every request
+    for route, count in (('spec', 2), ('index', 2), ('resource', 1)):
+        buckets = sorted(
+            (float(dict(labels)['le']), value)
+            for (name, labels), value in samples.items()
+            if name == 'swagger_gen_request_duration_seconds_bucket'
+            and dict(labels)['route'] == route)
+
+        values = [value for _, value in buckets]
+        assert values == sorted(values)
+        assert buckets[-1] == (float('inf'), count)
+        assert get('swagger_gen_request_duration_seconds_count', route=route) == count
+        assert get('swagger_gen_request_duration_seconds_sum', route=route) > 0
@@ -0,0 +1,185 @@
+from werkzeug.test import Client
+
+from swagger_gen.lib.mock import MockServer, get_example
+
+
+def respond_with(name: str, status_code: str = '200') -> dict:
+    '''An operation whose example response identifies it'''
+
+    return {
+        'responses': {
+            status_code: {
+                'description': 'Success',
+                'content': {
+                    'application/json': {
+                        'schema': {'type': 'object', 'properties': {
+                            'route': {'type': 'string', 'example': name}
+                        }}
+                    }
+                }
+            }
+        }
+    }
+
+
+DEFINITION = {
+    'openapi': '3.0.1',
+    'paths': {
+        '/users': {
+            'get': respond_with('list'),
+            'post': respond_with('create', '201')
+        },
+        '/users/me': {'get': respond_with('me')},
+        '/users/{user_id}': {
+            'get': respond_with('user'),
+            'delete': {'responses': {'204': {'description': 'Deleted'}}}
+        },
+        '/users/me/{tab}': {'get': respond_with('my tab')},
+        '/users/{user_id}/{tab}': {'get': respond_with('user tab')},
+        '/users/{user_id}/posts/{post_id}': {'get': respond_with('post')},
+        '/files/{name}.{format}': {'get': respond_with('file')},
+    }
+}
+
+
+def get_route(client: Client, path: str, method: str = 'GET'):
+    response = client.open(path, method=method)
+    return response.status_code, response.get_json(silent=True)
+
+
+def test_path_parameters_are_matched():
+    client = Client(MockServer(DEFINITION))
+
+    assert get_route(client, '/users/42') == (200, {'route': 'user'})
+    assert get_route(client, '/users/42/settings') == (200, {'route': 'user tab'})
+    assert get_route(client, '/users/42/posts/7') == (200, {'route': 'post'})
+    assert get_route(client, '/files/report.pdf') == (200, {'route': 'file'})
+
+
+def test_literal_segments_win_over_parameters():
+    client = Client(MockServer(DEFINITION))
+
+    assert get_route(client, '/users') == (200, {'route': 'list'})
+    assert get_route(client, '/users/me') == (200, {'route': 'me'})
+    assert get_route(client, '/users/me/settings') == (200, {'route': 'my tab'})
+
+    # `me` is also a user id when the literal branch has no match
+    assert get_route(client, '/users/me/posts/7') == (200, {'route': 'post'})
+
+
+def test_unknown_paths_are_not_found_and_undocumented_methods_not_allowed():
+    client = Client(MockServer(DEFINITION))
+
+    assert get_route(client, '/orders')[0] == 404
+    assert get_route(client, '/users/')[0] == 404
+    assert get_route(client, '/users/42/posts/7/comments')[0] == 404
+    assert get_route(client, '/files/report')[0] == 404
+
+    response = client.open('/users/42', method='PUT')
+    assert response.status_code == 405
+    assert response.headers['Allow'] == 'DELETE, GET, HEAD'
+
+    response = client.open('/users', method='PATCH')
+    assert response.status_code == 405
+    assert response.headers['Allow'] == 'GET, HEAD, POST'
+
+
+def test_responses_use_the_lowest_success_status_code():
+    client = Client(MockServer(DEFINITION))
+
+    assert get_route(client, '/users', 'POST') == (201, {'route': 'create'})
+
+    response = client.delete('/users/42')
+    assert response.status_code == 204
+    assert response.data == b''
+
+    # HEAD is answered like GET, without the body
+    response = client.head('/users/42')
+    assert response.status_code == 200
+    assert response.data == b''
+
+
+def test_paths_are_served_under_the_prefix():
+    client = Client(MockServer(DEFINITION, path_prefix='/api/'))
+
+    assert get_route(client, '/api/users/me') == (200, {'route': 'me'})
+    assert get_route(client, '/api/users/42') == (200, {'route': 'user'})
+    assert get_route(client, '/users/me')[0] == 404
+
+
+def test_requests_without_a_response_schema_echo_the_request_model():
+    definition = {
+        'paths': {
+            '/items': {
+                'post': {
+                    'requestBody': {'$ref': '#/components/requestBodies/Item'},
+                    'responses': {'default': {'description': 'Success'}}
+                },
+                'get': {}
+            }
+        },
+        'components': {
+            'requestBodies': {
+                'Item': {
+                    'content': {
+                        'application/json': {
+                            'schema': {'$ref': '#/components/schemas/Item'}
+                        }
+                    }
+                }
+            },
+            'schemas': {
+                'Item': {'type': 'object', 'properties': {'name': {'type': 'string'}}}
+            }
+        }
+    }
+
+    client = Client(MockServer(definition))
+
+    assert get_route(client, '/items', 'POST') == (200, {'name': 'string'})
+    assert get_route(client, '/items') == (200, {})
+
+
+def test_examples_are_generated_from_the_schema():
+    definition = {
+        'components': {
+            'schemas': {
+                'Node': {
+                    'type': 'object',
+                    'properties': {
+                        'id': {'type': 'integer'},
+                        'weight': {'type': 'number'},
+                        'visible': {'type': 'boolean'},
+                        'kind': {'type': 'string', 'enum': ['leaf', 'branch']},
+                        'label': {'type': 'string', 'example': 'root'},
+                        'tags': {'type': 'array', 'items': {'type': 'string'}},
+                        'children': {
+                            'type': 'array',
+                            'items': {'$ref': '#/components/schemas/Node'}
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    example = get_example(definition, {'$ref': '#/components/schemas/Node'})
+
+    assert {key: value for key, value in example.items() if key != 'children'} == {
+        'id': 0,
+        'weight': 0.0,
+        'visible': True,
+        'kind': 'leaf',
+        'label': 'root',
+        'tags': ['string']
+    }
+
+    # Recursive models are cut off
+    depth = 0
+    node = example
+    while node['children']:
+        node = node['children'][0]
+        depth += 1
+
+    assert 0 < depth < 8
+    assert get_example(definition, {'$ref': '#/components/schemas/Missing'}) is None
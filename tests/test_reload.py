@@ -0,0 +1,76 @@
+import time
+
+from flask import Flask
+
+from swagger_gen.lib.sampler import TrafficSampler
+from swagger_gen.lib.wrappers import swagger_metadata
+from swagger_gen.swagger import Swagger
+
+SPEC_URL = '/swagger/v1/swagger.json'
+
+
+def wait_for_spec(client, condition, timeout: float = 5.0) -> dict:
+    '''Poll the spec until it satisfies `condition`, the reloader rebuilds it
+    in the background'''
+
+    deadline = time.monotonic() + timeout
+    while True:
+        spec = client.get(SPEC_URL).get_json()
+        if condition(spec) or time.monotonic() > deadline:
+            return spec
+        time.sleep(0.02)
+
+
+def create_app():
+    app = Flask(__name__)
+
+    def list_items():
+        return {}
+
+    app.add_url_rule('/items', view_func=list_items)
+
+    return app, list_items
+
+
+def test_metadata_applied_after_the_first_request_is_served():
+    app, list_items = create_app()
+
+    swagger = Swagger(
+        app=app,
+        title='app',
+        hot_reload=True,
+        reload_interval=0.02,
+        reload_debounce=0.02)
+    swagger.configure()
+
+    client = app.test_client()
+    assert 'summary' not in client.get(SPEC_URL).get_json()['paths']['/items']['get']
+
+    swagger_metadata(summary='List the items')(list_items)
+
+    spec = wait_for_spec(
+        client, lambda spec: 'summary' in spec['paths']['/items']['get'])
+    assert spec['paths']['/items']['get']['summary'] == 'List the items'
+
+
+def test_samples_recorded_after_the_first_request_are_served():
+    app, _ = create_app()
+
+    swagger = Swagger(
+        app=app,
+        title='app',
+        traffic_sampler=TrafficSampler(rate=1.0),
+        hot_reload=True,
+        reload_interval=0.02,
+        reload_debounce=0.02)
+    swagger.configure()
+
+    client = app.test_client()
+    assert 'parameters' not in client.get(SPEC_URL).get_json()['paths']['/items']['get']
+
+    client.get('/items?page=2')
+
+    spec = wait_for_spec(
+        client, lambda spec: 'parameters' in spec['paths']['/items']['get'])
+    parameters = spec['paths']['/items']['get']['parameters']
+    assert [parameter['name'] for parameter in parameters] == ['page']
@@ -0,0 +1,162 @@
+import threading
+
+from flask import Flask, request
+
+from swagger_gen.lib.sampler import TrafficSampler, get_shape_schema
+
+
+def test_reservoir_is_bounded():
+    sampler = TrafficSampler(reservoir_size=4)
+
+    for index in range(100):
+        sampler.record(
+            view_function_name='create',
+            method='post',
+            query_params=[],
+            body={f'field_{index}': index},
+            status_code=201)
+
+    samples = sampler.get_samples('create', 'POST')
+
+    assert samples.requests == 100
+    assert samples.bodies == 100
+    assert len(samples.body_shapes) == 4
+
+
+def test_query_params_and_status_codes_are_counted():
+    sampler = TrafficSampler(max_query_params=2)
+
+    for query_params, status_code in [
+            (['page'], 200),
+            (['page', 'size'], 200),
+            (['page', 'size', 'sort'], 404)]:
+        sampler.record(
+            view_function_name='list',
+            method='GET',
+            query_params=query_params,
+            body=None,
+            status_code=status_code)
+
+    samples = sampler.get_samples('list', 'get')
+
+    # `sort` is past the limit of names
+    assert samples.query_params == {'page': 3, 'size': 2}
+    assert samples.status_codes == {200: 2, 404: 1}
+    assert sampler.get_samples('list', 'POST') is None
+
+
+def test_get_samples_returns_a_copy():
+    sampler = TrafficSampler()
+    sampler.record('list', 'GET', ['page'], None, 200)
+
+    samples = sampler.get_samples('list', 'GET')
+    sampler.record('list', 'GET', ['size'], None, 500)
+
+    assert samples.query_params == {'page': 1}
+    assert samples.status_codes == {200: 1}
+
+
+def test_version_is_bumped_on_every_reservoir_change():
+    sampler = TrafficSampler(reservoir_size=2)
+
+    sampler.record('create', 'POST', [], {'name': 'a'}, 201)
+    sampler.record('create', 'POST', [], {'name': 'b'}, 201)
+    assert sampler.version == 2
+
+    # A full reservoir that keeps the same shapes doesn't change the spec
+    for _ in range(50):
+        sampler.record('create', 'POST', [], {'name': 'c'}, 201)
+    assert sampler.version == 2
+
+    # Long after the reservoir is full, replacing a kept shape with a new
+    # one still changes it
+    for index in range(200):
+        before = sampler.get_samples('create', 'POST').body_shapes
+        version = sampler.version
+
+        sampler.record('create', 'POST', [], {f'field_{index}': 1}, 201)
+
+        after = sampler.get_samples('create', 'POST').body_shapes
+        assert (sampler.version > version) == (after != before)
+
+    assert sampler.version > 2
+
+
+def test_shapes_are_merged_into_a_schema():
+    sampler = TrafficSampler()
+
+    for body in [
+            {'name': 'a', 'age': 1, 'tags': ['x'], 'parent': None},
+            {'name': 'b', 'age': 1.5, 'tags': [], 'parent': {'id': 1}}]:
+        sampler.record('create', 'POST', [], body, 201)
+
+    schema = get_shape_schema(sampler.get_samples('create', 'POST').body_shapes)
+
+    assert schema == {
+        'type': 'object',
+        'properties': {
+            'age': {'type': 'number'},
+            'name': {'type': 'string'},
+            'parent': {
+                'type': 'object',
+                'properties': {'id': {'type': 'integer'}},
+                'required': ['id'],
+                'nullable': True
+            },
+            'tags': {'type': 'array', 'items': {'type': 'string'}}
+        },
+        'required': ['age', 'name', 'parent', 'tags']
+    }
+
+
+def test_optional_properties_are_not_required():
+    schema = get_shape_schema([
+        ('object', (('id', 'integer'), ('name', 'string'))),
+        ('object', (('id', 'integer'),)),
+    ])
+
+    assert schema['required'] == ['id']
+
+
+def test_requests_are_sampled_while_the_samples_are_read():
+    app = Flask('sampler_concurrent')
+    sampler = TrafficSampler(rate=1.0)
+    sampler.install(app)
+
+    @app.route('/items', methods=['POST'])
+    def sampled_create_item():
+        return {'keys': sorted(request.get_json())}, 201
+
+    client = app.test_client()
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                samples = sampler.get_samples('sampled_create_item', 'POST')
+                if samples is not None:
+                    get_shape_schema(samples.body_shapes)
+                    list(samples.query_params)
+            except Exception as error:
+                errors.append(error)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+
+    try:
+        for index in range(200):
+            response = client.post(
+                f'/items?q{index % 40}=1',
+                json={f'field_{index}': index})
+            assert response.status_code == 201
+    finally:
+        stop.set()
+        reader.join()
+
+    assert errors == []
+
+    samples = sampler.get_samples('sampled_create_item', 'POST')
+    assert samples.requests == 200
+    assert samples.status_codes == {201: 200}
+    assert len(samples.query_params) == 32
@@ -0,0 +1,37 @@
+import pytest
+from flask import Flask
+
+from swagger_gen.lib.endpoint import get_swagger_endpoints
+from swagger_gen.lib.schema import SwaggerDefinition
+from swagger_gen.lib.wrappers import swagger_metadata
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+
+    def get_user(user_id):
+        return {}
+
+    app.add_url_rule(
+        '/users/<user_id>',
+        view_func=swagger_metadata(summary='Get a user', security='missing')(get_user))
+
+    return app
+
+
+def test_add_endpoint_rejects_an_unknown_security_scheme():
+    app = create_app()
+    definition = SwaggerDefinition(app=app, title='app')
+
+    endpoint, = get_swagger_endpoints(app=app)
+
+    with pytest.raises(Exception, match='No security schemes are defined'):
+        definition.add_endpoint(endpoint)
+
+
+def test_add_endpoints_rejects_an_unknown_security_scheme():
+    app = create_app()
+    definition = SwaggerDefinition(app=app, title='app')
+
+    with pytest.raises(Exception, match='No security schemes are defined'):
+        definition.add_endpoints(get_swagger_endpoints(app=app))
@@ -0,0 +1,145 @@
+import pytest
+from flask import Flask
+
+from swagger_gen.lib.servers import ServerTemplate, ServerVariants
+from swagger_gen.swagger import Swagger
+
+SPEC_URL = '/swagger/v1/swagger.json'
+ALLOWED_HOSTS = ['api.example.com', 'eu.api.example.com']
+
+
+def create_client(name: str, **kwargs):
+    app = Flask(name)
+
+    swagger = Swagger(
+        app=app,
+        title=name,
+        servers=['https://default.example.com'],
+        server_template=ServerTemplate(
+            '{scheme}://{host}/api',
+            allowed_hosts=ALLOWED_HOSTS,
+            **kwargs))
+    swagger.configure()
+
+    return app.test_client()
+
+
+def get_servers(client, **headers) -> list:
+    response = client.get(SPEC_URL, headers=headers)
+    assert response.status_code == 200
+
+    return [server['url'] for server in response.get_json()['servers']]
+
+
+def test_server_template_requires_allowed_hosts():
+    with pytest.raises(Exception, match='at least one host'):
+        ServerTemplate('{scheme}://{host}/api', allowed_hosts=None)
+
+    with pytest.raises(Exception, match='at least one host'):
+        ServerTemplate('{scheme}://{host}/api', allowed_hosts=[])
+
+
+def test_servers_use_the_request_host():
+    client = create_client('servers_host')
+
+    assert get_servers(client, Host='api.example.com') == [
+        'http://api.example.com/api'
+    ]
+    assert get_servers(client, Host='EU.api.example.com') == [
+        'http://eu.api.example.com/api'
+    ]
+
+
+def test_servers_fall_back_to_the_default_for_other_hosts():
+    client = create_client('servers_disallowed')
+
+    assert get_servers(client, Host='attacker.example.com') == [
+        'https://default.example.com'
+    ]
+    assert get_servers(client, Host='bad host') == [
+        'https://default.example.com'
+    ]
+
+
+def test_forwarded_headers_are_ignored_by_default():
+    client = create_client('servers_untrusted')
+
+    servers = get_servers(
+        client,
+        Host='api.example.com',
+        **{'X-Forwarded-Host': 'eu.api.example.com', 'X-Forwarded-Proto': 'https'})
+
+    assert servers == ['http://api.example.com/api']
+
+
+def test_forwarded_headers_are_read_when_trusted():
+    client = create_client('servers_trusted', trust_forwarded=True)
+
+    servers = get_servers(
+        client,
+        Host='internal',
+        **{'X-Forwarded-Host': 'eu.api.example.com, proxy', 'X-Forwarded-Proto': 'https'})
+
+    assert servers == ['https://eu.api.example.com/api']
+
+    # A forwarded host that isn't allowed gets the default servers
+    servers = get_servers(
+        client,
+        Host='api.example.com',
+        **{'X-Forwarded-Host': 'attacker.example.com'})
+
+    assert servers == ['https://default.example.com']
+
+
+def test_vary_lists_the_headers_the_servers_depend_on():
+    untrusted = create_client('servers_vary_untrusted')
+    trusted = create_client('servers_vary_trusted', trust_forwarded=True)
+
+    response = untrusted.get(SPEC_URL, headers={'Host': 'api.example.com'})
+    assert response.headers['Vary'] == 'Accept-Encoding, Host'
+
+    response = trusted.get(SPEC_URL, headers={'Host': 'api.example.com'})
+    assert response.headers['Vary'] == (
+        'Accept-Encoding, Host, X-Forwarded-Host, X-Forwarded-Proto')
+
+
+def test_variants_are_evicted_least_recently_used_first():
+    variants = ServerVariants(
+        server_template=ServerTemplate(
+            '{scheme}://{host}',
+            allowed_hosts=['a', 'b', 'c'],
+            max_variants=2),
+        definition={'openapi': '3.0.1', 'paths': {}})
+
+    a = variants.get_spec({'HTTP_HOST': 'a'})
+    variants.get_spec({'HTTP_HOST': 'b'})
+
+    # Requesting `a` again makes `b` the least recently used
+    assert variants.get_spec({'HTTP_HOST': 'a'}) is a
+    variants.get_spec({'HTTP_HOST': 'c'})
+
+    assert list(variants._variants) == [('http', 'a'), ('http', 'c')]
+
+
+def test_variants_are_compressed_on_demand():
+    client = create_client('servers_lazy')
+
+    response = client.get(SPEC_URL, headers={'Host': 'api.example.com'})
+    etag = response.headers['ETag']
+
+    response = client.get(
+        SPEC_URL,
+        headers={'Host': 'api.example.com', 'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] != etag
+
+    variants = ServerVariants(
+        server_template=ServerTemplate('{scheme}://{host}', allowed_hosts=['a']),
+        definition={'openapi': '3.0.1', 'paths': {}})
+
+    variant = variants.get_spec({'HTTP_HOST': 'a'})
+    assert variant._compressed is None
+
+    assert variant.compressed
+    assert variant._compressed is not None
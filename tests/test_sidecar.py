@@ -0,0 +1,95 @@
+import json
+import os
+import socket
+import tempfile
+
+import pytest
+from flask import Flask
+
+from swagger_gen.lib.loadtest import HttpTransport, SyntheticRequest, get_docs_paths
+from swagger_gen.swagger import Swagger
+
+SPEC_URL = '/swagger/v1/swagger.json'
+
+
+def create_app(name: str) -> Flask:
+    app = Flask(name)
+
+    @app.route('/items/<item_id>', endpoint=f'{name}_get_item')
+    def get_item(item_id):
+        return {}
+
+    return app
+
+
+def get_status(transport: HttpTransport, path: str) -> int:
+    status, _ = transport.send(SyntheticRequest(
+        operation=path,
+        method='GET',
+        path=path))
+
+    return status
+
+
+def assert_serves_the_docs(swagger: Swagger, app: Flask, address: str) -> None:
+    transport = HttpTransport(address, timeout=5.0)
+
+    try:
+        spec = json.loads(transport.fetch(SPEC_URL))
+        assert spec == swagger.get_definition()
+        assert '/items/{item_id}' in spec['paths']
+
+        # Everything the index loads is served by the sidecar
+        index = transport.fetch('/swagger')
+        for path in get_docs_paths(index, '/swagger'):
+            assert get_status(transport, path) == 200
+
+        assert get_status(transport, '/items/1') == 404
+    finally:
+        transport.close()
+
+    # The app itself doesn't serve the docs
+    client = app.test_client()
+    assert client.get(SPEC_URL).status_code == 404
+    assert client.get('/swagger').status_code == 404
+    assert client.get('/items/1').status_code == 200
+
+
+def test_sidecar_serves_the_docs_over_tcp():
+    app = create_app('sidecar_tcp')
+
+    # Port 0 picks a free port
+    swagger = Swagger(app=app, title='app', sidecar_port=0)
+    swagger.configure()
+
+    try:
+        assert swagger._docs_server.address.startswith('http://127.0.0.1:')
+        assert_serves_the_docs(swagger, app, swagger._docs_server.address)
+    finally:
+        swagger._docs_server.stop()
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='requires unix sockets')
+def test_sidecar_serves_the_docs_over_a_unix_socket():
+    app = create_app('sidecar_unix')
+
+    # The socket path is kept short, unix socket paths are limited to ~100
+    # characters
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'docs.sock')
+
+        # A socket file left behind by a previous run is replaced
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        swagger = Swagger(app=app, title='app', sidecar_socket=path)
+        swagger.configure()
+
+        try:
+            assert swagger._docs_server.address == f'unix://{path}'
+            assert_serves_the_docs(swagger, app, f'unix://{path}')
+        finally:
+            swagger._docs_server.stop()
+
+        assert not os.path.exists(path)
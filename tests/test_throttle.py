@@ -0,0 +1,77 @@
+import pytest
+from flask import Flask
+
+from swagger_gen.lib.throttle import MemoryBackend, Throttle, ThrottleBackend
+from swagger_gen.swagger import Swagger
+
+
+def test_backend_must_implement_consume():
+    class IncompleteBackend(ThrottleBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_memory_backend_evicts_the_least_recently_used_buckets():
+    backend = MemoryBackend(max_keys=4)
+
+    # Slow enough that none of the buckets refill during the test
+    for key in ['a', 'b', 'c', 'd']:
+        backend.consume(key, rate=0.001, capacity=2)
+
+    backend.consume('a', rate=0.001, capacity=2)
+    backend.consume('e', rate=0.001, capacity=2)
+
+    assert list(backend._buckets) == ['c', 'd', 'a', 'e']
+
+
+@pytest.mark.parametrize('wsgi_fast_path', [False, True])
+def test_missing_dependencies_do_not_take_a_token(wsgi_fast_path):
+    app = Flask(f'throttle_{wsgi_fast_path}')
+
+    swagger = Swagger(
+        app=app,
+        title='app',
+        wsgi_fast_path=wsgi_fast_path,
+        throttle=Throttle(client_rate=0.001, client_burst=1))
+    swagger.configure()
+
+    client = app.test_client()
+
+    assert client.get('/swagger/missing.js').status_code == 404
+    assert client.get('/swagger/missing.css').status_code == 404
+
+    assert client.get('/swagger/swagger-ui.css').status_code == 200
+    assert client.get('/swagger/swagger-ui.css').status_code == 429
+
+
+@pytest.mark.parametrize('param', ['rate', 'burst', 'client_rate', 'client_burst'])
+@pytest.mark.parametrize('value', [0, -1])
+def test_rates_must_be_positive(param, value):
+    kwargs = {'client_rate': 1, param: value}
+
+    with pytest.raises(Exception, match=f"'{param}' must be greater than 0"):
+        Throttle(**kwargs)
+
+
+@pytest.mark.parametrize('wsgi_fast_path', [False, True])
+def test_throttled_requests_do_not_load_dependencies(wsgi_fast_path):
+    app = Flask(f'throttle_cold_{wsgi_fast_path}')
+
+    swagger = Swagger(
+        app=app,
+        title='app',
+        wsgi_fast_path=wsgi_fast_path,
+        lazy_assets=True,
+        throttle=Throttle(rate=0.001, burst=1))
+    swagger.configure()
+
+    client = app.test_client()
+
+    # The index takes the only token
+    assert client.get('/swagger').status_code == 200
+    assert client.get('/swagger/swagger-ui-bundle.js').status_code == 429
+
+    dependency_provider = app.view_functions['_get_resource'].__self__
+    assert 'swagger-ui-bundle.js' not in dependency_provider._resources